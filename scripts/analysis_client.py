@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import socket
+import argparse
+
+
+"""
+This script is the thin client of analysis_daemon.py. It replaces the invocations of the pipeline scripts:
+- python3 analysis_client.py parse <project> <commit_sha>
+    (python3 parse_continuous_analysis_output.py <project> <commit_sha>)
+- python3 analysis_client.py filter <repo_path> <current_commit_sha> [<parent_commit_sha>]
+    (python3 filter_new_violations.py <repo_path> <current_commit_sha> [<parent_commit_sha>])
+- python3 analysis_client.py track-changes <repo_path> <old_sha> <new_sha> (prints the changes as JSON)
+- python3 analysis_client.py ping / shutdown
+
+The operations run in the working directory of the client. If the daemon is not running, parse and filter fall back
+to running the script in a new process (unless --no-fallback is given), so the client can always be used.
+
+The client only uses the standard library, so it starts quickly.
+"""
+
+
+# The scripts run when the daemon is not running
+FALLBACK_SCRIPTS = {
+    'parse': 'parse_continuous_analysis_output.py',
+    'filter': 'filter_new_violations.py',
+}
+
+
+def get_default_socket_path():
+    # The same default as analysis_daemon.py (not imported, it imports pandas and GitPython)
+    return os.environ.get('CA_DAEMON_SOCKET', os.path.join('/tmp', f'continuous-analysis-{os.getuid()}.sock'))
+
+
+def send_request(socket_path, request):
+    """
+    Send a request to the daemon and wait for its response.
+
+    Args:
+        socket_path: The path of the Unix socket of the daemon.
+        request: The request (a dictionary with the op and its arguments).
+
+    Returns:
+        The response of the daemon (a dictionary).
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + '\n').encode())
+        with client.makefile('r') as response_file:
+            response_line = response_file.readline()
+    if not response_line:
+        raise ConnectionError('The daemon closed the connection without a response')
+    return json.loads(response_line)
+
+
+def build_request(args):
+    # Convert the command line arguments to the request of the operation
+    request = {'op': args.command.replace('-', '_'), 'cwd': os.getcwd()}
+    if args.command == 'parse':
+        request.update({'project': args.project, 'commit_sha': args.commit_sha})
+    elif args.command == 'filter':
+        request.update({'repo_path': args.repo_path, 'current_sha': args.current_sha, 'parent_sha': args.parent_sha})
+    elif args.command == 'track-changes':
+        request.update({'repo_path': args.repo_path, 'old_sha': args.old_sha, 'new_sha': args.new_sha})
+    return request
+
+
+def run_fallback(args):
+    # Run the script in a new process (replaces the client process)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), FALLBACK_SCRIPTS[args.command])
+    if args.command == 'parse':
+        script_args = [args.project, args.commit_sha]
+    else:
+        script_args = [args.repo_path, args.current_sha] + ([args.parent_sha] if args.parent_sha else [])
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, script] + script_args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a pipeline operation on the continuous analysis daemon.')
+    parser.add_argument('--socket', default=get_default_socket_path(), help='The path of the Unix socket of the daemon.')
+    parser.add_argument('--no-fallback', action='store_true', help='Fail if the daemon is not running.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    parse_parser = subparsers.add_parser('parse')
+    parse_parser.add_argument('project')
+    parse_parser.add_argument('commit_sha')
+    filter_parser = subparsers.add_parser('filter')
+    filter_parser.add_argument('repo_path')
+    filter_parser.add_argument('current_sha')
+    filter_parser.add_argument('parent_sha', nargs='?', default=None)
+    track_parser = subparsers.add_parser('track-changes')
+    track_parser.add_argument('repo_path')
+    track_parser.add_argument('old_sha')
+    track_parser.add_argument('new_sha')
+    subparsers.add_parser('ping')
+    subparsers.add_parser('shutdown')
+    args = parser.parse_args()
+
+    # Send the request to the daemon (or run the script if the daemon is not running)
+    try:
+        response = send_request(args.socket, build_request(args))
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        if args.command in FALLBACK_SCRIPTS and not args.no_fallback:
+            run_fallback(args)
+        print(f'Could not connect to the daemon on {args.socket}: {e}', file=sys.stderr)
+        return 2
+
+    # Print the output and the result of the operation
+    if response.get('output'):
+        print(response['output'], end='')
+    if not response['ok']:
+        print(response['error'], file=sys.stderr)
+        return 1
+    if args.command in ('track-changes', 'ping'):
+        print(json.dumps(response['result'], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
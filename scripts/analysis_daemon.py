@@ -0,0 +1,257 @@
+import io
+import os
+import sys
+import json
+import errno
+import signal
+import socket
+import argparse
+import threading
+import traceback
+import contextlib
+import socketserver
+from collections import OrderedDict
+
+from git import Repo
+
+import parse_continuous_analysis_output
+import filter_new_violations
+from track_commit_changes import track_changes
+
+
+"""
+This script runs a long-lived analysis daemon reachable over a Unix socket, so consecutive pipeline steps do not pay
+for the Python startup, the imports of pandas and GitPython, the opening of the repositories and the reading of the
+results CSV again and again.
+It keeps the following warm:
+- The Repo objects of the repositories (by path)
+- The changes between two commits (an LRU cache of track_changes results)
+- The over time results dataframes (reloaded when the CSV file is modified)
+
+It exposes the following operations (one JSON request per line, one JSON response per line):
+- ping: {"op": "ping"}
+- parse: {"op": "parse", "cwd": ..., "project": ..., "commit_sha": ...} (parse_continuous_analysis_output.py)
+- track_changes: {"op": "track_changes", "cwd": ..., "repo_path": ..., "old_sha": ..., "new_sha": ...}
+- filter: {"op": "filter", "cwd": ..., "repo_path": ..., "current_sha": ..., "parent_sha": ...} (filter_new_violations.py)
+- shutdown: {"op": "shutdown"}
+
+The response is {"ok": true, "result": ..., "output": ...} (output is what the operation printed) or
+{"ok": false, "error": ..., "output": ...}. The requests are processed one at a time, in the working directory of
+the client (cwd).
+
+Usage: python3 analysis_daemon.py [--socket <path>]
+The client is analysis_client.py.
+"""
+
+
+# The number of track_changes results kept in the cache
+CHANGES_CACHE_SIZE = 256
+
+
+def get_default_socket_path():
+    """
+    Get the default path of the daemon socket (CA_DAEMON_SOCKET, or a per-user path in the temporary directory).
+
+    Returns:
+        The path of the socket.
+    """
+    return os.environ.get('CA_DAEMON_SOCKET', os.path.join('/tmp', f'continuous-analysis-{os.getuid()}.sock'))
+
+
+class AnalysisCache:
+    """
+    The warm state of the daemon: the opened repositories, the tracked changes and the loaded results dataframes.
+    """
+
+    def __init__(self, changes_cache_size=CHANGES_CACHE_SIZE):
+        self.repos = {}
+        self.changes = OrderedDict()
+        self.changes_cache_size = changes_cache_size
+        self.dataframes = {}
+
+    def get_repo(self, repo_path):
+        # Open each repository once
+        repo_path = os.path.realpath(repo_path)
+        if repo_path not in self.repos:
+            self.repos[repo_path] = Repo(repo_path)
+        return self.repos[repo_path]
+
+    def get_changes(self, repo_path, old_sha, new_sha):
+        # The changes between two commits never change, keep the most recently used ones
+        repo = self.get_repo(repo_path)
+        key = (repo.working_dir, repo.rev_parse(old_sha).hexsha, repo.rev_parse(new_sha).hexsha)
+        if key in self.changes:
+            self.changes.move_to_end(key)
+        else:
+            self.changes[key] = track_changes(repo_path, old_sha, new_sha, repo=repo)
+            if len(self.changes) > self.changes_cache_size:
+                self.changes.popitem(last=False)
+        return self.changes[key]
+
+    def get_dataframe(self, csv_file):
+        # Reload the dataframe only if the CSV file has been modified since it was loaded
+        csv_file = os.path.realpath(csv_file)
+        stat = os.stat(csv_file)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self.dataframes.get(csv_file)
+        if cached is None or cached[0] != version:
+            cached = (version, filter_new_violations.read_results(csv_file))
+            self.dataframes[csv_file] = cached
+        return cached[1]
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    # Run the operation in the working directory of the client
+    current_dir = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(current_dir)
+
+
+def run_parse(cache, request):
+    parse_continuous_analysis_output.main(request['project'], request['commit_sha'])
+    parse_continuous_analysis_output.profiler.write_report()
+
+
+def run_track_changes(cache, request):
+    return cache.get_changes(request['repo_path'], request['old_sha'], request['new_sha'])
+
+
+def run_filter(cache, request):
+    current_sha = request['current_sha']
+    parent_sha = request.get('parent_sha')
+    df = cache.get_dataframe('continuous_analysis_over_time_results.csv')
+    if parent_sha is None:
+        parent_sha = filter_new_violations.get_parent_sha_from_metadata(df, current_sha)
+
+    # Use the cached changes if the parent commit is in the results (the same condition as filter_new_violations.py)
+    changes = None
+    if parent_sha and not df[df['commit_sha'] == parent_sha].empty:
+        changes = cache.get_changes(request['repo_path'], parent_sha, current_sha)
+
+    filter_new_violations.main(request['repo_path'], current_sha, parent_sha, df=df, changes=changes)
+    filter_new_violations.profiler.write_report()
+
+
+# The operations of the daemon
+OPERATIONS = {
+    'parse': run_parse,
+    'track_changes': run_track_changes,
+    'filter': run_filter,
+}
+
+
+def handle_request(cache, request):
+    """
+    Run an operation of the daemon.
+
+    Args:
+        cache: The AnalysisCache of the daemon.
+        request: The request (a dictionary with the op and its arguments).
+
+    Returns:
+        The response (a dictionary with ok, result or error, and the output of the operation).
+    """
+    op = request.get('op')
+    if op == 'ping':
+        return {'ok': True, 'result': {'pid': os.getpid()}, 'output': ''}
+    if op not in OPERATIONS:
+        return {'ok': False, 'error': f'Unknown operation: {op}', 'output': ''}
+
+    # Run the operation in the working directory of the client, capturing what it prints
+    output = io.StringIO()
+    try:
+        with working_directory(request.get('cwd', os.getcwd())), contextlib.redirect_stdout(output):
+            result = OPERATIONS[op](cache, request)
+        return {'ok': True, 'result': result, 'output': output.getvalue()}
+    except Exception:
+        return {'ok': False, 'error': traceback.format_exc(), 'output': output.getvalue()}
+
+
+class AnalysisRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        # Answer each request line of the connection
+        for request_line in self.rfile:
+            if not request_line.strip():
+                continue
+            try:
+                request = json.loads(request_line)
+            except json.JSONDecodeError as e:
+                response = {'ok': False, 'error': f'Invalid request: {e}', 'output': ''}
+            else:
+                if request.get('op') == 'shutdown':
+                    self.send({'ok': True, 'result': None, 'output': ''})
+                    # Shut down from another thread (shutdown waits for serve_forever to return)
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                response = handle_request(self.server.cache, request)
+            self.send(response)
+
+    def send(self, response):
+        self.wfile.write((json.dumps(response) + '\n').encode())
+        self.wfile.flush()
+
+
+def is_socket_in_use(socket_path):
+    # Check if a daemon accepts connections on the socket (a stale socket refuses them)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    finally:
+        client.close()
+
+
+class AnalysisServer(socketserver.UnixStreamServer):
+    """
+    A Unix socket server that processes the requests one at a time (the operations change the working directory).
+    """
+
+    def __init__(self, socket_path, cache=None):
+        # Remove a stale socket left by a daemon that did not exit cleanly (but not the socket of a running daemon)
+        if os.path.exists(socket_path):
+            if is_socket_in_use(socket_path):
+                raise OSError(errno.EADDRINUSE, f'An analysis daemon is already listening on {socket_path}')
+            os.unlink(socket_path)
+        super().__init__(socket_path, AnalysisRequestHandler)
+        self.socket_path = socket_path
+        self.cache = cache if cache is not None else AnalysisCache()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the continuous analysis daemon.')
+    parser.add_argument('--socket', default=get_default_socket_path(), help='The path of the Unix socket.')
+    args = parser.parse_args()
+
+    try:
+        server = AnalysisServer(args.socket)
+    except OSError as e:
+        print(f'Could not start the analysis daemon: {e}', file=sys.stderr)
+        return 1
+
+    # Stop serving on SIGTERM (e.g. at the end of a CI job)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start())
+
+    print(f'Analysis daemon listening on {args.socket} (pid {os.getpid()})', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import os
+import sys
+import argparse
+import importlib.util
+
+
+"""
+This script is used to define the scope of the PyMOP and DyLin analyses: the code whose violations are reported.
+The scope is set with the ANALYSIS_SCOPE environment variable:
+- project: only the code of the tested project (the cheapest mode, the violations of the other code cannot be fixed)
+- allowlist: the code of the project and of the modules listed (comma separated prefixes, e.g. requests,numpy.linalg)
+  in the ANALYSIS_SCOPE_ALLOWLIST environment variable
+- all (default): all the code, including python and site-packages
+
+DyLin only instruments the files it is given, so the scope restricts its instrumentation (the project directory, plus
+the directories of the allowlisted packages). PyMOP has no option to restrict its instrumentation, so the scope is
+applied to the violation locations it reports. The parser records the scope of each row (see format_analysis_scope).
+
+Only the standard library is used, as this script runs inside the PyMOP and DyLin test environments.
+
+Usage: python3 analysis_scope.py describe | instrumentation-dirs
+"""
+
+
+# The scopes of the analyses
+SCOPES = ('project', 'allowlist', 'all')
+DEFAULT_SCOPE = 'all'
+
+
+def get_analysis_scope() -> tuple:
+    """
+    Get the analysis scope from the environment variables.
+
+    Returns:
+        A tuple containing the scope and the allowlisted module prefixes.
+    """
+    scope = os.environ.get('ANALYSIS_SCOPE') or DEFAULT_SCOPE
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown analysis scope: {scope} (expected one of {', '.join(SCOPES)})")
+    allowlist = [prefix.strip() for prefix in os.environ.get('ANALYSIS_SCOPE_ALLOWLIST', '').split(',') if prefix.strip()]
+    return scope, allowlist if scope == 'allowlist' else []
+
+
+def format_analysis_scope(scope: str, allowlist: list) -> str:
+    # Format the scope as recorded in the results (e.g. allowlist:requests,numpy)
+    return f"{scope}:{','.join(allowlist)}" if scope == 'allowlist' else scope
+
+
+def parse_analysis_scope(scope_str: str) -> tuple:
+    """
+    Parse a scope recorded in the results (see format_analysis_scope).
+
+    Args:
+        scope_str: The recorded scope.
+
+    Returns:
+        A tuple containing the scope and the allowlisted module prefixes.
+    """
+    scope, _, allowlist = scope_str.strip().partition(':')
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown analysis scope: {scope_str}")
+    return scope, [prefix for prefix in allowlist.split(',') if prefix]
+
+
+def is_library_path(filepath: str) -> bool:
+    """
+    Check if a violation location is from python or site-packages (not from the tested project).
+
+    Args:
+        filepath: The filepath of the violation.
+
+    Returns:
+        True if the violation is from python or site-packages.
+    """
+    return 'python3' in filepath or 'site-packages' in filepath
+
+
+def get_module_name(filepath: str) -> str:
+    """
+    Get the module of a python or site-packages file.
+
+    Args:
+        filepath: The filepath of the file (e.g. /venv/lib/python3.12/site-packages/requests/models.py).
+
+    Returns:
+        The dotted module name (e.g. requests.models), or None if the file is not in python or site-packages.
+    """
+    filepath = filepath.replace(os.sep, '/')
+    if 'site-packages/' in filepath:
+        relative_path = filepath.rsplit('site-packages/', 1)[1]
+    elif '/python3' in filepath and '/' in filepath.rsplit('/python3', 1)[1]:
+        # Skip the version directory of the standard library (e.g. python3.12/json/decoder.py)
+        relative_path = filepath.rsplit('/python3', 1)[1].split('/', 1)[1]
+    else:
+        return None
+    module_path = relative_path[:-3] if relative_path.endswith('.py') else relative_path
+    if module_path.endswith('/__init__'):
+        module_path = module_path[:-len('/__init__')]
+    return module_path.replace('/', '.')
+
+
+def in_analysis_scope(filepath: str, scope: str, allowlist: list) -> bool:
+    """
+    Check if a violation location is in the analysis scope.
+
+    Args:
+        filepath: The filepath of the violation.
+        scope: The analysis scope (project, allowlist or all).
+        allowlist: The allowlisted module prefixes (allowlist scope).
+
+    Returns:
+        True if the violation is in the analysis scope.
+    """
+    if scope == 'all' or not is_library_path(filepath):
+        return True
+    if scope == 'project':
+        return False
+    module = get_module_name(filepath)
+    return module is not None and any(module == prefix or module.startswith(prefix + '.') for prefix in allowlist)
+
+
+def get_instrumentation_dirs(allowlist: list) -> list:
+    """
+    Get the directories of the allowlisted packages in the current environment (to instrument them with DyLin).
+
+    Args:
+        allowlist: The allowlisted module prefixes.
+
+    Returns:
+        A list of the package directories (the modules that are not packages or are not installed are skipped).
+    """
+    directories = []
+    for prefix in allowlist:
+        try:
+            spec = importlib.util.find_spec(prefix)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is None or not spec.submodule_search_locations:
+            print(f"Skipping {prefix}: not an installed package", file=sys.stderr)
+            continue
+        directories.extend(spec.submodule_search_locations)
+    return directories
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Describe the analysis scope (ANALYSIS_SCOPE and ANALYSIS_SCOPE_ALLOWLIST).')
+    parser.add_argument('command', choices=['describe', 'instrumentation-dirs'])
+    args = parser.parse_args()
+
+    scope, allowlist = get_analysis_scope()
+    if args.command == 'describe':
+        print(format_analysis_scope(scope, allowlist))
+    else:
+        for directory in get_instrumentation_dirs(allowlist):
+            print(directory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+
+# Add the scripts directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import parse_continuous_analysis_output as parser_module
+from junit_durations import read_junit_durations
+from generate_parser_corpus import generate_corpus
+
+
+"""
+This script is used to benchmark parse_continuous_analysis_output.py on a generated output folder.
+It should report the following (minimum and mean time over the repeats, and peak traced memory):
+- main(project, commit_sha) end to end
+- Each get_* function of the parser (and the JUnit reader) separately, on the files of the generated corpus
+
+The results are saved as JSON so parser optimizations can be judged against fixed numbers.
+
+Usage: python3 bench_parser.py [options] --output <results.json>
+"""
+
+
+def measure(name, function, repeats):
+    """
+    Time a function over a number of repeats and measure its peak traced memory.
+
+    Args:
+        name: The name of the measured function.
+        function: The function to call (without arguments).
+        repeats: The number of repeats.
+
+    Returns:
+        A dictionary containing the timing and memory results.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    # Measure the peak memory in a separate run (tracing slows the function down)
+    tracemalloc.start()
+    try:
+        function()
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'function': name,
+        'min_time': min(times),
+        'mean_time': sum(times) / len(times),
+        'peak_traced_bytes': traced_peak,
+    }
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    # Run the parser functions in the folder of the analysis (they read relative paths)
+    current_dir = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(current_dir)
+
+
+def run_benchmark(args, workdir):
+    """
+    Generate the parser corpus and time the parser.
+
+    Args:
+        args: The command line arguments.
+        workdir: The directory to generate the corpus in.
+
+    Returns:
+        A dictionary containing the configuration and the results of the benchmark.
+    """
+    project = args.project
+    root = generate_corpus(
+        workdir, project, args.violations, args.specs, args.events, args.findings,
+        args.output_lines, args.tests, args.files, args.seed,
+    )
+    original_folder = os.path.join(root, f'{project}_original_output')
+    pymop_folder = os.path.join(root, f'{project}_pymop_output')
+    dylin_folder = os.path.join(root, f'{project}_dylin_output')
+    results = []
+
+    # Time each function on the files of the corpus
+    with working_directory(original_folder):
+        results.append(measure('get_run_time_test_summary_from_files', lambda: parser_module.get_run_time_test_summary_from_files(f'{project}_results.txt', f'{project}_Output.txt'), args.repeats))
+        _, test_summary = parser_module.get_run_time_test_summary_from_files(f'{project}_results.txt', f'{project}_Output.txt')
+        results.append(measure('get_test_time', lambda: parser_module.get_test_time(test_summary), args.repeats))
+        results.append(measure('get_test_summary', lambda: parser_module.get_test_summary(test_summary, '1.0', parser_module.create_base_data_structure(project, 'original')), args.repeats))
+        results.append(measure('get_coverage_from_file', lambda: parser_module.get_coverage_from_file(f'{project}_coverage.xml'), args.repeats))
+        results.append(measure('get_commit_timestamp_and_message', lambda: parser_module.get_commit_timestamp_and_message(f'{project}_commit_info.txt'), args.repeats))
+        results.append(measure('get_resource_usage', lambda: parser_module.get_resource_usage(f'{project}_results.txt', parser_module.create_base_data_structure(project, 'original')), args.repeats))
+        results.append(measure('read_junit_durations', lambda: read_junit_durations(f'{project}_junit.xml'), args.repeats))
+    with working_directory(pymop_folder):
+        results.append(measure('get_time_from_json', parser_module.get_time_from_json, args.repeats))
+        results.append(measure('get_monitors_and_events_from_json', lambda: parser_module.get_monitors_and_events_from_json('D'), args.repeats))
+        results.append(measure('get_num_violations_from_json', parser_module.get_num_violations_from_json, args.repeats))
+    with working_directory(dylin_folder):
+        results.append(measure('get_violations_from_dylin_findings', lambda: parser_module.get_violations_from_dylin_findings(f'{project}_findings.txt'), args.repeats))
+
+    # Time main end to end (its output is silenced, the CSV files are written to the working directory)
+    def run_main():
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            parser_module.main(project, 'benchmark')
+    with working_directory(workdir):
+        results.append(measure('main', run_main, args.repeats))
+
+    # Return the configuration and the results
+    return {
+        'config': {
+            'violations': args.violations,
+            'specs': args.specs,
+            'events': args.events,
+            'findings': args.findings,
+            'output_lines': args.output_lines,
+            'tests': args.tests,
+            'files': args.files,
+            'repeats': args.repeats,
+            'seed': args.seed,
+        },
+        'corpus_bytes': {
+            os.path.basename(folder): sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder))
+            for folder in [original_folder, pymop_folder, dylin_folder]
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parse_continuous_analysis_output.py on a generated output folder.')
+    parser.add_argument('--project', default='synthetic')
+    parser.add_argument('--violations', type=int, default=10000)
+    parser.add_argument('--specs', type=int, default=100)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--findings', type=int, default=5000)
+    parser.add_argument('--output-lines', type=int, default=50000)
+    parser.add_argument('--tests', type=int, default=2000)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_parser_results.json', help='The JSON file to save the results to.')
+    args = parser.parse_args()
+
+    # Run the benchmark in a temporary directory
+    workdir = tempfile.mkdtemp(prefix='bench-parser-')
+    try:
+        report = run_benchmark(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Print and save the results
+    for result in report['results']:
+        print(f"{result['function']:<40} min {result['min_time'] * 1000:10.2f}ms  mean {result['mean_time'] * 1000:10.2f}ms  "
+              f"peak {result['peak_traced_bytes'] / 1e6:8.2f}MB")
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results saved to {args.output}')
+
+
+if __name__ == "__main__":
+    main()
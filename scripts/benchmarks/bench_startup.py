@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+
+"""
+This script is used to benchmark the cold start of the pipeline scripts.
+It should report the following for each script module (median and minimum over the repeats):
+- The wall time of a new Python process importing the module, minus the wall time of a bare Python process
+- The heavy dependencies (pandas, numpy, GitPython, unidiff) loaded by the import
+
+The heavy dependencies should only be loaded on the code paths that need them, so importing a script must stay
+under the target (the benchmark fails if a module exceeds it).
+
+The results are saved as JSON so startup regressions can be caught.
+
+Usage: python3 bench_startup.py [--repeats <n>] [--target-ms <ms>] --output <results.json>
+"""
+
+
+# The script modules that are run from the command line (and by the workflows)
+SCRIPT_MODULES = [
+    'parse_continuous_analysis_output',
+    'filter_new_violations',
+    'track_commit_changes',
+    'junit_durations',
+    'pipeline_profiler',
+    'analysis_client',
+    'bisect_violation',
+    'commit_metadata',
+    'violation_fingerprints',
+    'report_spec_costs',
+    'select_specs',
+    'analysis_scope',
+    'skip_unchanged_commit',
+    'run_pipeline',
+    'violation_snapshots',
+    'local_scheduler',
+    'workspace_manager',
+    'capture_output',
+    'order_tests',
+    'csv_schema',
+]
+
+# The dependencies that are slow to import
+HEAVY_MODULES = ['pandas', 'numpy', 'git', 'unidiff']
+
+# The directory of the scripts
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def time_process(code, repeats):
+    """
+    Time a new Python process running some code.
+
+    Args:
+        code: The code to run (python -c).
+        repeats: The number of repeats.
+
+    Returns:
+        A list of wall times (in seconds).
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def get_loaded_heavy_modules(module):
+    # Get the heavy dependencies loaded by importing the module
+    code = f'import sys, json, {module}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    output = subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cold start of the pipeline scripts.')
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--target-ms', type=float, default=100.0, help='The maximum median import time (above a bare interpreter).')
+    parser.add_argument('--output', default='bench_startup_results.json', help='The JSON file to save the results to.')
+    args = parser.parse_args()
+
+    # Time a bare interpreter, to only report the time of the imports
+    bare_time = statistics.median(time_process('pass', args.repeats))
+
+    # Time the import of each script module
+    results = []
+    for module in SCRIPT_MODULES:
+        times = [t - bare_time for t in time_process(f'import {module}', args.repeats)]
+        results.append({
+            'module': module,
+            'median_ms': statistics.median(times) * 1000,
+            'min_ms': min(times) * 1000,
+            'heavy_modules': get_loaded_heavy_modules(module),
+        })
+
+    # Print and save the results
+    failed = [result['module'] for result in results if result['median_ms'] > args.target_ms]
+    for result in results:
+        status = 'FAIL' if result['module'] in failed else 'ok'
+        print(f"{result['module']:<36} median {result['median_ms']:8.1f}ms  min {result['min_ms']:8.1f}ms  "
+              f"heavy: {','.join(result['heavy_modules']) or '-':<20} {status}")
+    with open(args.output, 'w') as f:
+        json.dump({'bare_interpreter_ms': bare_time * 1000, 'target_ms': args.target_ms, 'results': results}, f, indent=2)
+    print(f'Results saved to {args.output}')
+
+    # Fail if a module exceeds the target
+    if failed:
+        print(f"Startup target of {args.target_ms}ms exceeded by: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
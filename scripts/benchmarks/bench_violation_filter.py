@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import contextlib
+import tracemalloc
+import pandas as pd
+from git import Repo
+from unidiff import PatchSet
+
+# Add the scripts directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import filter_new_violations
+from track_commit_changes import track_changes, process_patch_data
+from generate_synthetic_history import generate_history
+
+
+"""
+This script is used to benchmark the violation-differencing pipeline on a synthetic git history.
+It should report the following for each stage (total time, commits/s and violations/s):
+- track_changes: the diff between each commit and its parent (git diff + parsing)
+- process_patch_data: the parsing of the diff only (the diff text is read beforehand)
+- filter_violations: the classification of the violations of each commit given the changes
+- end_to_end: filter_new_violations.main for each commit (reading the results CSV, diffing, filtering and writing)
+It also reports the peak memory (traced Python allocations of the end-to-end stage and the peak RSS of the process).
+
+The results are saved as JSON so regressions can be caught as the filter evolves.
+
+Usage: python3 bench_violation_filter.py [options] --output <results.json>
+"""
+
+
+def summarize(name, total_time, num_commits, num_violations):
+    # Compute the throughput of a stage
+    return {
+        'stage': name,
+        'total_time': total_time,
+        'commits_per_second': num_commits / total_time if total_time > 0 else None,
+        'violations_per_second': num_violations / total_time if total_time > 0 else None,
+    }
+
+
+def run_benchmark(args, workdir):
+    """
+    Generate the synthetic history and time each stage of the pipeline.
+
+    Args:
+        args: The command line arguments.
+        workdir: The directory to generate the synthetic history in.
+
+    Returns:
+        A dictionary containing the configuration and the results of the benchmark.
+    """
+    # Generate the synthetic history
+    start = time.perf_counter()
+    repo_dir, commits = generate_history(
+        workdir, args.project, args.commits, args.files, args.lines, args.diff_size,
+        args.files_per_commit, args.rename_rate, args.violation_density, args.seed,
+    )
+    generation_time = time.perf_counter() - start
+    pairs = list(zip(commits[:-1], commits[1:]))
+
+    # Load the violations of each commit
+    df = pd.read_csv(os.path.join(workdir, 'continuous_analysis_over_time_results.csv'))
+    violations = {sha: filter_new_violations.get_violations_of_commit(df, sha) for sha in commits}
+    num_violations = sum(len(violations[current_sha]) for _, current_sha in pairs)
+
+    results = []
+
+    # Stage: track_changes
+    changes = {}
+    start = time.perf_counter()
+    for parent_sha, current_sha in pairs:
+        changes[current_sha] = track_changes(repo_dir, parent_sha, current_sha)
+    results.append(summarize('track_changes', time.perf_counter() - start, len(pairs), num_violations))
+
+    # Stage: process_patch_data (the diff text is read beforehand)
+    repo = Repo(repo_dir)
+    diffs = [repo.git.diff(parent_sha, current_sha, unified=0, find_renames=True) for parent_sha, current_sha in pairs]
+    start = time.perf_counter()
+    for diff_str in diffs:
+        process_patch_data(PatchSet(diff_str))
+    results.append(summarize('process_patch_data', time.perf_counter() - start, len(pairs), num_violations))
+
+    # Stage: filter_violations
+    start = time.perf_counter()
+    for parent_sha, current_sha in pairs:
+        filter_new_violations.filter_violations(
+            filter_new_violations.parse_violations(violations[current_sha]),
+            filter_new_violations.parse_violations(violations[parent_sha]),
+            changes[current_sha],
+        )
+    results.append(summarize('filter_violations', time.perf_counter() - start, len(pairs), num_violations))
+
+    # Stage: end_to_end (filter_new_violations.main, run in the working directory with its output silenced)
+    current_dir = os.getcwd()
+    os.chdir(workdir)
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            filter_new_violations.main(repo_dir, commits[0])
+            for parent_sha, current_sha in pairs:
+                filter_new_violations.main(repo_dir, current_sha, parent_sha)
+        end_to_end_time = time.perf_counter() - start
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        os.chdir(current_dir)
+    results.append(summarize('end_to_end', end_to_end_time, len(commits), num_violations))
+
+    # Return the configuration and the results
+    return {
+        'config': {
+            'commits': args.commits,
+            'files': args.files,
+            'lines': args.lines,
+            'diff_size': args.diff_size,
+            'files_per_commit': args.files_per_commit,
+            'rename_rate': args.rename_rate,
+            'violation_density': args.violation_density,
+            'seed': args.seed,
+        },
+        'generation_time': generation_time,
+        'num_violations': num_violations,
+        'results': results,
+        'peak_memory': {
+            'end_to_end_traced_bytes': traced_peak,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the violation-differencing pipeline on a synthetic history.')
+    parser.add_argument('--project', default='synthetic')
+    parser.add_argument('--commits', type=int, default=30)
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--lines', type=int, default=500)
+    parser.add_argument('--diff-size', type=int, default=20)
+    parser.add_argument('--files-per-commit', type=int, default=3)
+    parser.add_argument('--rename-rate', type=float, default=0.05)
+    parser.add_argument('--violation-density', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_violation_filter_results.json', help='The JSON file to save the results to.')
+    args = parser.parse_args()
+
+    # Run the benchmark in a temporary directory
+    workdir = tempfile.mkdtemp(prefix='bench-violation-filter-')
+    try:
+        report = run_benchmark(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Print and save the results
+    for result in report['results']:
+        print(f"{result['stage']:<20} {result['total_time']:8.3f}s "
+              f"{result['commits_per_second'] or 0:10.1f} commits/s {result['violations_per_second'] or 0:12.1f} violations/s")
+    print(f"peak traced memory: {report['peak_memory']['end_to_end_traced_bytes'] / 1e6:.1f}MB, "
+          f"max RSS: {report['peak_memory']['max_rss_kb'] / 1e3:.1f}MB")
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results saved to {args.output}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import random
+import argparse
+
+# Add the scripts directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parse_continuous_analysis_output import dylin_spec_dict
+
+
+"""
+This script is used to generate a realistic continuous-analysis-output folder for benchmarking parse_continuous_analysis_output.py.
+It should create the following folders at configurable sizes:
+- {project}_original_output: results, pytest output, coverage, commit info and JUnit XML report
+- {project}_pymop_output: results, pytest output, JUnit XML report, D-time.json, D-full.json (events) and D-violations.json
+- {project}_dylin_output: results, pytest output, JUnit XML report, findings csv and findings txt
+
+Usage: python3 generate_parser_corpus.py <output_dir> [options]
+"""
+
+
+def write_pytest_output(path, num_lines, num_tests, rng):
+    # A verbose pytest output followed by the summary line
+    with open(path, 'w') as f:
+        for i in range(num_lines):
+            f.write(f'tests/test_module_{i % 50}.py::test_case_{i} PASSED [{rng.randint(0, 100)}%] some captured output {rng.getrandbits(64):x}\n')
+        f.write(f'==== {num_tests - 3} passed, 2 failed, 1 skipped in {rng.uniform(10, 100):.2f}s ====\n')
+
+
+def write_junit(path, num_tests, scale, rng):
+    # A JUnit XML report with one test case per test
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?><testsuites><testsuite name="pytest">\n')
+        for i in range(num_tests):
+            f.write(f'<testcase classname="tests.test_module_{i % 50}" name="test_case_{i}" time="{rng.uniform(0, 0.5) * scale:.4f}"/>\n')
+        f.write('</testsuite></testsuites>\n')
+
+
+def write_results(path, lines):
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def generate_corpus(output_dir, project='synthetic', num_violations=10000, num_specs=100, num_events=100000,
+                    num_findings=5000, num_output_lines=50000, num_tests=2000, num_files=200, seed=0):
+    """
+    Generate the continuous-analysis-output folder of one commit.
+
+    Args:
+        output_dir: The directory to create the continuous-analysis-output folder in.
+        project: The name of the project.
+        num_violations: The number of PyMOP violations (D-violations.json).
+        num_specs: The number of PyMOP specs.
+        num_events: The number of distinct event counters over all specs (D-full.json).
+        num_findings: The number of DyLin findings (findings txt).
+        num_output_lines: The number of lines of each pytest output.
+        num_tests: The number of tests.
+        num_files: The number of project files the violations are located in.
+        seed: The random seed.
+
+    Returns:
+        The path to the continuous-analysis-output folder.
+    """
+    rng = random.Random(seed)
+    root = os.path.join(output_dir, 'continuous-analysis-output')
+    original_folder = os.path.join(root, f'{project}_original_output')
+    pymop_folder = os.path.join(root, f'{project}_pymop_output')
+    dylin_folder = os.path.join(root, f'{project}_dylin_output')
+    for folder in [original_folder, pymop_folder, dylin_folder]:
+        os.makedirs(folder, exist_ok=True)
+    specs = [f'Spec_{i}' for i in range(num_specs)]
+    files = [f'pkg/module_{i}.py' for i in range(num_files)]
+
+    # Original output
+    write_results(os.path.join(original_folder, f'{project}_results.txt'), [
+        'Test Time: 42.0s', 'Peak RSS: 123456KB', 'User CPU Time: 40.1s', 'System CPU Time: 1.2s',
+        'Read Bytes: 4096B', 'Write Bytes: 8192B',
+    ])
+    write_pytest_output(os.path.join(original_folder, f'{project}_Output.txt'), num_output_lines, num_tests, rng)
+    write_junit(os.path.join(original_folder, f'{project}_junit.xml'), num_tests, 1.0, rng)
+    with open(os.path.join(original_folder, f'{project}_coverage.xml'), 'w') as f:
+        f.write('<?xml version="1.0" ?><coverage line-rate="0.75" branch-rate="0.5"></coverage>\n')
+    write_results(os.path.join(original_folder, f'{project}_commit_info.txt'), [
+        'Commit timestamp:= 1700000000', 'Commit message:= synthetic commit',
+    ])
+
+    # PyMOP output
+    write_results(os.path.join(pymop_folder, f'{project}_results.txt'), ['Test Time: 120.0s', 'Peak RSS: 654321KB'])
+    write_pytest_output(os.path.join(pymop_folder, f'{project}_Output.txt'), num_output_lines, num_tests, rng)
+    write_junit(os.path.join(pymop_folder, f'{project}_junit.xml'), num_tests, 3.0, rng)
+    with open(os.path.join(pymop_folder, 'D-time.json'), 'w') as f:
+        json.dump({'instrumentation_duration': 5.0, 'create_monitor_duration': 2.5, 'test_duration': 110.0}, f)
+    events_per_spec = max(1, num_events // max(1, num_specs))
+    with open(os.path.join(pymop_folder, 'D-full.json'), 'w') as f:
+        json.dump({
+            spec: {
+                'monitors': rng.randint(0, 10000),
+                'events': {f'event_{j}': rng.randint(1, 100000) for j in range(events_per_spec)},
+            }
+            for spec in specs
+        }, f)
+    violations = {}
+    for i in range(num_violations):
+        spec = rng.choice(specs)
+        if rng.random() < 0.3:
+            file_name = f'/workspace/pymop-venv/lib/python3.12/site-packages/lib_{i % 20}/module.py'
+        else:
+            file_name = f'/workspace/{project}-pymop/{rng.choice(files)}'
+        violations.setdefault(spec, []).append({
+            'violation': f'Spec {spec} violated, file_name: {file_name}, line_num: {rng.randint(1, 2000)}, message',
+            'test': f'tests/test_module_{i % 50}.py::test_case_{rng.randint(0, num_tests - 1)}',
+        })
+    with open(os.path.join(pymop_folder, 'D-violations.json'), 'w') as f:
+        json.dump(violations, f)
+
+    # DyLin output
+    write_results(os.path.join(dylin_folder, f'{project}_results.txt'), [
+        'Instrumentation Time: 10.0s', 'Test Time: 200.0s', 'Post-Run Time: 3.0s', 'Peak RSS: 234567KB',
+    ])
+    write_pytest_output(os.path.join(dylin_folder, f'{project}_Output.txt'), num_output_lines, num_tests, rng)
+    write_junit(os.path.join(dylin_folder, f'{project}_junit.xml'), num_tests, 5.0, rng)
+    dylin_codes = list(dylin_spec_dict.keys())
+    findings_count = {}
+    with open(os.path.join(dylin_folder, f'{project}_findings.txt'), 'w') as f:
+        for i in range(num_findings):
+            code = rng.choice(dylin_codes)
+            findings_count[dylin_spec_dict[code]] = findings_count.get(dylin_spec_dict[code], 0) + 1
+            f.write(f'{code}: /home/runner/work/{project}-dylin/{rng.choice(files)}.orig: {rng.randint(1, 2000)}: message\n')
+    with open(os.path.join(dylin_folder, f'{project}_findings.csv'), 'w') as f:
+        for spec_name, count in findings_count.items():
+            f.write(f'{spec_name},{count}\n')
+
+    # Return the path to the continuous-analysis-output folder
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a continuous-analysis-output folder for benchmarking the parser.')
+    parser.add_argument('output_dir', help='The directory to create the continuous-analysis-output folder in.')
+    parser.add_argument('--project', default='synthetic')
+    parser.add_argument('--violations', type=int, default=10000)
+    parser.add_argument('--specs', type=int, default=100)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--findings', type=int, default=5000)
+    parser.add_argument('--output-lines', type=int, default=50000)
+    parser.add_argument('--tests', type=int, default=2000)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    root = generate_corpus(
+        args.output_dir, args.project, args.violations, args.specs, args.events, args.findings,
+        args.output_lines, args.tests, args.files, args.seed,
+    )
+    print(f'Generated parser corpus in {root}')
+
+
+if __name__ == "__main__":
+    main()
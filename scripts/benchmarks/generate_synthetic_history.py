@@ -0,0 +1,196 @@
+import os
+import sys
+import csv
+import random
+import argparse
+import subprocess
+
+
+"""
+This script is used to generate a synthetic git history with violations for benchmarking the violation-differencing pipeline.
+It should create the following:
+- A git repository ({project}-original) with a configurable number of commits, Python files, diff sizes and renames
+- A continuous_analysis_over_time_results.csv file with a PyMOP and a DyLin row for each commit
+
+The violations are attached to source lines, so they move with the lines when code is inserted or deleted above them,
+and new violations are added on new lines with the configured density. This gives a realistic mix of new and old
+violations for filter_new_violations.py.
+
+Usage: python3 generate_synthetic_history.py <output_dir> [options]
+"""
+
+
+# The specs used for the synthetic violations (PyMOP specs and DyLin analyses)
+PYMOP_SPECS = ['UnsafeListIterator', 'ArgParse_Parent', 'Console_CloseReader', 'File_MustClose', 'Sets_Comparable']
+DYLIN_SPECS = ['InvalidComparisonAnalysis', 'StringConcatAnalysis', 'ItemInListAnalysis']
+
+# The library files used for the synthetic violations in site-packages
+LIBRARY_FILES = [f'/lib/python3.12/site-packages/lib{i}/module.py' for i in range(5)]
+
+
+class SyntheticFile:
+    """
+    A synthetic Python file: a list of unique source lines and the violations attached to some of them.
+    """
+
+    def __init__(self, path, num_lines, rng, density):
+        self.path = path
+        self.rng = rng
+        self.density = density
+        self.lines = [self.new_line() for _ in range(num_lines)]
+
+    def new_line(self):
+        # A unique source line, with a violation (tool, spec) attached with the configured density
+        line_id = self.rng.getrandbits(48)
+        violation = None
+        if self.rng.random() < self.density:
+            if self.rng.random() < 0.7:
+                violation = ('pymop', self.rng.choice(PYMOP_SPECS))
+            else:
+                violation = ('dylin', self.rng.choice(DYLIN_SPECS))
+        return (f'value_{line_id:012x} = {line_id % 997}', violation)
+
+    def edit(self, diff_size):
+        # Apply a random mix of insertions, deletions and modifications of about diff_size lines
+        remaining = diff_size
+        while remaining > 0:
+            size = min(remaining, self.rng.randint(1, max(1, diff_size // 3)))
+            position = self.rng.randint(0, len(self.lines))
+            kind = self.rng.random()
+            if kind < 0.5 or len(self.lines) <= size:
+                self.lines[position:position] = [self.new_line() for _ in range(size)]
+            elif kind < 0.8:
+                del self.lines[position:position + size]
+            else:
+                self.lines[position:position + size] = [self.new_line() for _ in range(size)]
+            remaining -= size
+
+    def write(self, repo_dir):
+        full_path = os.path.join(repo_dir, self.path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write('\n'.join(line for line, _ in self.lines) + '\n')
+
+    def violations(self):
+        # The violations of the file by tool, with the file path in the format of the parser output
+        violations = {'pymop': [], 'dylin': []}
+        for line_num, (_, violation) in enumerate(self.lines, start=1):
+            if violation is not None:
+                tool, spec = violation
+                violations[tool].append(f'{spec}:/{self.path}:{line_num}')
+        return violations
+
+
+def git(repo_dir, *args):
+    return subprocess.run(['git', '-C', repo_dir] + list(args), check=True, capture_output=True, text=True).stdout.strip()
+
+
+def generate_history(output_dir, project='synthetic', num_commits=50, num_files=20, lines_per_file=500,
+                     diff_size=20, files_per_commit=3, rename_rate=0.05, violation_density=0.05, seed=0):
+    """
+    Generate a synthetic git history and the over time results of each commit.
+
+    Args:
+        output_dir: The directory to create the repository and the results file in.
+        project: The name of the project.
+        num_commits: The number of commits.
+        num_files: The number of Python files.
+        lines_per_file: The initial number of lines of each file.
+        diff_size: The number of changed lines per changed file per commit.
+        files_per_commit: The number of files changed per commit.
+        rename_rate: The probability that a commit renames a file.
+        violation_density: The probability that a line has a violation.
+        seed: The random seed.
+
+    Returns:
+        A tuple containing the repository path and the list of commit SHAs (oldest first).
+    """
+    rng = random.Random(seed)
+    repo_dir = os.path.join(output_dir, f'{project}-original')
+    os.makedirs(repo_dir, exist_ok=True)
+    git(repo_dir, 'init', '-q')
+    git(repo_dir, 'config', 'user.email', 'bench@example.com')
+    git(repo_dir, 'config', 'user.name', 'bench')
+
+    # Create the initial files
+    files = [SyntheticFile(f'pkg/module_{i}.py', lines_per_file, rng, violation_density) for i in range(num_files)]
+
+    # Create the over time results file
+    results_file = os.path.join(output_dir, 'continuous_analysis_over_time_results.csv')
+    fieldnames = ['project', 'timestamp', 'commit_sha', 'commit_timestamp', 'commit_message', 'algorithm',
+                  'coverage', 'total_violations_count', 'violations_by_location', 'violations_by_test']
+    commits = []
+    with open(results_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+
+        for commit_index in range(num_commits):
+            # Edit some files (the first commit adds all the files)
+            if commit_index > 0:
+                for synthetic_file in rng.sample(files, min(files_per_commit, len(files))):
+                    synthetic_file.edit(diff_size)
+                    synthetic_file.write(repo_dir)
+                    if rng.random() < rename_rate:
+                        new_path = synthetic_file.path.replace('.py', f'_r{commit_index}.py')
+                        git(repo_dir, 'mv', synthetic_file.path, new_path)
+                        synthetic_file.path = new_path
+                        synthetic_file.write(repo_dir)
+            else:
+                for synthetic_file in files:
+                    synthetic_file.write(repo_dir)
+
+            # Commit the changes
+            git(repo_dir, 'add', '-A')
+            git(repo_dir, 'commit', '-q', '-m', f'synthetic commit {commit_index}')
+            sha = git(repo_dir, 'rev-parse', 'HEAD')
+            commits.append(sha)
+
+            # Write the PyMOP and DyLin rows of the commit
+            violations = {'pymop': [], 'dylin': []}
+            for synthetic_file in files:
+                for tool, file_violations in synthetic_file.violations().items():
+                    violations[tool].extend(file_violations)
+            violations['pymop'].extend(
+                f'{rng.choice(PYMOP_SPECS)}:{library_file}:{rng.randint(1, 200)}' for library_file in LIBRARY_FILES
+            )
+            for tool in ['pymop', 'dylin']:
+                writer.writerow({
+                    'project': project,
+                    'timestamp': f'2025010{commit_index % 10}_000000',
+                    'commit_sha': sha,
+                    'commit_timestamp': 1700000000 + commit_index,
+                    'commit_message': f'synthetic commit {commit_index}',
+                    'algorithm': tool,
+                    'coverage': '50.0',
+                    'total_violations_count': len(violations[tool]),
+                    'violations_by_location': ';'.join(f'{v}=1' for v in violations[tool]),
+                    'violations_by_test': ';'.join(f"{v}={{'tests/test_{i % 7}.py::test_{i}'}}" for i, v in enumerate(violations[tool])),
+                })
+
+    # Return the repository path and the commits
+    return repo_dir, commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic git history with violations.')
+    parser.add_argument('output_dir', help='The directory to create the repository and the results file in.')
+    parser.add_argument('--project', default='synthetic')
+    parser.add_argument('--commits', type=int, default=50)
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--lines', type=int, default=500)
+    parser.add_argument('--diff-size', type=int, default=20)
+    parser.add_argument('--files-per-commit', type=int, default=3)
+    parser.add_argument('--rename-rate', type=float, default=0.05)
+    parser.add_argument('--violation-density', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    repo_dir, commits = generate_history(
+        args.output_dir, args.project, args.commits, args.files, args.lines, args.diff_size,
+        args.files_per_commit, args.rename_rate, args.violation_density, args.seed,
+    )
+    print(f'Generated {len(commits)} commits in {repo_dir}')
+
+
+if __name__ == "__main__":
+    sys.exit(main())
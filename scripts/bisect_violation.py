@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import os
+import ast
+import sys
+import uuid
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import TYPE_CHECKING
+from track_commit_changes import track_changes, get_original_line_num
+from filter_new_violations import is_library_path, normalize_filepath
+from parse_continuous_analysis_output import get_num_violations_from_json, get_violations_from_dylin_findings
+
+# pandas and GitPython are slow to import, they are only imported by the functions that use them
+if TYPE_CHECKING:
+    from git import Repo
+
+
+"""
+This script is used to find the commit that introduced a violation by bisecting a commit range.
+Given a violation key (spec:filepath:line_num), a good commit (without the violation) and a bad commit (with the violation), it:
+- Lists the commits between the good and bad commit (first-parent ancestry path)
+- Follows the location of the violation back to each tested commit through the track_changes line mapping
+  (a commit where the line does not exist yet is known to be good without running anything)
+- Re-runs only the tests that triggered the violation (violations_by_test of the bad commit) under PyMOP or DyLin
+- Finds the first commit with the violation in O(log n) test runs
+
+The tests are run in a temporary git worktree of each tested commit, in the current Python environment
+(which must have the project dependencies and PyMOP or DyLin installed). The worktree is installed in the environment
+(unless --no-install is given) and put first on the PYTHONPATH, so the tests import the code of the tested commit and
+not the code of the project already installed.
+
+Usage: python3 bisect_violation.py <repo_path> <good_sha> <bad_sha> <violation_key> [options]
+"""
+
+
+def parse_violation_key(violation_key: str) -> tuple:
+    """
+    Parse a violation key to a tuple (spec, filepath, line_num).
+
+    Args:
+        violation_key: The violation key (spec:filepath:line_num, optionally followed by =count).
+
+    Returns:
+        A tuple (spec, filepath, line_num).
+    """
+    spec, filepath, line_num = violation_key.split('=')[0].split(':')
+    return spec, filepath, int(line_num)
+
+
+def get_tests_of_violation(results_csv: str, commit_sha: str, tool: str, violation_key: str) -> list:
+    """
+    Get the tests that triggered a violation from the violations_by_test column of the over time results.
+
+    Args:
+        results_csv: The path to the continuous_analysis_over_time_results.csv file.
+        commit_sha: The SHA of the commit with the violation.
+        tool: The analysis tool (pymop or dylin).
+        violation_key: The violation key (spec:filepath:line_num).
+
+    Returns:
+        A list of pytest node ids (empty if the tests are unknown).
+    """
+    import pandas as pd
+
+    # Get the violations_by_test value of the commit for the tool
+    df = pd.read_csv(results_csv)
+    df_commit = df[(df['commit_sha'] == commit_sha) & (df['algorithm'] == tool)]
+    if df_commit.empty or pd.isna(df_commit['violations_by_test'].iloc[0]):
+        return []
+    violations_by_test = df_commit['violations_by_test'].iloc[0]
+
+    # Find the entry of the violation (location={'test1', 'test2'})
+    location = violation_key.split('=')[0]
+    for entry in violations_by_test.split(';'):
+        entry_location, _, test_ids = entry.partition('=')
+        if entry_location == location:
+            return sorted(ast.literal_eval(test_ids))
+    return []
+
+
+def get_commits_to_bisect(repo: Repo, good_sha: str, bad_sha: str) -> list:
+    """
+    Get the commits between the good and bad commit, from oldest to newest (the bad commit is the last one).
+
+    Args:
+        repo: The repository.
+        good_sha: The SHA of the good commit (excluded).
+        bad_sha: The SHA of the bad commit (included).
+
+    Returns:
+        A list of commit SHAs.
+    """
+    commits = repo.git.rev_list('--reverse', '--first-parent', '--ancestry-path', f'{good_sha}..{bad_sha}')
+    return commits.split()
+
+
+def locate_violation(repo_path: str, commit_sha: str, bad_sha: str, filepath: str, line_num: int) -> tuple:
+    """
+    Follow the location of a violation in the bad commit back to another commit.
+
+    Args:
+        repo_path: The path to the repository.
+        commit_sha: The SHA of the commit to locate the violation in.
+        bad_sha: The SHA of the bad commit.
+        filepath: The filepath of the violation in the bad commit (relative to the repository root).
+        line_num: The line number of the violation in the bad commit.
+
+    Returns:
+        A tuple (filepath, line_num) in the commit, or None if the line does not exist in the commit.
+    """
+    changes = track_changes(repo_path, commit_sha, bad_sha)
+
+    # If the line was added or modified since the commit, it does not exist in the commit
+    for start, end in changes['new_file_changes'].get(filepath, []):
+        if start <= line_num <= end:
+            return None
+
+    # Map the filepath and line number back to the commit
+    old_filepath = changes['renames'].get(filepath, filepath)
+    old_line_num = get_original_line_num(changes['offsets'].get(filepath, {}), line_num)
+    if old_line_num is None:
+        return None
+    return old_filepath, old_line_num
+
+
+def get_worktree_env(worktree: str, env: dict = None) -> dict:
+    # The environment of the test runs, with the worktree (and its src directory for a src layout) first on the PYTHONPATH
+    env = dict(os.environ if env is None else env)
+    paths = [worktree]
+    if os.path.isdir(os.path.join(worktree, 'src')):
+        paths.append(os.path.join(worktree, 'src'))
+    if env.get('PYTHONPATH'):
+        paths.append(env['PYTHONPATH'])
+    env['PYTHONPATH'] = os.pathsep.join(paths)
+    return env
+
+
+def run_pymop(worktree: str, tests: list, specs_path: str) -> dict:
+    """
+    Run the tests with PyMOP and get the violations by location.
+
+    Args:
+        worktree: The path to the worktree of the commit.
+        tests: The pytest node ids to run (all tests if empty).
+        specs_path: The path to the PyMOP specs.
+
+    Returns:
+        A dictionary of the violations by location (spec:filepath:line_num -> count).
+    """
+    subprocess.run(
+        ['pytest', '-W', 'ignore::DeprecationWarning', f'--path={specs_path}', '--algo=D',
+         '--continue-on-collection-errors', '--statistics', '--statistics_file=D.json'] + tests,
+        cwd=worktree, env=get_worktree_env(worktree), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    # Read the violations written by PyMOP
+    current_dir = os.getcwd()
+    os.chdir(worktree)
+    try:
+        ret_violation = get_num_violations_from_json()
+    finally:
+        os.chdir(current_dir)
+    if ret_violation is None:
+        return {}
+    return ret_violation[4]
+
+
+def run_dylin(worktree: str, tests: list) -> dict:
+    """
+    Instrument the worktree and run the tests with DyLin, then get the violations by location.
+
+    Args:
+        worktree: The path to the worktree of the commit.
+        tests: The pytest node ids to run (all tests if empty).
+
+    Returns:
+        A dictionary of the violations by location (spec:filepath:line_num -> count).
+    """
+    # Generate a unique session ID for the DynaPyt run and select the analyses
+    session_id = str(uuid.uuid4())
+    output_dir = os.path.join(tempfile.gettempdir(), f'dynapyt_output-{session_id}')
+    analyses_file = os.path.join(tempfile.gettempdir(), f'dynapyt_analyses-{session_id}.txt')
+    env = get_worktree_env(worktree, dict(os.environ, DYNAPYT_SESSION_ID=session_id))
+    with open(analyses_file, 'w') as f:
+        subprocess.run(
+            [sys.executable, '-m', 'dylin.select_checkers', '--include=All', '--exclude=None', f'--output_dir={output_dir}'],
+            stdout=f, env=env,
+        )
+
+    # Instrument the worktree, run the tests and generate the findings
+    findings_file = os.path.join(worktree, 'findings.txt')
+    subprocess.run(
+        [sys.executable, '-m', 'dynapyt.run_instrumentation', '--directory=.', f'--analysisFile={analyses_file}'],
+        cwd=worktree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    subprocess.run(
+        ['pytest', '-W', 'ignore::DeprecationWarning', '--continue-on-collection-errors'] + tests,
+        cwd=worktree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    subprocess.run(
+        [sys.executable, '-m', 'dynapyt.post_run', '--coverage_dir=', f'--output_dir={output_dir}'],
+        cwd=worktree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    with open(findings_file, 'w') as f:
+        subprocess.run(
+            [sys.executable, '-m', 'dylin.format_output', f'--findings_path={output_dir}/output.json'],
+            cwd=worktree, env=env, stdout=f, stderr=subprocess.DEVNULL,
+        )
+
+    # Read the violations from the findings
+    violations_by_location, _ = get_violations_from_dylin_findings(findings_file)
+    return violations_by_location
+
+
+def has_violation(violations_by_location: dict, spec: str, filepath: str, line_num: int, worktree: str) -> bool:
+    """
+    Check if a violation is in the violations by location of a run.
+
+    Args:
+        violations_by_location: A dictionary of the violations by location of the run.
+        spec: The spec of the violation.
+        filepath: The filepath of the violation (relative to the repository root for project files).
+        line_num: The line number of the violation.
+        worktree: The path to the worktree the run was executed in.
+
+    Returns:
+        True if the violation was found.
+    """
+    for location in violations_by_location:
+        found_spec, found_filepath, found_line_num = location.rsplit(':', 2)
+        if found_spec != spec or int(found_line_num) != line_num:
+            continue
+        # Make the filepath relative to the worktree for project files
+        if found_filepath.startswith(worktree):
+            found_filepath = found_filepath[len(worktree):]
+        found_filepath = normalize_filepath(found_filepath)
+        if found_filepath == filepath or found_filepath.endswith(f'/{filepath}'):
+            return True
+    return False
+
+
+def check_commit(repo: Repo, commit_sha: str, bad_sha: str, violation: tuple, tests: list, args) -> bool:
+    """
+    Check if a violation is present in a commit.
+
+    Args:
+        repo: The repository.
+        commit_sha: The SHA of the commit to check.
+        bad_sha: The SHA of the bad commit.
+        violation: A tuple (spec, filepath, line_num) of the violation in the bad commit.
+        tests: The pytest node ids to run.
+        args: The command line arguments.
+
+    Returns:
+        True if the violation is present in the commit.
+    """
+    spec, filepath, line_num = violation
+
+    # Follow the location of the violation back to the commit (library locations cannot be mapped)
+    if is_library_path(filepath):
+        location = (filepath, line_num)
+    else:
+        location = locate_violation(repo.working_dir, commit_sha, bad_sha, normalize_filepath(filepath), line_num)
+        if location is None:
+            print(f"{commit_sha}: location does not exist yet, violation absent")
+            return False
+    commit_filepath, commit_line_num = location
+
+    # Create a worktree of the commit and run the tests in it
+    worktree = tempfile.mkdtemp(prefix='bisect-violation-')
+    repo.git.worktree('add', '--detach', worktree, commit_sha)
+    try:
+        if args.install:
+            subprocess.run([sys.executable, '-m', 'pip', 'install', '-q', '.'], cwd=worktree)
+        if args.tool == 'pymop':
+            violations_by_location = run_pymop(worktree, tests, args.specs_path)
+        else:
+            violations_by_location = run_dylin(worktree, tests)
+    finally:
+        repo.git.worktree('remove', '--force', worktree)
+        shutil.rmtree(worktree, ignore_errors=True)
+
+    present = has_violation(violations_by_location, spec, commit_filepath, commit_line_num, worktree)
+    print(f"{commit_sha}: {commit_filepath}:{commit_line_num} -> violation {'present' if present else 'absent'}")
+    return present
+
+
+def bisect_violation(repo_path: str, good_sha: str, bad_sha: str, violation_key: str, args) -> str:
+    """
+    Find the commit that introduced a violation.
+
+    Args:
+        repo_path: The path to the repository.
+        good_sha: The SHA of a commit without the violation.
+        bad_sha: The SHA of a commit with the violation.
+        violation_key: The violation key (spec:filepath:line_num).
+        args: The command line arguments.
+
+    Returns:
+        The SHA of the first commit with the violation.
+    """
+    from git import Repo
+
+    repo = Repo(repo_path)
+    violation = parse_violation_key(violation_key)
+
+    # Get the tests that triggered the violation in the bad commit
+    tests = args.tests
+    if not tests and args.results_csv:
+        tests = get_tests_of_violation(args.results_csv, bad_sha, args.tool, violation_key)
+    if not tests:
+        print("No tests found for the violation, running the whole test suite")
+
+    # Bisect the commits: commits[lo] is known good (-1 is the good commit), commits[hi] is known bad
+    commits = get_commits_to_bisect(repo, good_sha, bad_sha)
+    if not commits or commits[-1] != repo.commit(bad_sha).hexsha:
+        raise ValueError(f'No commits to bisect: {good_sha} must be a first-parent ancestor of {bad_sha} (and differ from it)')
+    print(f"Bisecting {len(commits)} commits with {len(tests)} tests")
+    lo, hi = -1, len(commits) - 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if check_commit(repo, commits[mid], bad_sha, violation, tests, args):
+            hi = mid
+        else:
+            lo = mid
+
+    # Return the first commit with the violation
+    return commits[hi]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find the commit that introduced a violation.')
+    parser.add_argument('repo_path', help='The path to the repository.')
+    parser.add_argument('good_sha', help='The SHA of a commit without the violation.')
+    parser.add_argument('bad_sha', help='The SHA of a commit with the violation.')
+    parser.add_argument('violation_key', help='The violation key (spec:filepath:line_num).')
+    parser.add_argument('--tool', choices=['pymop', 'dylin'], default='pymop', help='The analysis tool that found the violation.')
+    parser.add_argument('--results-csv', default='continuous_analysis_over_time_results.csv', help='The over time results (for violations_by_test).')
+    parser.add_argument('--tests', nargs='*', default=[], help='The pytest node ids to run (overrides violations_by_test).')
+    parser.add_argument('--specs-path', default=os.path.join('..', 'pymop', 'pymop', 'specs-new'), help='The path to the PyMOP specs.')
+    parser.add_argument('--no-install', dest='install', action='store_false',
+                        help='Do not install the project of each worktree before running the tests (it is still put on the PYTHONPATH).')
+    args = parser.parse_args()
+
+    # Make the specs path absolute, as the tests are run in the worktrees
+    args.specs_path = os.path.abspath(args.specs_path)
+    if args.results_csv and not os.path.isfile(args.results_csv):
+        args.results_csv = None
+
+    try:
+        introducing_sha = bisect_violation(args.repo_path, args.good_sha, args.bad_sha, args.violation_key, args)
+    except ValueError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    print(f"\nViolation {args.violation_key} was introduced in commit {introducing_sha}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import io
+import os
+import sys
+import gzip
+import signal
+import argparse
+from collections import deque
+
+
+"""
+This script is used to capture the output of a test run (piped to its stdin) without keeping the whole output
+uncompressed on disk. It should write the following files:
+- <output_file>: the last lines of the output (a ring buffer of OUTPUT_TAIL_LINES lines, 2000 by default), which
+  has the pytest summary line and the failure sections read by parse_continuous_analysis_output.py
+- <output_file>.zst or <output_file>.gz: the whole output, compressed as it is written (zstd if the zstandard
+  module is available, gzip otherwise)
+
+The compression is set with OUTPUT_COMPRESSION (auto, zstd, gzip or none) and OUTPUT_COMPRESSION_LEVEL.
+With none, the whole output is written to <output_file> (the previous behavior).
+The files are completed when the input is closed (including when the test run is killed by a timeout) or when
+this script receives SIGTERM. The parser reads the compressed files transparently (see open_output_file).
+
+Only the standard library is used (and the zstandard module if it is installed).
+
+Usage: <command> | python3 capture_output.py <output_file>
+"""
+
+
+# The number of lines kept in the tail file, the size of the reads and the compression levels
+DEFAULT_TAIL_LINES = 2000
+CHUNK_SIZE = 1 << 16
+DEFAULT_LEVELS = {'zstd': 3, 'gzip': 1}
+COMPRESSED_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+
+
+def get_zstandard():
+    # Get the zstandard module (None if it is not installed)
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def resolve_compression(compression: str) -> str:
+    """
+    Get the compression used for the whole output.
+
+    Args:
+        compression: The requested compression (auto uses zstd if the zstandard module is available, gzip otherwise).
+
+    Returns:
+        The compression (zstd, gzip or none).
+    """
+    compression = (compression or 'auto').lower()
+    if compression == 'auto':
+        return 'zstd' if get_zstandard() is not None else 'gzip'
+    if compression == 'zstd' and get_zstandard() is None:
+        print('The zstandard module is not installed, the output is compressed with gzip', file=sys.stderr)
+        return 'gzip'
+    if compression not in ('zstd', 'gzip', 'none'):
+        raise ValueError(f"Unknown output compression: {compression}")
+    return compression
+
+
+def open_compressed(path: str, compression: str, level: int = None):
+    # Open a binary file that compresses what is written to it
+    level = level if level is not None else DEFAULT_LEVELS[compression]
+    if compression == 'zstd':
+        zstandard = get_zstandard()
+        return zstandard.ZstdCompressor(level=level).stream_writer(open(path, 'wb'), closefd=True)
+    return gzip.open(path, 'wb', compresslevel=level)
+
+
+def capture(stream, output_file: str, tail_lines: int = DEFAULT_TAIL_LINES, compression: str = 'auto',
+            level: int = None) -> dict:
+    """
+    Capture an output stream to a tail file and a compressed file.
+
+    Args:
+        stream: The binary stream to capture (read until it is closed).
+        output_file: The path of the tail file (the compressed file has the suffix of the compression added).
+        tail_lines: The number of lines kept in the tail file.
+        compression: The compression of the whole output (see resolve_compression).
+        level: The compression level (the default level of the compression if not given).
+
+    Returns:
+        The number of lines and bytes of the output, and the path of the compressed file (None for no compression).
+    """
+    compression = resolve_compression(compression)
+    if compression == 'none':
+        full_file = None
+        full = open(output_file, 'wb')
+    else:
+        full_file = output_file + COMPRESSED_SUFFIXES[compression]
+        full = open_compressed(full_file, compression, level)
+
+    # The tail keeps the complete lines, the partial last line is kept until its end is read
+    tail = deque(maxlen=max(tail_lines, 1))
+    partial = b''
+    total_lines = 0
+    total_bytes = 0
+    try:
+        while True:
+            chunk = stream.read1(CHUNK_SIZE) if hasattr(stream, 'read1') else stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            full.write(chunk)
+            total_bytes += len(chunk)
+            lines = (partial + chunk).split(b'\n')
+            partial = lines.pop()
+            total_lines += len(lines)
+            tail.extend(lines)
+    finally:
+        full.close()
+        if partial:
+            tail.append(partial)
+            total_lines += 1
+
+        # Write the tail file (with a note on the omitted lines, it must not look like a pytest summary line)
+        if full_file is not None:
+            omitted = total_lines - len(tail) if tail_lines > 0 else total_lines
+            with open(output_file, 'wb') as f:
+                if omitted > 0:
+                    f.write(f'[{omitted} earlier lines omitted, see {os.path.basename(full_file)}]\n'.encode())
+                if tail_lines > 0:
+                    f.writelines(line + b'\n' for line in tail)
+
+    return {'lines': total_lines, 'bytes': total_bytes, 'full_file': full_file}
+
+
+def open_output_file(path: str):
+    """
+    Open a captured output file for reading as text (decompressed if it is a compressed file).
+
+    Args:
+        path: The path of the output file (the tail file, or the .zst or .gz file of the whole output).
+
+    Returns:
+        The text file object.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', errors='replace')
+    if path.endswith('.zst'):
+        zstandard = get_zstandard()
+        if zstandard is None:
+            raise RuntimeError(f"The zstandard module is needed to read {path}")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True), errors='replace')
+    return open(path, 'r', errors='replace')
+
+
+def find_output_file(files: list, suffix: str = '_Output.txt') -> str:
+    """
+    Find the captured output file of a run in a list of files.
+
+    Args:
+        files: The file names.
+        suffix: The suffix of the output file.
+
+    Returns:
+        The tail file (or the whole output if it was not compressed), the compressed file of the whole output if
+        there is no tail file, or None.
+    """
+    for candidates in ([suffix], [suffix + '.zst', suffix + '.gz']):
+        for candidate in candidates:
+            matches = sorted(f for f in files if f.endswith(candidate))
+            if matches:
+                return matches[0]
+    return None
+
+
+def handle_sigterm(signum, frame):
+    # Stop reading and complete the files (the runner is being stopped)
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Capture the output of a test run to a tail file and a compressed file.')
+    parser.add_argument('output_file', help='The tail file (the compressed file has the suffix of the compression added).')
+    parser.add_argument('--tail-lines', type=int, default=int(os.environ.get('OUTPUT_TAIL_LINES', DEFAULT_TAIL_LINES)))
+    parser.add_argument('--compression', default=os.environ.get('OUTPUT_COMPRESSION', 'auto'),
+                        help='The compression of the whole output (auto, zstd, gzip or none).')
+    parser.add_argument('--level', type=int, default=int(os.environ['OUTPUT_COMPRESSION_LEVEL']) if os.environ.get('OUTPUT_COMPRESSION_LEVEL') else None)
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    try:
+        capture(sys.stdin.buffer, args.output_file, args.tail_lines, args.compression, args.level)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
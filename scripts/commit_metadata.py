@@ -0,0 +1,172 @@
+import os
+import csv
+import sys
+import argparse
+import subprocess
+
+
+"""
+This script is used to extract the metadata of many commits of a repository in a single git log pass.
+It should return the following information for each commit:
+- The SHA and the parent SHAs of the commit
+- The author timestamp, the author name and email, and the subject of the commit message
+
+The metadata is saved as a CSV table (commit_metadata.csv by default) that the pipeline scripts index by SHA,
+so replaying a history does not run git log (and write a commit info file) for each commit.
+
+The table is found through the COMMIT_METADATA_FILE environment variable (or commit_metadata.csv in the working
+directory).
+
+Usage: python3 commit_metadata.py <repo_path> [<revision>...] [--no-walk] [--all] [--output <commit_metadata.csv>]
+"""
+
+
+# The columns of the commit metadata table
+COMMIT_METADATA_COLUMNS = ['sha', 'parents', 'timestamp', 'author_name', 'author_email', 'message']
+
+# The default commit metadata table (relative to the working directory)
+DEFAULT_COMMIT_METADATA_FILE = 'commit_metadata.csv'
+
+# The git log format of the columns (separated by a unit separator, the records are separated by NUL with -z)
+GIT_LOG_FORMAT = '%x1f'.join(['%H', '%P', '%at', '%an', '%ae', '%s'])
+
+# The loaded tables (path -> (mtime_ns, size, index))
+_tables = {}
+
+
+def extract_commit_metadata(repo_path: str, revisions: list = None, no_walk: bool = False, all_refs: bool = False) -> list:
+    """
+    Extract the metadata of the commits of a repository with a single git log process.
+
+    Args:
+        repo_path: The path to the repository.
+        revisions: The revisions given to git log (e.g. HEAD, main, a..b), HEAD if not given (and all_refs is not set).
+        no_walk: Only extract the given commits, not their ancestors.
+        all_refs: Extract the commits of all the refs (e.g. all the branches and pull requests of a mirror).
+
+    Returns:
+        A list of dictionaries with the COMMIT_METADATA_COLUMNS of each commit, in the order of git log.
+    """
+    command = ['git', '-C', repo_path, 'log', '-z', f'--format={GIT_LOG_FORMAT}']
+    if no_walk:
+        command.append('--no-walk=unsorted')
+    if all_refs:
+        command.append('--all')
+
+    # The revisions are given through the standard input, so any number of commits can be extracted
+    command.append('--stdin')
+    revisions = revisions or ([] if all_refs else ['HEAD'])
+    output = subprocess.run(command, input='\n'.join(revisions) + '\n', capture_output=True, text=True, check=True).stdout
+
+    records = []
+    for entry in output.split('\0'):
+        entry = entry.strip('\n')
+        if not entry:
+            continue
+        records.append(dict(zip(COMMIT_METADATA_COLUMNS, entry.split('\x1f'))))
+    return records
+
+
+def write_commit_metadata(records: list, output_file: str):
+    """
+    Write the commit metadata table.
+
+    Args:
+        records: The metadata of the commits (see extract_commit_metadata).
+        output_file: The CSV file to write.
+    """
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COMMIT_METADATA_COLUMNS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def get_commit_metadata_file() -> str:
+    """
+    Get the absolute path of the commit metadata table, or None if there is no table.
+    """
+    metadata_file = os.environ.get('COMMIT_METADATA_FILE') or DEFAULT_COMMIT_METADATA_FILE
+    if not os.path.isfile(metadata_file):
+        return None
+    return os.path.abspath(metadata_file)
+
+
+def load_commit_metadata(metadata_file: str) -> dict:
+    """
+    Load the commit metadata table, indexed by SHA.
+    The table is only read again when the file changes.
+
+    Args:
+        metadata_file: The CSV file of the table.
+
+    Returns:
+        A dictionary of SHA -> metadata of the commit.
+    """
+    stat = os.stat(metadata_file)
+    cached = _tables.get(metadata_file)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(metadata_file, 'r', newline='') as f:
+        index = {record['sha']: record for record in csv.DictReader(f)}
+    _tables[metadata_file] = (stat.st_mtime_ns, stat.st_size, index)
+    return index
+
+
+def get_commit(sha: str, metadata_file: str = None) -> dict:
+    """
+    Get the metadata of a commit from the commit metadata table.
+
+    Args:
+        sha: The SHA of the commit (full or abbreviated).
+        metadata_file: The CSV file of the table (get_commit_metadata_file if not given).
+
+    Returns:
+        The metadata of the commit, or None if there is no table or the commit is not in it (or is ambiguous).
+    """
+    metadata_file = metadata_file or get_commit_metadata_file()
+    if not metadata_file or not sha:
+        return None
+    index = load_commit_metadata(metadata_file)
+    if sha in index:
+        return index[sha]
+
+    # Look up an abbreviated SHA
+    matches = [record for full_sha, record in index.items() if full_sha.startswith(sha)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def get_first_parent(sha: str, metadata_file: str = None) -> str:
+    """
+    Get the first parent of a commit from the commit metadata table.
+
+    Args:
+        sha: The SHA of the commit (full or abbreviated).
+        metadata_file: The CSV file of the table (get_commit_metadata_file if not given).
+
+    Returns:
+        The SHA of the first parent, or None if the commit has no parent or is not in the table.
+    """
+    commit = get_commit(sha, metadata_file)
+    if commit is None or not commit['parents']:
+        return None
+    return commit['parents'].split()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract the metadata of the commits of a repository.')
+    parser.add_argument('repo_path')
+    parser.add_argument('revisions', nargs='*', help='The revisions given to git log (HEAD if not given).')
+    parser.add_argument('--no-walk', action='store_true', help='Only extract the given commits, not their ancestors.')
+    parser.add_argument('--all', action='store_true', help='Extract the commits of all the refs.')
+    parser.add_argument('--output', default=DEFAULT_COMMIT_METADATA_FILE, help='The CSV file to write.')
+    args = parser.parse_args()
+
+    records = extract_commit_metadata(args.repo_path, args.revisions, args.no_walk, args.all)
+    write_commit_metadata(records, args.output)
+    print(f'Saved the metadata of {len(records)} commits to {args.output}')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
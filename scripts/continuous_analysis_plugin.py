@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import signal
+import pytest
+from junit_durations import nodeid_to_test_id, read_junit_durations
+from order_tests import order_tests
+
+
+"""
+This script is a pytest plugin used by the PyMOP and DyLin runner scripts.
+It is loaded with "-p continuous_analysis_plugin" (the scripts directory must be on the PYTHONPATH) and provides:
+- A per-test time budget derived from the per-test durations of the original run times an overhead factor.
+  A test that exceeds its budget is interrupted and recorded in the killed tests file, and the rest of the suite
+  keeps running so that the violations and findings of the other tests are still reported.
+- A graceful handling of SIGTERM (sent by "timeout" when the whole run exceeds its time limit).
+  The run is interrupted like a KeyboardInterrupt, so the session still finishes and PyMOP and DyLin
+  can write their statistics and findings for the tests that already ran.
+- A test order built from the violations and durations of the previous runs (see order_tests.py), so that a run
+  stopped by its time limit has run the changed tests and the tests that find the most violations per second.
+- A progress file with the number of collected and completed tests (read by parse_continuous_analysis_output.py),
+  updated while the tests run so that it is still there when the run is killed.
+
+Only the standard library and pytest are used, as this plugin runs inside the PyMOP and DyLin test environments.
+"""
+
+
+class PerTestTimeoutError(BaseException):
+    """
+    Raised in a test that exceeded its time budget.
+    It derives from BaseException so that it is not swallowed by "except Exception" blocks in the tests.
+    """
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("continuous-analysis")
+    group.addoption(
+        "--ca-durations-file",
+        default=None,
+        help="JUnit XML report of the original run, used to derive the per-test time budgets.",
+    )
+    group.addoption(
+        "--ca-timeout-factor",
+        type=float,
+        default=10.0,
+        help="Overhead factor applied to the original duration of each test (default: 10).",
+    )
+    group.addoption(
+        "--ca-timeout-min",
+        type=float,
+        default=60.0,
+        help="Minimum time budget of a test in seconds (default: 60).",
+    )
+    group.addoption(
+        "--ca-timeout-default",
+        type=float,
+        default=600.0,
+        help="Time budget in seconds of a test that did not run in the original run (default: 600).",
+    )
+    group.addoption(
+        "--ca-killed-tests-file",
+        default=None,
+        help="File to which the node ids of the tests that exceeded their time budget are appended.",
+    )
+    group.addoption(
+        "--ca-test-order-file",
+        default=None,
+        help="Order data written by order_tests.py, used to run the most useful tests first.",
+    )
+    group.addoption(
+        "--ca-test-order-global",
+        action="store_true",
+        default=False,
+        help="Interleave the ordered tests across modules and classes (their tests are kept together by default).",
+    )
+    group.addoption(
+        "--ca-progress-file",
+        default=None,
+        help="JSON file to which the number of collected and completed tests is written.",
+    )
+
+
+def pytest_configure(config):
+    # Always finish the session gracefully when the run is terminated
+    config.pluginmanager.register(GracefulTermination(), "ca_graceful_termination")
+
+    # Enable the per-test time budgets only if the durations of the original run are available
+    # (signal.setitimer is not available on every platform)
+    durations_file = config.getoption("--ca-durations-file")
+    if durations_file and hasattr(signal, "SIGALRM"):
+        durations = read_junit_durations(durations_file)
+        if durations is not None:
+            config.pluginmanager.register(PerTestTimeout(config, durations), "ca_per_test_timeout")
+        else:
+            print(f"No per-test durations found in {durations_file}, per-test time budgets are disabled")
+
+    # Run the tests in the order of the order data (the collection order is kept without it)
+    order_file = config.getoption("--ca-test-order-file")
+    if order_file and os.path.isfile(order_file):
+        with open(order_file) as f:
+            grouped = not config.getoption("--ca-test-order-global")
+            config.pluginmanager.register(SuiteOrder(json.load(f), grouped), "ca_test_order")
+
+    progress_file = config.getoption("--ca-progress-file")
+    if progress_file:
+        config.pluginmanager.register(SuiteProgress(progress_file, order_file is not None), "ca_suite_progress")
+
+
+class PerTestTimeout:
+    """
+    Interrupt each test that runs longer than its time budget.
+    The budget of a test is its duration in the original run times the overhead factor (at least the minimum budget).
+    """
+
+    def __init__(self, config, durations):
+        self.durations = durations
+        self.factor = config.getoption("--ca-timeout-factor")
+        self.minimum = config.getoption("--ca-timeout-min")
+        self.default = config.getoption("--ca-timeout-default")
+        self.killed_tests_file = config.getoption("--ca-killed-tests-file")
+
+    def get_budget(self, nodeid):
+        """
+        Get the time budget of a test.
+
+        Args:
+            nodeid: The pytest node id of the test.
+
+        Returns:
+            The time budget of the test in seconds.
+        """
+        original_duration = self.durations.get(nodeid_to_test_id(nodeid))
+        if original_duration is None:
+            return self.default
+        return max(original_duration * self.factor, self.minimum)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        budget = self.get_budget(item.nodeid)
+
+        # Raise an exception in the test once the budget is exhausted
+        def on_timeout(signum, frame):
+            raise PerTestTimeoutError(f"Test exceeded its time budget of {budget:.1f}s")
+
+        previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, budget)
+        try:
+            yield
+        finally:
+            # Cancel the timer and restore the previous handler
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+
+        # Record the test if it was interrupted because it exceeded its budget
+        if call.when == "call" and call.excinfo is not None and call.excinfo.errisinstance(PerTestTimeoutError):
+            report = outcome.get_result()
+            report.longrepr = f"{item.nodeid}: {call.excinfo.value}"
+            if self.killed_tests_file:
+                with open(self.killed_tests_file, "a") as f:
+                    f.write(f"{item.nodeid}\n")
+
+
+class GracefulTermination:
+    """
+    Turn the first SIGTERM into a KeyboardInterrupt so that pytest finishes the session
+    (and the analysis tools write their results) instead of being terminated immediately.
+    """
+
+    def __init__(self):
+        self.previous_handler = None
+
+    def pytest_sessionstart(self, session):
+        # Do not replace a handler installed by the analysis tool or the tests
+        if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+            self.previous_handler = signal.signal(signal.SIGTERM, self.on_terminate)
+
+    def on_terminate(self, signum, frame):
+        # Restore the default handler, so a second SIGTERM terminates the run immediately
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        raise KeyboardInterrupt("Run terminated by SIGTERM, finishing the session with partial results")
+
+    def pytest_unconfigure(self, config):
+        # Restore the previous handler
+        if self.previous_handler is not None:
+            signal.signal(signal.SIGTERM, self.previous_handler)
+
+
+class SuiteOrder:
+    """
+    Run the tests in the order of order_tests.py: the changed tests first, then the tests by the number of
+    violations they found per second in the previous run.
+    The order is applied after the other plugins changed the collected items. The tests of a module or class are
+    kept together unless grouped is False, in which case their module and class fixtures may be set up more than once.
+    """
+
+    def __init__(self, data, grouped=True):
+        self.data = data
+        self.grouped = grouped
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        order = order_tests([item.nodeid for item in items], self.data, self.grouped)
+        items[:] = [items[index] for index in order]
+
+
+class SuiteProgress:
+    """
+    Write the number of collected and completed tests to the progress file.
+    The file is written after the collection, at most every few seconds while the tests run and at the end of
+    the session, so a run killed by its time limit still reports how much of the suite ran.
+    """
+
+    WRITE_INTERVAL = 5.0
+
+    def __init__(self, progress_file, ordered):
+        self.progress_file = progress_file
+        self.ordered = ordered
+        self.collected = 0
+        self.completed = 0
+        self.last_write = 0.0
+
+    def write(self):
+        # Replace the file, so it is never read half written
+        temporary_file = f"{self.progress_file}.tmp"
+        with open(temporary_file, "w") as f:
+            json.dump({"collected": self.collected, "completed": self.completed,
+                       "test_order": "ordered" if self.ordered else "default"}, f)
+        os.replace(temporary_file, self.progress_file)
+        self.last_write = time.monotonic()
+
+    def pytest_collection_finish(self, session):
+        self.collected = len(session.items)
+        self.write()
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        self.completed += 1
+        if time.monotonic() - self.last_write >= self.WRITE_INTERVAL:
+            self.write()
+
+    def pytest_sessionfinish(self, session):
+        self.write()
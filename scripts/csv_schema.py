@@ -0,0 +1,130 @@
+import os
+import csv
+import sys
+import argparse
+
+
+"""
+This script is used to append rows to the over time CSV files (e.g. continuous_analysis_over_time_results.csv)
+when their columns change between versions of the pipeline.
+A CSV file written by an older version keeps its header, so the rows of a newer version (with more columns) cannot
+be appended to it as they are. The header is reconciled first:
+- If the file has all the columns of the rows, the rows are written with the header of the file
+- Otherwise the file is rewritten with the union of the columns (the columns of the file first, then the new columns
+  at the end), the missing values of the existing rows are left empty
+
+It is also used to merge over time CSV files with different headers (e.g. the results of the previous artifact and
+the results of the current run in the auto-filter workflow).
+
+Usage: python3 csv_schema.py merge <output.csv> <input.csv> [<input.csv> ...]
+"""
+
+
+def read_header(path: str) -> list:
+    # Read the header of a CSV file (None if the file does not exist or is empty)
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), None)
+
+
+def union_columns(*headers) -> list:
+    # The columns of all the headers, in the order they are first seen
+    columns = []
+    for header in headers:
+        for column in header or []:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def reconcile_header(path: str, fieldnames: list) -> list:
+    """
+    Make the header of a CSV file contain the given columns, rewriting the file if columns are missing.
+
+    Args:
+        path: The path to the CSV file.
+        fieldnames: The columns of the rows to append.
+
+    Returns:
+        The columns to write the rows with (the header of the file, or the fieldnames if the file does not exist).
+    """
+    header = read_header(path)
+    if not header:
+        return list(fieldnames)
+    columns = union_columns(header, fieldnames)
+    if columns == header:
+        return header
+
+    # The violations columns can be very large
+    csv.field_size_limit(sys.maxsize)
+
+    # Rewrite the file with the new columns at the end (replaced at once, so it is never half written)
+    print(f'Adding the columns {", ".join(columns[len(header):])} to {path}')
+    temporary_file = f'{path}.tmp'
+    with open(path, 'r', newline='', encoding='utf-8') as f_in, open(temporary_file, 'w', newline='', encoding='utf-8') as f_out:
+        reader = csv.reader(f_in)
+        writer = csv.writer(f_out)
+        next(reader)
+        writer.writerow(columns)
+        padding = [''] * (len(columns) - len(header))
+        for row in reader:
+            writer.writerow(row + padding)
+    os.replace(temporary_file, path)
+    return columns
+
+
+def append_rows(path: str, fieldnames: list, rows: list):
+    """
+    Append rows to a CSV file, writing the header if the file does not exist and reconciling it otherwise.
+
+    Args:
+        path: The path to the CSV file.
+        fieldnames: The columns of the rows.
+        rows: The rows (dictionaries).
+    """
+    file_exists = bool(read_header(path))
+    columns = reconcile_header(path, fieldnames)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        if not file_exists:
+            writer.writeheader()
+        for row in rows:
+            try:
+                writer.writerow(row)
+            except Exception as e:
+                print('could not write line:', row.keys(), str(e))
+
+
+def merge_files(output_file: str, input_files: list):
+    """
+    Concatenate CSV files with different headers (the union of the columns, in the order they are first seen).
+
+    Args:
+        output_file: The path to the merged CSV file (replaced).
+        input_files: The paths to the CSV files (the missing files are skipped).
+    """
+    csv.field_size_limit(sys.maxsize)
+    input_files = [path for path in input_files if read_header(path)]
+    columns = union_columns(*[read_header(path) for path in input_files])
+    with open(output_file, 'w', newline='', encoding='utf-8') as f_out:
+        writer = csv.DictWriter(f_out, fieldnames=columns)
+        writer.writeheader()
+        for path in input_files:
+            with open(path, 'r', newline='', encoding='utf-8') as f_in:
+                writer.writerows(csv.DictReader(f_in))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge over time CSV files with different headers.')
+    parser.add_argument('command', choices=['merge'])
+    parser.add_argument('output_file')
+    parser.add_argument('input_files', nargs='+')
+    args = parser.parse_args()
+
+    merge_files(args.output_file, args.input_files)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
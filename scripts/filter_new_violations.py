@@ -1,229 +1,598 @@
 import sys
-from git import Repo
-import pandas as pd
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 import csv
 import os
 from track_commit_changes import track_changes
+from commit_metadata import get_first_parent
+from violation_fingerprints import FingerprintReader
+from violation_snapshots import get_snapshots
+from analysis_scope import is_library_path
+from pipeline_profiler import get_profiler
+from csv_schema import append_rows
 
 
-# Get the project path and sha of the current commit from the command line
-# Usage: python track_commit_changes.py <repo_path> <current_commit_sha>
-repo_path = sys.argv[1]
-current_sha = sys.argv[2]
-if len(sys.argv) > 3:
-    parent_sha = sys.argv[3]
-else:
-    parent_sha = None
-
-# Print the project info for debugging
-print(f"Project path: {repo_path}")
-print(f"Current SHA: {current_sha}")
-print(f"Parent SHA: {parent_sha}")
-
-# Declare variables for whether first time running the script
-first_time_running = False
-
-# Read the over_time csv file
-df = pd.read_csv("continuous_analysis_over_time_results.csv")
-
-# Filter the rows where the commit_sha is the current commit
-df_current_commit = df[df['commit_sha'] == current_sha]
-
-# Get the timestamp of the current commit
-timestamp = df[df['commit_sha'] == current_sha]['timestamp'].iloc[0]
-
-# Get the coverage of the current commit
-coverage = df[df['commit_sha'] == current_sha]['coverage'].iloc[0]
-
-# Get the commit timestamp of the current commit
-commit_timestamp = df[df['commit_sha'] == current_sha]['commit_timestamp'].iloc[0]
-
-# Get the commit message of the current commit
-commit_message = df[df['commit_sha'] == current_sha]['commit_message'].iloc[0]
-
-# Combine the violations from the current commit for both PyMOP and DyLin
-pymop_value = df_current_commit[df_current_commit['algorithm'] == 'pymop']['violations_by_location'].iloc[0] if not df_current_commit[df_current_commit['algorithm'] == 'pymop'].empty else None
-dylin_value = df_current_commit[df_current_commit['algorithm'] == 'dylin']['violations_by_location'].iloc[0] if not df_current_commit[df_current_commit['algorithm'] == 'dylin'].empty else None
-
-violations_current_commit_pymop = pymop_value.split(';') if pymop_value is not None and pd.notna(pymop_value) else []
-violations_current_commit_dylin = dylin_value.split(';') if dylin_value is not None and pd.notna(dylin_value) else []
-violations_current_commit = violations_current_commit_pymop + violations_current_commit_dylin
-
-# Parse each violations to a list of tuples (spec, filepath, line_num)
-violations_current_commit_tuples = []
-for violation in violations_current_commit:
-    spec, filepath, line_num = violation.split('=')[0].split(':')
-    violations_current_commit_tuples.append((spec, filepath, line_num))
-
-# Filter the rows where the commit_sha is the parent commit
-if parent_sha:
-    df_parent_commit = df[df['commit_sha'] == parent_sha]
-else:
-    df_parent_commit = pd.DataFrame()
-
-# Check if there is any row in the parent commit dataframe
-if df_parent_commit.empty:
-    print("No parent commit found")
-    first_time_running = True
-else:
-    # Get the violations from the parent commit
-    pymop_parent_value = df_parent_commit[df_parent_commit['algorithm'] == 'pymop']['violations_by_location'].iloc[0] if not df_parent_commit[df_parent_commit['algorithm'] == 'pymop'].empty else None
-    dylin_parent_value = df_parent_commit[df_parent_commit['algorithm'] == 'dylin']['violations_by_location'].iloc[0] if not df_parent_commit[df_parent_commit['algorithm'] == 'dylin'].empty else None
-    
-    violations_parent_commit_pymop = pymop_parent_value.split(';') if pymop_parent_value is not None and pd.notna(pymop_parent_value) else []
-    violations_parent_commit_dylin = dylin_parent_value.split(';') if dylin_parent_value is not None and pd.notna(dylin_parent_value) else []
-    violations_parent_commit = violations_parent_commit_pymop + violations_parent_commit_dylin
-
-    # Parse each violations to a list of tuples (spec, filepath, line_num)
-    violations_parent_commit_tuples = []
-    for violation in violations_parent_commit:
-        spec, filepath, line_num = violation.split('=')[0].split(':')
-        violations_parent_commit_tuples.append((spec, filepath, line_num))
-
-# Get the changes between the current and parent commit
-if not first_time_running and parent_sha:
+# The stage timers and counters of the script (enabled with the CA_PROFILE environment variable)
+profiler = get_profiler('filter_new_violations')
+
+
+# Whether the new and old violations of moved code are matched by the content of their lines
+MATCH_MOVED_VIOLATIONS = os.environ.get('MATCH_MOVED_VIOLATIONS', '1').lower() not in ('0', 'false', 'no')
+
+# The key columns of a violation frame, and the pattern of a violation string (spec:filepath:line_num=count)
+VIOLATION_COLUMNS = ['spec', 'filepath', 'line_num']
+VIOLATION_PATTERN = r'^(?P<spec>[^:]*):(?P<filepath>[^:]*):(?P<line_num>[^:=]*)(?:=(?P<count>.*))?$'
+
+
+# The columns of the continuous_analysis_over_time_results.csv file used to filter the violations
+RESULTS_COLUMNS = ['algorithm', 'commit_sha', 'timestamp', 'coverage', 'commit_timestamp', 'commit_message', 'violations_by_location']
+
+
+def read_results(results_file='continuous_analysis_over_time_results.csv'):
+    """
+    Read the columns of the over time results used to filter the violations (the other columns, e.g. the large
+    violations_by_test column, are not parsed).
+
+    Args:
+        results_file: The path to the continuous_analysis_over_time_results.csv file.
+
+    Returns:
+        The dataframe of the results (empty if the file does not exist).
+    """
+    import pandas as pd
+
+    if not os.path.isfile(results_file):
+        return pd.DataFrame(columns=RESULTS_COLUMNS)
+    return pd.read_csv(results_file, usecols=lambda column: column in RESULTS_COLUMNS)
+
+
+def get_violations_of_commit(df, sha):
+    """
+    Get the violations of a commit for both PyMOP and DyLin from the over time results.
+
+    Args:
+        df: The dataframe of the continuous_analysis_over_time_results.csv file.
+        sha: The SHA of the commit.
+
+    Returns:
+        A list of the violations of the commit (spec:filepath:line_num=count).
+    """
+    import pandas as pd
+
+    # Filter the rows where the commit_sha is the commit
+    df_commit = df[df['commit_sha'] == sha]
+
+    # Combine the violations from the commit for both PyMOP and DyLin (the first row of each algorithm)
+    cells = pd.concat([
+        df_commit.loc[df_commit['algorithm'] == algorithm, 'violations_by_location'].iloc[:1]
+        for algorithm in ['pymop', 'dylin']
+    ]).dropna()
+
+    # Split the cells into one violation per row
+    return cells.astype(str).str.split(';').explode().tolist()
+
+
+def get_violations_of_parsed_commit(parsed):
+    """
+    Get the violations of a commit for both PyMOP and DyLin from the parsed results of the commit (without splitting
+    the violation strings again).
+
+    Args:
+        parsed: The parsed results of the commit (see parse_continuous_analysis_output.main).
+
+    Returns:
+        A tuple containing the violations of the commit (spec:filepath:line_num=count) and their frame.
+    """
+    import pandas as pd
+
+    records = [record for algorithm in ['pymop', 'dylin'] for record in parsed['violations'].get(algorithm, [])]
+    # The same dtypes as the frames of the violation strings (see violations_to_frame)
+    frame = pd.DataFrame.from_records(records, columns=VIOLATION_COLUMNS + ['count'])
+    frame = frame.astype({**{column: object for column in VIOLATION_COLUMNS}, 'count': int})
+    violations = [f'{spec}:{filepath}:{line_num}={count}' for spec, filepath, line_num, count in records]
+    return violations, frame
+
+
+def parse_violations(violations):
+    """
+    Parse each violation to a tuple (spec, filepath, line_num).
+
+    Args:
+        violations: A list of violations (spec:filepath:line_num=count).
+
+    Returns:
+        A list of tuples (spec, filepath, line_num).
+    """
+    return list(violations_to_frame(violations)[VIOLATION_COLUMNS].itertuples(index=False, name=None))
+
+
+def violations_to_frame(violations):
+    """
+    Parse the violations to a frame with the spec, filepath, line_num (as a string) and count columns.
+
+    Args:
+        violations: A list of violations (spec:filepath:line_num=count), a list of tuples (spec, filepath, line_num)
+            or a violation frame.
+
+    Returns:
+        A DataFrame with the spec, filepath, line_num and count columns (one row per violation, in order).
+        The count is the number of times the violation was hit at the location (1 if unknown).
+    """
+    import pandas as pd
+
+    if isinstance(violations, pd.DataFrame):
+        frame = violations.reset_index(drop=True)
+        if 'count' not in frame.columns:
+            frame = frame.assign(count=1)
+        return frame[VIOLATION_COLUMNS + ['count']]
+    violations = list(violations)
+    if violations and not isinstance(violations[0], str):
+        return pd.DataFrame.from_records(violations, columns=VIOLATION_COLUMNS).assign(count=1)
+
+    # Extract the spec, filepath, line number and count of each violation
+    frame = pd.Series(violations, dtype=object).str.extract(VIOLATION_PATTERN)
+    malformed = frame['spec'].isna()
+    if malformed.any():
+        raise ValueError(f"Malformed violation: {violations[malformed.idxmax()]}")
+    frame['count'] = pd.to_numeric(frame['count'], errors='coerce').fillna(1).astype(int)
+    return frame
+
+
+def normalize_filepath(filepath):
+    """
+    Convert the filepath of a violation to a path relative to the root of the testing repository.
+
+    Args:
+        filepath: The filepath of the violation.
+
+    Returns:
+        The filepath relative to the root of the testing repository.
+    """
+    if '-pymop/' in filepath:
+        filepath = filepath.split('-pymop/')[1]
+    elif '-dylin/' in filepath:
+        filepath = filepath.split('-dylin/')[1]
+        # Remove the last 5 characters of the filepath (.orig)
+        filepath = filepath[:-5]
+
+    # Make sure the format of the filepath is consistent
+    if filepath.startswith('/'):
+        filepath = filepath[1:]
+    return filepath
+
+
+def add_path_columns(frame):
+    """
+    Add the columns used to match the violations: the line number as an integer, whether the violation is from
+    python or site-packages, the filepath relative to the root of the testing repository and the row order.
+
+    Args:
+        frame: A violation frame.
+
+    Returns:
+        The violation frame with the line, is_library, path, order and occurrence columns.
+    """
+    frame = frame.copy()
+    frame['line'] = frame['line_num'].astype(int)
+    # Normalize each distinct filepath once
+    filepaths = frame['filepath'].unique()
+    frame['is_library'] = frame['filepath'].map({filepath: is_library_path(filepath) for filepath in filepaths}).astype(bool)
+    frame['path'] = frame['filepath'].map({filepath: normalize_filepath(filepath) for filepath in filepaths})
+    frame['order'] = range(len(frame))
+    # Number the occurrences of each location, so duplicate locations are matched one-to-one
+    frame['occurrence'] = frame.groupby(VIOLATION_COLUMNS, sort=False).cumcount()
+    return frame
+
+
+def to_violation_strings(frame):
+    # Convert the violations of a frame to strings (spec:filepath:line_num)
+    return (frame['spec'] + ':' + frame['filepath'] + ':' + frame['line_num']).tolist()
+
+
+def classify_violations(violations_current_commit, violations_parent_commit, changes):
+    """
+    Classify the violations of the current commit as new or matched, and the violations of the parent commit as old
+    (no longer in the current commit) or matched.
+
+    The violations are matched with joins: violations from python or site-packages and violations in files that have
+    not been changed are matched directly with the parent commit as multisets (each occurrence of a location matches
+    at most one occurrence of the same location in the parent commit), violations in changed files are new if they are
+    in a changed range, or matched with the parent commit violations of the same spec in the same (renamed) file whose
+    offseted line number is the line number of the current commit.
+
+    Args:
+        violations_current_commit: The violations of the current commit (see violations_to_frame).
+        violations_parent_commit: The violations of the parent commit (see violations_to_frame).
+        changes: The changes between the parent and current commit (see track_changes).
+
+    Returns:
+        A tuple containing the violation frames of the current commit (with a new column) and the parent commit
+        (with an old column), in their original order.
+    """
+    import pandas as pd
+
+    current = add_path_columns(violations_to_frame(violations_current_commit))
+    parent = add_path_columns(violations_to_frame(violations_parent_commit))
+    changed_files = set(changes['renames']) | set(changes['offsets']) | set(changes['new_file_changes'])
+    current['changed'] = ~current['is_library'] & current['path'].isin(changed_files)
+    current['new'] = False
+    matched_parent_orders = []
+
+    # If the violation is from python or site-packages or the file has not been changed, match the parent commit directly
+    # (the n-th occurrence of a location matches the n-th occurrence of the location in the parent commit)
+    direct = current[~current['changed']]
+    direct = direct.merge(
+        parent[VIOLATION_COLUMNS + ['occurrence', 'order']], on=VIOLATION_COLUMNS + ['occurrence'],
+        how='left', suffixes=('', '_parent'),
+    )
+    current.loc[direct.loc[direct['order_parent'].isna(), 'order'], 'new'] = True
+    matched_parent_orders.extend(direct['order_parent'].dropna().astype(int))
+
+    # If the file has been changed, check if the line number is in a changed range
+    changed = current[current['changed']]
+    ranges = pd.DataFrame.from_records(
+        [(filepath, start, end) for filepath, file_ranges in changes['new_file_changes'].items() for start, end in file_ranges],
+        columns=['path', 'range_start', 'range_end'],
+    )
+    if not changed.empty and not ranges.empty:
+        in_range = pd.merge_asof(
+            changed.sort_values('line'), ranges.astype({'range_start': 'int64'}).sort_values('range_start'),
+            left_on='line', right_on='range_start', by='path', direction='backward',
+        )
+        in_range = in_range[in_range['line'] <= in_range['range_end']]
+        current.loc[in_range['order'], 'new'] = True
+        changed = changed[~changed['order'].isin(in_range['order'])]
+
+    # If the line number is not in a changed range, match the parent commit violations of the old file
+    if not changed.empty:
+        # Get the current filepath of the parent commit violations in the changed files
+        old_to_current = {changes['renames'].get(filepath, filepath): filepath for filepath in changed['path'].unique()}
+        candidates = parent[parent['path'].isin(old_to_current.keys())].copy()
+        candidates['current_path'] = candidates['path'].map(old_to_current)
+
+        # Get the offseted line number of the parent commit violations (the offset of the last hunk at or before the line)
+        hunks = pd.DataFrame.from_records(
+            [(filepath, start, offset) for filepath, file_offsets in changes['offsets'].items() for start, offset in file_offsets.items()],
+            columns=['current_path', 'hunk_start', 'offset'],
+        ).astype({'hunk_start': 'int64', 'offset': 'int64'})
+        if not candidates.empty and not hunks.empty:
+            candidates = pd.merge_asof(
+                candidates.sort_values('line'), hunks.sort_values('hunk_start'),
+                left_on='line', right_on='hunk_start', by='current_path', direction='backward',
+            )
+            candidates['offseted_line'] = candidates['line'] + candidates['offset'].fillna(0).astype(int)
+        else:
+            candidates['offseted_line'] = candidates['line']
+
+        # Match the violations with the same spec, filepath and offseted line number (the first parent violation)
+        matches = changed[['spec', 'path', 'line', 'order']].merge(
+            candidates[['spec', 'current_path', 'offseted_line', 'order']],
+            left_on=['spec', 'path', 'line'], right_on=['spec', 'current_path', 'offseted_line'],
+            suffixes=('', '_parent'),
+        )
+        first_matches = matches.groupby('order')['order_parent'].min()
+        current.loc[changed.loc[~changed['order'].isin(first_matches.index), 'order'], 'new'] = True
+        matched_parent_orders.extend(first_matches)
+
+    # The old violations are the parent commit violations that were not matched
+    parent['old'] = ~parent['order'].isin(matched_parent_orders)
+
+    profiler.count('parent_comparisons', len(direct) + (len(matches) if not changed.empty else 0))
+    return current, parent
+
+
+def match_moved_violations(current, parent, fingerprint_reader, current_sha, parent_sha):
+    """
+    Match the new violations of the current commit with the old violations of the parent commit by the content of
+    their lines, so the violations of moved code (within a file or to another file) are neither new nor old.
+
+    Only the new violations in changed files are matched (not from python or site-packages). They are matched
+    one-to-one with the old violations of the same spec and context fingerprint first, then of the same spec and
+    line fingerprint if the line is unique among the remaining new and old violations of the spec.
+
+    Args:
+        current: The violation frame of the current commit (see classify_violations), updated in place.
+        parent: The violation frame of the parent commit (see classify_violations), updated in place.
+        fingerprint_reader: The FingerprintReader of the repository.
+        current_sha: The SHA of the current commit.
+        parent_sha: The SHA of the parent commit.
+
+    Returns:
+        The number of matched violations.
+    """
+    new = current[current['new'] & current['changed']]
+    old = parent[parent['old'] & ~parent['is_library']]
+    if new.empty or old.empty:
+        return 0
+
+    # Get the fingerprints of the locations (order -> (context fingerprint, line fingerprint) or None)
+    new_fingerprints = {
+        order: fingerprint_reader.get_fingerprints(current_sha, path, line)
+        for order, path, line in zip(new['order'], new['path'], new['line'])
+    }
+    old_fingerprints = {
+        order: fingerprint_reader.get_fingerprints(parent_sha, path, line)
+        for order, path, line in zip(old['order'], old['path'], old['line'])
+    }
+
+    matches = {}
+    matched_old = set()
+    for level in (0, 1):
+        # Index the remaining old violations by spec and fingerprint (in reverse order, so the first one is popped first)
+        index = defaultdict(list)
+        for order, spec in zip(old['order'].tolist()[::-1], old['spec'].tolist()[::-1]):
+            if old_fingerprints[order] is not None and order not in matched_old:
+                index[(spec, old_fingerprints[order][level])].append(order)
+        remaining = [
+            (order, (spec, new_fingerprints[order][level])) for order, spec in zip(new['order'], new['spec'])
+            if new_fingerprints[order] is not None and order not in matches
+        ]
+
+        # The line fingerprints only match unique lines
+        if level == 1:
+            new_counts = defaultdict(int)
+            for _, key in remaining:
+                new_counts[key] += 1
+            remaining = [(order, key) for order, key in remaining if new_counts[key] == 1 and len(index.get(key, ())) == 1]
+
+        for order, key in remaining:
+            if index.get(key):
+                matches[order] = index[key].pop()
+                matched_old.add(matches[order])
+
+    current.loc[list(matches.keys()), 'new'] = False
+    parent.loc[list(matches.values()), 'old'] = False
+    return len(matches)
+
+
+def filter_violations(violations_current_commit, violations_parent_commit, changes):
+    """
+    Filter the violations of the current commit to only include new violations that are not in the parent commit.
+
+    Args:
+        violations_current_commit: The violations of the current commit (see violations_to_frame).
+        violations_parent_commit: The violations of the parent commit (see violations_to_frame).
+        changes: The changes between the parent and current commit (see track_changes).
+
+    Returns:
+        A tuple containing the new violations of the current commit and the old violations of the parent commit
+        (violations that are no longer in the current commit), both as lists of strings (spec:filepath:line_num).
+    """
+    current, parent = classify_violations(violations_current_commit, violations_parent_commit, changes)
+    return to_violation_strings(current[current['new']]), to_violation_strings(parent[parent['old']])
+
+
+def append_to_violations_filtered_over_time(line):
+    """
+    Append the filtered violations of a commit to the continuous_analysis_over_time_violations_filtered.csv file.
+
+    Args:
+        line: An OrderedDict containing the filtered violations of the commit.
+    """
+    # Append the results to the continuous_analysis_over_time_violations_filtered.csv file
+    print("\n====== APPENDING TO RESULTS OVER TIME ======\n")
+    print(f'appending to continuous_analysis_over_time_violations_filtered.csv')
+
+    # Append the line to the csv file (the new columns are added to the header of a file written by an older version)
+    append_rows('continuous_analysis_over_time_violations_filtered.csv', list(line.keys()), [line])
+
+    print('appended to continuous_analysis_over_time_violations_filtered.csv')
+
+
+def get_parent_sha_from_metadata(df, current_sha):
+    """
+    Get the parent commit of a commit from the commit metadata table (see commit_metadata.py).
+
+    Args:
+        df: The dataframe of the continuous_analysis_over_time_results.csv file.
+        current_sha: The SHA of the current commit.
+
+    Returns:
+        The SHA of the first parent as recorded in the dataframe (the SHAs may be abbreviated),
+        or None if there is no table or the commit is not in it.
+    """
+    parent_sha = get_first_parent(current_sha)
+    if parent_sha is None:
+        return None
+    for sha in df['commit_sha'].dropna().astype(str).unique():
+        if sha and parent_sha.startswith(sha):
+            return sha
+    return parent_sha
+
+
+def main(repo_path, current_sha, parent_sha=None, df=None, changes=None, parsed=None):
+    """
+    Filter the new violations of a commit and append them to the continuous_analysis_over_time_violations_filtered.csv file.
+
+    Args:
+        repo_path: The path to the repository.
+        current_sha: The SHA of the current commit.
+        parent_sha: The SHA of the parent commit (optional, from the commit metadata table if not given).
+        df: The dataframe of the continuous_analysis_over_time_results.csv file (optional, read if not given).
+        changes: The changes between the parent and current commit (optional, tracked if not given).
+        parsed: The parsed results of the current commit (optional, see parse_continuous_analysis_output.main).
+            If given, the current commit is not read from the dataframe.
+
+    If the violation snapshots are enabled (see violation_snapshots.py), the violations of the parent commit are
+    loaded from its snapshot and the snapshot of the current commit is written, so the results are only read when
+    the current commit is not parsed or the parent commit has no snapshot.
+    """
+    import pandas as pd
+
+    # Print the project info for debugging
+    print(f"Project path: {repo_path}")
+    print(f"Current SHA: {current_sha}")
+    print(f"Parent SHA: {parent_sha}")
+
+    # Start the stage timers and counters of the run
+    profiler.start()
+
+    # Declare variables for whether first time running the script
+    first_time_running = False
+
+    # Read the over_time csv file (only when it is used)
+    def get_results():
+        nonlocal df
+        if df is None:
+            with profiler.stage('read_results'):
+                df = read_results()
+        return df
+
+    # The snapshots of the violations of the commits (None if they are not enabled)
+    snapshots = get_snapshots()
+
+    # Get the parent commit from the commit metadata table if it is not given
+    if parent_sha is None:
+        parent_sha = get_parent_sha_from_metadata(get_results(), current_sha)
+        if parent_sha is not None:
+            print(f"Parent SHA (from the commit metadata): {parent_sha}")
+
+    # Get the timestamp, coverage, commit timestamp and commit message of the current commit
+    if parsed is not None:
+        current_line = parsed['lines'][0]
+    else:
+        df = get_results()
+        current_line = df[df['commit_sha'] == current_sha].iloc[0]
+    timestamp = current_line['timestamp']
+    coverage = current_line['coverage']
+    commit_timestamp = current_line['commit_timestamp']
+    commit_message = current_line['commit_message']
+
+    if parsed is not None:
+        # Use the violations parsed in the same process
+        violations_current_commit, violations_current_commit_frame = get_violations_of_parsed_commit(parsed)
+    else:
+        # Combine the violations from the current commit for both PyMOP and DyLin
+        violations_current_commit = get_violations_of_commit(df, current_sha)
+
+        # Parse the violations to a frame (spec, filepath, line_num)
+        violations_current_commit_frame = violations_to_frame(violations_current_commit)
+    profiler.count('current_violations', len(violations_current_commit_frame))
+
+    # Load the violations of the parent commit from its snapshot
+    violations_parent_commit_frame = None
+    if snapshots is not None and parent_sha:
+        with profiler.stage('load_snapshot'):
+            violations_parent_commit_frame = snapshots.load(parent_sha)
+        if violations_parent_commit_frame is not None:
+            print(f"Parent violations loaded from the snapshot of {parent_sha}")
+            violations_parent_commit = (
+                violations_parent_commit_frame['spec'] + ':' + violations_parent_commit_frame['filepath'] + ':'
+                + violations_parent_commit_frame['line_num'] + '=' + violations_parent_commit_frame['count'].astype(str)
+            ).tolist()
+            profiler.count('parent_violations', len(violations_parent_commit_frame))
+
+    # Otherwise get the violations of the parent commit from the results
+    if violations_parent_commit_frame is None:
+        # Filter the rows where the commit_sha is the parent commit
+        if parent_sha:
+            df = get_results()
+            df_parent_commit = df[df['commit_sha'] == parent_sha]
+        else:
+            df_parent_commit = pd.DataFrame()
+
+        # Check if there is any row in the parent commit dataframe
+        if df_parent_commit.empty:
+            print("No parent commit found")
+            first_time_running = True
+        else:
+            # Get the violations from the parent commit
+            violations_parent_commit = get_violations_of_commit(df, parent_sha)
+
+            # Parse the violations to a frame (spec, filepath, line_num)
+            violations_parent_commit_frame = violations_to_frame(violations_parent_commit)
+            profiler.count('parent_violations', len(violations_parent_commit_frame))
+
+    # Write the snapshot of the violations of the current commit (a delta of the snapshot of the parent commit)
+    if snapshots is not None:
+        try:
+            with profiler.stage('write_snapshot'):
+                snapshot_kind = snapshots.write(current_sha, violations_current_commit_frame, parent_sha)
+            if snapshot_kind is not None:
+                print(f"Wrote a {snapshot_kind} violation snapshot of {current_sha}")
+        except ValueError as e:
+            print(f"Could not write the violation snapshot of {current_sha}: {e}")
+
     # Get the changes between the current and parent commit
-    changes = track_changes(repo_path, parent_sha, current_sha)
-    print(changes)
-
-    # Filter the violations_current_commit_tuples to only include new violations that are not in the parent commit
-    violations_current_commit_tuples_filtered = []
-    violations_parent_commit_tuples_filtered = []
-    for violation in violations_current_commit_tuples:
-        spec = violation[0]
-        filepath = violation[1]
-        line_num = int(violation[2])
-        # If the violation is from python or site-packages, we cannot match changes, direct compare with parent commit
-        if 'python3' in filepath or 'site-packages' in filepath:
-            if violation not in violations_parent_commit_tuples:
-                violations_current_commit_tuples_filtered.append(violation)
-            else:
-                violations_parent_commit_tuples_filtered.append(violation)
-        else:  # If the violation is from the testing repository
-            if '-pymop/' in filepath:
-                filepath = filepath.split('-pymop/')[1]
-            elif '-dylin/' in filepath:
-                filepath = filepath.split('-dylin/')[1]
-                # Remove the last 5 characters of the filepath (.orig)
-                filepath = filepath[:-5]
-
-            # Make sure the format of the filepath is consistent
-            if filepath.startswith('/'):
-                filepath = filepath[1:]
-
-            # Check if the filepath has been changed
-            if filepath in changes['renames'].keys() or filepath in changes['offsets'].keys() or filepath in changes['new_file_changes'].keys():
-                changed_status = False
-
-                # If the file has been changed, check if the line number is in the changed range
-                if filepath in changes['new_file_changes'].keys():
-                    for start, end in changes['new_file_changes'][filepath]:
-                        if line_num >= start and line_num <= end:
-                            violations_current_commit_tuples_filtered.append(violation)
-                            changed_status = True
-                            break
-
-                # If the line number is not in the changed range, check if the violation is in the parent commit
-                if not changed_status:
-
-                    # Declare a variable to check if the violation is in the parent commit
-                    violation_in_parent_commit = False
-
-                    # Get the old filepath
-                    if changes['renames'].get(filepath, None) is not None:
-                        old_filepath = changes['renames'][filepath]
-                    else:
-                        old_filepath = filepath
-
-                    # Iterate through all the violations in the parent commit
-                    for violation_parent in violations_parent_commit_tuples:
-
-                        # If the filepath matched
-                        if old_filepath in violation_parent[1]:
-
-                            # Get the offseted line number
-                            offseted_line_num = int(violation_parent[2])
-                            sorted_start_lines = sorted(changes['offsets'][filepath].keys())
-                            for i in range(len(sorted_start_lines)):
-                                if int(violation_parent[2]) < sorted_start_lines[i]:
-                                    if i != 0:
-                                        offseted_line_num = offseted_line_num + changes['offsets'][filepath][sorted_start_lines[i-1]]
-                                    break
-                                if int(violation_parent[2]) >= sorted_start_lines[i] and i == len(sorted_start_lines) - 1:
-                                    offseted_line_num = offseted_line_num + changes['offsets'][filepath][sorted_start_lines[i]]
-
-                            # Check if the offseted line number matched the line number of the current commit
-                            if offseted_line_num == line_num and spec == violation_parent[0]:
-                                violation_in_parent_commit = True
-                                violations_parent_commit_tuples_filtered.append(violation_parent)
-                                break
-                    
-                    # If the violation is not in the parent commit, add it to the filtered list
-                    if not violation_in_parent_commit:
-                        violations_current_commit_tuples_filtered.append(violation)
-
-            # If the file has not been changed, check if the violation is in the parent commit directly
-            else:
-                if violation not in violations_parent_commit_tuples:
-                    violations_current_commit_tuples_filtered.append(violation)
-                else:
-                    violations_parent_commit_tuples_filtered.append(violation)
-
-    # Convert the filtered violations to a string
-    violations_current_commit_filtered = []
-    for violation in violations_current_commit_tuples_filtered:
-        violations_current_commit_filtered.append(f"{violation[0]}:{violation[1]}:{violation[2]}")
-    violations_parent_commit_filtered = []
-    for violation in violations_parent_commit_tuples:
-        if violation not in violations_parent_commit_tuples_filtered:
-            violations_parent_commit_filtered.append(f"{violation[0]}:{violation[1]}:{violation[2]}")
-
-# If the parent commit is not found, set the parent commit to an empty string and the filtered violations to an empty list
-else:
-    parent_sha = ''
-    violations_parent_commit = []
-    violations_current_commit_filtered = []
-    violations_parent_commit_filtered = []
-    for violation in violations_current_commit_tuples:
-        violations_current_commit_filtered.append(f"{violation[0]}:{violation[1]}:{violation[2]}")
-    print("No parent commit found or first time running. No filtering done.")
-
-# Store the filtered violations in a new csv file
-line = OrderedDict({
-    'timestamp': timestamp,
-    'current_commit_sha': current_sha,
-    'parent_commit_sha': parent_sha,
-    'current_commit_timestamp': commit_timestamp,
-    'current_commit_message': commit_message,
-    'coverage': coverage,
-    'num_new_violations': len(violations_current_commit_filtered),
-    'new_violations': ';'.join(violations_current_commit_filtered),
-    'num_old_violations': len(violations_parent_commit_filtered),
-    'old_violations': ';'.join(violations_parent_commit_filtered),
-    'num_current_violations': len(violations_current_commit),
-    'current_violations': ';'.join(violations_current_commit),
-    'num_parent_violations': len(violations_parent_commit),
-    'parent_violations': ';'.join(violations_parent_commit),
-})
-
-# Check if continuous_analysis_over_time_violations_filtered.csv exists
-file_exists = os.path.isfile('continuous_analysis_over_time_violations_filtered.csv')
-
-# Append the results to the continuous_analysis_over_time_violations_filtered.csv file
-print("\n====== APPENDING TO RESULTS OVER TIME ======\n")
-print(f'appending to continuous_analysis_over_time_violations_filtered.csv')
-
-# Append the line to the csv file
-with open('continuous_analysis_over_time_violations_filtered.csv', 'a') as f:
-    writer = csv.DictWriter(f, line.keys())
-    # Write header only if file doesn't exist
-    if not file_exists:
-        writer.writeheader()
-    # Write the line
-    try:
-        writer.writerow(line)
-    except Exception as e:
-        print('could not write line:', line.keys(), str(e))
+    if not first_time_running and parent_sha:
+        # Get the changes between the current and parent commit
+        if changes is None:
+            with profiler.stage('track_changes'):
+                changes = track_changes(repo_path, parent_sha, current_sha)
+        num_hunks = sum(len(file_offsets) for file_offsets in changes['offsets'].values())
+        profiler.count('diff_hunks', num_hunks)
+        print(f"Changes: {len(changes['renames'])} renamed files, {len(changes['offsets'])} changed files, {num_hunks} hunks")
+
+        # Filter the violations of the current commit to only include new violations that are not in the parent commit
+        with profiler.stage('filter_violations'):
+            current_frame, parent_frame = classify_violations(
+                violations_current_commit_frame, violations_parent_commit_frame, changes
+            )
+
+        # Match the new and old violations of moved code by the content of their lines
+        moved_violations = 0
+        if MATCH_MOVED_VIOLATIONS:
+            with profiler.stage('match_moved_violations'):
+                moved_violations = match_moved_violations(
+                    current_frame, parent_frame, FingerprintReader(repo_path), current_sha, parent_sha
+                )
+            profiler.count('moved_violations', moved_violations)
+            print(f"Moved violations: {moved_violations}")
+
+        violations_current_commit_filtered = to_violation_strings(current_frame[current_frame['new']])
+        violations_parent_commit_filtered = to_violation_strings(parent_frame[parent_frame['old']])
+
+        # Get the number of times the new and old violations were hit
+        new_violation_hits = int(current_frame.loc[current_frame['new'], 'count'].sum())
+        old_violation_hits = int(parent_frame.loc[parent_frame['old'], 'count'].sum())
+
+    # If the parent commit is not found, set the parent commit to an empty string and the filtered violations to an empty list
+    else:
+        parent_sha = ''
+        violations_parent_commit = []
+        violations_current_commit_filtered = to_violation_strings(violations_current_commit_frame)
+        violations_parent_commit_filtered = []
+        new_violation_hits = int(violations_current_commit_frame['count'].sum())
+        old_violation_hits = 0
+        moved_violations = 0
+        print("No parent commit found or first time running. No filtering done.")
+
+    # Store the filtered violations in a new csv file
+    line = OrderedDict({
+        'timestamp': timestamp,
+        'current_commit_sha': current_sha,
+        'parent_commit_sha': parent_sha,
+        'current_commit_timestamp': commit_timestamp,
+        'current_commit_message': commit_message,
+        'coverage': coverage,
+        'num_new_violations': len(violations_current_commit_filtered),
+        'new_violations': ';'.join(violations_current_commit_filtered),
+        'num_old_violations': len(violations_parent_commit_filtered),
+        'old_violations': ';'.join(violations_parent_commit_filtered),
+        'num_current_violations': len(violations_current_commit),
+        'current_violations': ';'.join(violations_current_commit),
+        'num_parent_violations': len(violations_parent_commit),
+        'parent_violations': ';'.join(violations_parent_commit),
+        'num_new_violation_hits': new_violation_hits,
+        'num_old_violation_hits': old_violation_hits,
+        'num_moved_violations': moved_violations,
+    })
+
+    # Append the line to the continuous_analysis_over_time_violations_filtered.csv file
+    with profiler.stage('write_results'):
+        append_to_violations_filtered_over_time(line)
+
+
+if __name__ == "__main__":
+    # Get the project path and sha of the current commit from the command line
+    # Usage: python filter_new_violations.py <repo_path> <current_commit_sha> [<parent_commit_sha>]
+    repo_path = sys.argv[1]
+    current_sha = sys.argv[2]
+    if len(sys.argv) > 3:
+        parent_sha = sys.argv[3]
+    else:
+        parent_sha = None
 
-print('appended to continuous_analysis_over_time_violations_filtered.csv')
+    try:
+        main(repo_path, current_sha, parent_sha)
+    finally:
+        profiler.write_report()
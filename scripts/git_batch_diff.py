@@ -0,0 +1,750 @@
+import os
+import atexit
+import subprocess
+from collections import Counter
+
+
+"""
+This script provides an in-process alternative to git diff for track_commit_changes.py (the batch backend).
+It reads the trees and blobs of the commits through one long-lived git cat-file --batch process per repository and
+computes the diff of the Python files in process:
+- The trees are compared recursively (identical subtrees are skipped)
+- The lines of the changed Python files are compared with the Myers diff algorithm (the default algorithm of git)
+- The renames are detected between the deleted and added Python files only (identical blobs first, then files with
+  at least 50% similar content, the default threshold of git diff --find-renames)
+
+The hunks are returned in the same form as the hunks of git diff --unified=0, so the changes are the same as the
+changes of the diff backend (except when several alignments of the lines are equally short, git may choose another one).
+"""
+
+
+# The minimum similarity of a renamed file (the default of git diff --find-renames)
+RENAME_SIMILARITY = 0.5
+
+# The modes of the directories (trees) and submodules (commits) in a git tree
+TREE_MODE = '40000'
+SUBMODULE_MODE = '160000'
+
+# The long-lived git cat-file --batch readers by repository path
+_readers = {}
+
+
+class GitBatchReader:
+    """
+    Read git objects through a long-lived git cat-file --batch process.
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self.process = subprocess.Popen(
+            ['git', '-C', repo_path, 'cat-file', '--batch'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+
+    def read_object(self, name):
+        """
+        Read a git object.
+
+        Args:
+            name: The name of the object (a SHA or any revision expression, e.g. HEAD~1^{tree}).
+
+        Returns:
+            A tuple containing the SHA, the type and the content (bytes) of the object.
+        """
+        self.process.stdin.write(name.encode() + b'\n')
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().decode().split()
+        if len(header) != 3:
+            raise ValueError(f"Could not read git object {name} in {self.repo_path}: {' '.join(header)}")
+        sha, object_type, size = header
+        content = self.process.stdout.read(int(size))
+        # Skip the newline after the content
+        self.process.stdout.read(1)
+        return sha, object_type, content
+
+    def read_tree(self, name):
+        """
+        Read the entries of a tree.
+
+        Args:
+            name: The name of a tree or a commit (the tree of the commit is read).
+
+        Returns:
+            A dictionary of the entries (name -> (mode, SHA)).
+        """
+        _, _, content = self.read_object(f'{name}^{{tree}}')
+        entries = {}
+        index = 0
+        while index < len(content):
+            space = content.index(b' ', index)
+            null = content.index(b'\0', space)
+            entry_name = content[space + 1:null].decode('utf-8', 'surrogateescape')
+            entries[entry_name] = (content[index:space].decode(), content[null + 1:null + 21].hex())
+            index = null + 21
+        return entries
+
+    def read_lines(self, sha):
+        """
+        Read the lines of a blob (split on newlines like git, a missing newline at the end of the file is a difference).
+
+        Args:
+            sha: The SHA of the blob.
+
+        Returns:
+            A list of lines (bytes).
+        """
+        _, _, content = self.read_object(sha)
+        lines = content.split(b'\n')
+        if lines[-1] == b'':
+            lines.pop()
+        else:
+            lines[-1] += b'\n\\ No newline at end of file'
+        return lines
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+
+def get_reader(repo_path):
+    """
+    Get the long-lived git cat-file --batch reader of a repository.
+
+    Args:
+        repo_path: The path to the repository.
+
+    Returns:
+        A GitBatchReader.
+    """
+    repo_path = os.path.realpath(repo_path)
+    reader = _readers.get(repo_path)
+    if reader is None or reader.process.poll() is not None:
+        reader = GitBatchReader(repo_path)
+        _readers[repo_path] = reader
+    return reader
+
+
+@atexit.register
+def close_readers():
+    # Stop the git cat-file processes
+    for reader in _readers.values():
+        reader.close()
+    _readers.clear()
+
+
+def diff_lines(old_lines, new_lines):
+    """
+    Compute the hunks between two lists of lines with the Myers diff algorithm, then move the ambiguous changes
+    to the positions git chooses (see mark_changes and compact_changes).
+
+    Args:
+        old_lines: The lines of the old file.
+        new_lines: The lines of the new file.
+
+    Returns:
+        A list of hunks (old_start, old_end, new_start, new_end), 0-based and end-exclusive, in order.
+    """
+    # Mark the changed lines of each file, then move them like git does
+    old_changed, new_changed = mark_changes(old_lines, new_lines)
+    compact_changes(old_lines, old_changed, new_changed)
+    compact_changes(new_lines, new_changed, old_changed)
+
+    # Group the changed lines into hunks
+    hunks = []
+    i, j = 0, 0
+    while i < len(old_lines) or j < len(new_lines):
+        if not old_changed[i + 1] and not new_changed[j + 1]:
+            i += 1
+            j += 1
+            continue
+        old_start, new_start = i, j
+        while old_changed[i + 1]:
+            i += 1
+        while new_changed[j + 1]:
+            j += 1
+        hunks.append((old_start, i, new_start, j))
+    return hunks
+
+
+# The weights of the indent heuristic of git (xdiff/xdiffi.c)
+MAX_INDENT = 200
+MAX_BLANKS = 20
+START_OF_FILE_PENALTY = 1
+END_OF_FILE_PENALTY = 21
+TOTAL_BLANK_WEIGHT = -30
+POST_BLANK_WEIGHT = 6
+RELATIVE_INDENT_PENALTY = -4
+RELATIVE_INDENT_WITH_BLANK_PENALTY = 10
+RELATIVE_OUTDENT_PENALTY = 24
+RELATIVE_OUTDENT_WITH_BLANK_PENALTY = 17
+RELATIVE_DEDENT_PENALTY = 23
+RELATIVE_DEDENT_WITH_BLANK_PENALTY = 17
+INDENT_WEIGHT = 60
+INDENT_HEURISTIC_MAX_SLIDING = 100
+
+
+def get_indent(line):
+    # The indentation of a line (tabs to multiples of 8), or -1 for a blank line
+    indent = 0
+    for char in line:
+        if char == 32:
+            indent += 1
+        elif char == 9:
+            indent += 8 - indent % 8
+        elif char not in b'\n\r\x0b\x0c':
+            return indent
+        if indent >= MAX_INDENT:
+            return MAX_INDENT
+    return -1
+
+
+def score_split(lines, split):
+    """
+    Score splitting the lines before a line (the indent heuristic of git, lower is better).
+
+    Args:
+        lines: The lines of the file.
+        split: The index of the line after the split.
+
+    Returns:
+        A tuple (effective indent, penalty).
+    """
+    end_of_file = split >= len(lines)
+    indent = -1 if end_of_file else get_indent(lines[split])
+    pre_blank, pre_indent = 0, -1
+    for i in range(split - 1, -1, -1):
+        pre_indent = get_indent(lines[i])
+        if pre_indent != -1:
+            break
+        pre_blank += 1
+        if pre_blank == MAX_BLANKS:
+            pre_indent = 0
+            break
+    post_blank, post_indent = 0, -1
+    for i in range(split + 1, len(lines)):
+        post_indent = get_indent(lines[i])
+        if post_indent != -1:
+            break
+        post_blank += 1
+        if post_blank == MAX_BLANKS:
+            post_indent = 0
+            break
+
+    penalty = 0
+    if pre_indent == -1 and pre_blank == 0:
+        penalty += START_OF_FILE_PENALTY
+    if end_of_file:
+        penalty += END_OF_FILE_PENALTY
+    post_blank = 1 + post_blank if indent == -1 else 0
+    total_blank = pre_blank + post_blank
+    penalty += TOTAL_BLANK_WEIGHT * total_blank + POST_BLANK_WEIGHT * post_blank
+    if indent == -1:
+        indent = post_indent
+    any_blanks = total_blank != 0
+    if indent != -1 and pre_indent != -1:
+        if indent > pre_indent:
+            penalty += RELATIVE_INDENT_WITH_BLANK_PENALTY if any_blanks else RELATIVE_INDENT_PENALTY
+        elif indent < pre_indent:
+            if post_indent != -1 and post_indent > indent:
+                penalty += RELATIVE_OUTDENT_WITH_BLANK_PENALTY if any_blanks else RELATIVE_OUTDENT_PENALTY
+            else:
+                penalty += RELATIVE_DEDENT_WITH_BLANK_PENALTY if any_blanks else RELATIVE_DEDENT_PENALTY
+    return indent, penalty
+
+
+def compact_changes(lines, changed, other_changed):
+    """
+    Move the groups of changed lines of a file like git (xdl_change_compact): each group is slid up and down as far
+    as the lines allow (merging with the adjacent groups), then placed in line with the changes of the other file
+    or, if there are none, at the position preferred by the indent heuristic.
+
+    Args:
+        lines: The lines of the file.
+        changed: The changed flags of the lines of the file (index i + 1 for line i, updated in place).
+        other_changed: The changed flags of the lines of the other file (same layout).
+    """
+    n = len(lines)
+    other_n = len(other_changed) - 2
+
+    # A group is the range [start, end) of changed lines between two unchanged lines (it can be empty)
+    def group_at(flags, start):
+        end = start
+        while flags[end + 1]:
+            end += 1
+        return [start, end]
+
+    def next_group(flags, size, group):
+        if group[1] == size:
+            return False
+        group[:] = group_at(flags, group[1] + 1)
+        return True
+
+    def previous_group(flags, group):
+        if group[0] == 0:
+            return False
+        end = group[0] - 1
+        start = end
+        while flags[start]:
+            start -= 1
+        group[:] = [start, end]
+        return True
+
+    def slide_down(group):
+        start, end = group
+        if end < n and lines[start] == lines[end]:
+            changed[start + 1] = False
+            changed[end + 1] = True
+            group[:] = group_at(changed, start + 1)
+            group[0] = start + 1
+            return True
+        return False
+
+    def slide_up(group):
+        start, end = group
+        if start > 0 and lines[start - 1] == lines[end - 1]:
+            changed[start] = True
+            changed[end] = False
+            start -= 1
+            while changed[start]:
+                start -= 1
+            group[:] = [start, end - 1]
+            return True
+        return False
+
+    group = group_at(changed, 0)
+    other_group = group_at(other_changed, 0)
+    while True:
+        if group[1] != group[0]:
+            while True:
+                group_size = group[1] - group[0]
+                end_matching_other = -1
+
+                # Shift the group up as much as possible
+                while slide_up(group):
+                    previous_group(other_changed, other_group)
+                earliest_end = group[1]
+                if other_group[1] > other_group[0]:
+                    end_matching_other = group[1]
+
+                # Shift the group down as much as possible
+                while slide_down(group):
+                    next_group(other_changed, other_n, other_group)
+                    if other_group[1] > other_group[0]:
+                        end_matching_other = group[1]
+                if group_size == group[1] - group[0]:
+                    break
+
+            if group[1] == earliest_end:
+                pass
+            elif end_matching_other != -1:
+                # Line up with the last group of changes of the other file
+                while other_group[1] == other_group[0]:
+                    slide_up(group)
+                    previous_group(other_changed, other_group)
+            else:
+                # Choose the position with the best indent heuristic score
+                shift = max(earliest_end, group[1] - group_size - 1, group[1] - INDENT_HEURISTIC_MAX_SLIDING)
+                best_shift, best_score = -1, None
+                for shift in range(shift, group[1] + 1):
+                    indent_after, penalty_after = score_split(lines, shift)
+                    indent_before, penalty_before = score_split(lines, shift - group_size)
+                    score = (indent_after + indent_before, penalty_after + penalty_before)
+                    if best_shift == -1 or _compare_scores(score, best_score) <= 0:
+                        best_shift, best_score = shift, score
+                while group[1] > best_shift:
+                    slide_up(group)
+                    previous_group(other_changed, other_group)
+
+        if not next_group(changed, n, group):
+            break
+        next_group(other_changed, other_n, other_group)
+
+
+def _compare_scores(score, other_score):
+    # Compare two indent heuristic scores (the effective indent weighs more than the penalty)
+    indent_comparison = (score[0] > other_score[0]) - (score[0] < other_score[0])
+    return INDENT_WEIGHT * indent_comparison + (score[1] - other_score[1])
+
+
+# The limits of the discarding of the lines before the comparison of git (xdiff/xprepare.c)
+MAX_EQUAL_LIMIT = 1024
+SIMILAR_SCAN_WINDOW = 100
+KEEP_DISCARDED_RUN = 4
+
+
+def mark_changes(old_lines, new_lines):
+    """
+    Mark the changed lines between two lists of lines like git does: the common prefix and suffix are skipped, the
+    lines that cannot be matched are discarded (see discard_lines), then the remaining lines are compared with the
+    Myers diff algorithm.
+
+    Args:
+        old_lines: The lines of the old file.
+        new_lines: The lines of the new file.
+
+    Returns:
+        The changed flags of the old and new lines, with an unchanged line before and after each file.
+    """
+    old_changed = [False] * (len(old_lines) + 2)
+    new_changed = [False] * (len(new_lines) + 2)
+
+    # Skip the common prefix and suffix (most of the lines of a changed file)
+    prefix = 0
+    while prefix < len(old_lines) and prefix < len(new_lines) and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < len(old_lines) - prefix and suffix < len(new_lines) - prefix
+           and old_lines[-1 - suffix] == new_lines[-1 - suffix]):
+        suffix += 1
+    a = old_lines[prefix:len(old_lines) - suffix]
+    b = new_lines[prefix:len(new_lines) - suffix]
+
+    # Discard the lines that cannot be matched, they are changed
+    old_kept = discard_lines(a, Counter(new_lines), len(old_lines))
+    new_kept = discard_lines(b, Counter(old_lines), len(new_lines))
+    old_changed[prefix + 1:prefix + len(a) + 1] = [True] * len(a)
+    new_changed[prefix + 1:prefix + len(b) + 1] = [True] * len(b)
+    for i in old_kept:
+        old_changed[prefix + i + 1] = False
+    for j in new_kept:
+        new_changed[prefix + j + 1] = False
+
+    # Compare the remaining lines
+    hunks = myers_hunks([a[i] for i in old_kept], [b[j] for j in new_kept])
+    for x1, x2, y1, y2 in hunks:
+        for i in old_kept[x1:x2]:
+            old_changed[prefix + i + 1] = True
+        for j in new_kept[y1:y2]:
+            new_changed[prefix + j + 1] = True
+    return old_changed, new_changed
+
+
+def discard_lines(lines, other_counts, num_lines):
+    """
+    Select the lines of a file that are compared (xdl_cleanup_records of git): the lines without a match in the other
+    file are discarded, and the lines with many matches are discarded when they are surrounded by discarded lines.
+
+    Args:
+        lines: The lines of the file (without the common prefix and suffix).
+        other_counts: The number of occurrences of each line in the other file.
+        num_lines: The number of lines of the whole file.
+
+    Returns:
+        The indexes of the kept lines, in order.
+    """
+    # The matching lines limit is the (rough) square root of the number of lines
+    limit = 1
+    while num_lines > 0:
+        limit <<= 1
+        num_lines >>= 2
+    limit = min(limit, MAX_EQUAL_LIMIT)
+
+    # 0: no match, 1: some matches, 2: many matches
+    kinds = []
+    for line in lines:
+        matches = other_counts.get(line, 0)
+        kinds.append(0 if matches == 0 else 2 if matches >= limit else 1)
+    return [i for i, kind in enumerate(kinds)
+            if kind == 1 or (kind == 2 and not is_discarded_run(kinds, i))]
+
+
+def is_discarded_run(kinds, i):
+    # Whether a line with many matches is within a run of lines without matches or with many matches (xdl_clean_mmatch)
+    start = max(0, i - SIMILAR_SCAN_WINDOW)
+    end = min(len(kinds) - 1, i + SIMILAR_SCAN_WINDOW)
+    runs = []
+    for step, limit in ((-1, start), (1, end)):
+        no_matches, many_matches = 0, 1
+        j = i + step
+        while (j >= limit if step < 0 else j <= limit):
+            if kinds[j] == 0:
+                no_matches += 1
+            elif kinds[j] == 2:
+                many_matches += 1
+            else:
+                break
+            j += step
+        # Keep the line if the run only has lines with many matches
+        if no_matches == 0:
+            return False
+        runs.append((no_matches, many_matches))
+    no_matches = runs[0][0] + runs[1][0]
+    many_matches = runs[0][1] + runs[1][1]
+    return many_matches * KEEP_DISCARDED_RUN < many_matches + no_matches
+
+
+def myers_hunks(old_lines, new_lines):
+    """
+    Compute the hunks of a shortest edit script between two lists of lines (Myers diff algorithm).
+
+    Args:
+        old_lines: The lines of the old file.
+        new_lines: The lines of the new file.
+
+    Returns:
+        A list of hunks (old_start, old_end, new_start, new_end), 0-based and end-exclusive, in order.
+    """
+    # Skip the common prefix and suffix (most of the lines of a changed file)
+    prefix = 0
+    while prefix < len(old_lines) and prefix < len(new_lines) and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < len(old_lines) - prefix and suffix < len(new_lines) - prefix
+           and old_lines[-1 - suffix] == new_lines[-1 - suffix]):
+        suffix += 1
+    a = old_lines[prefix:len(old_lines) - suffix]
+    b = new_lines[prefix:len(new_lines) - suffix]
+    if not a and not b:
+        return []
+    if not a or not b:
+        return [(prefix, prefix + len(a), prefix, prefix + len(b))]
+
+    # Compare the lines as integers
+    line_ids = {}
+    a = [line_ids.setdefault(line, len(line_ids)) for line in a]
+    b = [line_ids.setdefault(line, len(line_ids)) for line in b]
+    n, m = len(a), len(b)
+
+    # Find the shortest edit script (keep the furthest reaching x of each diagonal k for each number of edits d)
+    offset = n + m + 1
+    v = [0] * (2 * offset + 1)
+    trace = []
+    found = False
+    for d in range(n + m + 1):
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                found = True
+                break
+        if found:
+            break
+
+    # Backtrack the edits from the end (trace[d] holds the diagonals -d - 1 .. d + 1 before the d-th edit)
+    edits = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d + 1] < previous[k + 1 + d + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = previous[previous_k + d + 1]
+        previous_y = previous_x - previous_k
+        # Coming from the diagonal above is an insertion of b[previous_y], else a deletion of a[previous_x]
+        edits.append((previous_k == k + 1, previous_x, previous_y))
+        x, y = previous_x, previous_y
+    edits.reverse()
+
+    # Group the adjacent edits into hunks
+    hunks = []
+    for is_insertion, x, y in edits:
+        if not hunks or hunks[-1][1] != x or hunks[-1][3] != y:
+            hunks.append([x, x, y, y])
+        if is_insertion:
+            hunks[-1][3] += 1
+        else:
+            hunks[-1][1] += 1
+
+    return [(prefix + x1, prefix + x2, prefix + y1, prefix + y2) for x1, x2, y1, y2 in hunks]
+
+
+def is_python_blob(name, mode):
+    # Only the Python files are tracked (submodules are skipped)
+    return name.endswith('.py') and mode != SUBMODULE_MODE
+
+
+def list_python_files(reader, tree_sha, prefix, files, submodules=None):
+    # Add the Python files of a tree (recursively) to files (path -> blob SHA), and its submodules to submodules if given
+    for name, (mode, sha) in reader.read_tree(tree_sha).items():
+        if mode == TREE_MODE:
+            list_python_files(reader, sha, f'{prefix}{name}/', files, submodules)
+        elif is_python_blob(name, mode):
+            files[f'{prefix}{name}'] = sha
+        elif mode == SUBMODULE_MODE and submodules is not None:
+            submodules[f'{prefix}{name}'] = sha
+
+
+def diff_trees(reader, old_tree, new_tree, prefix='', modified=None, deleted=None, added=None, submodules=None):
+    """
+    Compare two trees recursively (the identical subtrees are skipped).
+
+    Args:
+        reader: The GitBatchReader of the repository.
+        old_tree: The name of the old tree (or commit).
+        new_tree: The name of the new tree (or commit).
+        prefix: The path of the trees in the repository.
+        submodules: A dictionary the changed submodules (gitlinks) are added to (path -> (old SHA, new SHA), None for
+            an added or removed submodule), if given.
+
+    Returns:
+        A tuple of dictionaries of the Python files: modified (path -> (old SHA, new SHA)), deleted (path -> SHA) and
+        added (path -> SHA).
+    """
+    modified = {} if modified is None else modified
+    deleted = {} if deleted is None else deleted
+    added = {} if added is None else added
+    old_entries = reader.read_tree(old_tree)
+    new_entries = reader.read_tree(new_tree)
+
+    for name in sorted(old_entries.keys() | new_entries.keys()):
+        old_entry = old_entries.get(name)
+        new_entry = new_entries.get(name)
+        if old_entry == new_entry:
+            continue
+        path = f'{prefix}{name}'
+        old_is_tree = old_entry is not None and old_entry[0] == TREE_MODE
+        new_is_tree = new_entry is not None and new_entry[0] == TREE_MODE
+        if old_is_tree and new_is_tree:
+            diff_trees(reader, old_entry[1], new_entry[1], f'{path}/', modified, deleted, added, submodules)
+            continue
+
+        # The submodules are not Python files, but their code can change the results
+        old_submodule = old_entry[1] if old_entry is not None and old_entry[0] == SUBMODULE_MODE else None
+        new_submodule = new_entry[1] if new_entry is not None and new_entry[0] == SUBMODULE_MODE else None
+        if submodules is not None and (old_submodule is not None or new_submodule is not None):
+            submodules[path] = (old_submodule, new_submodule)
+
+        # A subtree replaced by a file (or the opposite) deletes (or adds) all its files
+        old_submodules = None if submodules is None else {}
+        new_submodules = None if submodules is None else {}
+        if old_is_tree:
+            list_python_files(reader, old_entry[1], f'{path}/', deleted, old_submodules)
+        if new_is_tree:
+            list_python_files(reader, new_entry[1], f'{path}/', added, new_submodules)
+        if submodules is not None:
+            submodules.update({submodule: (sha, None) for submodule, sha in old_submodules.items()})
+            submodules.update({submodule: (None, sha) for submodule, sha in new_submodules.items()})
+        old_blob = old_entry[1] if old_entry is not None and not old_is_tree and is_python_blob(name, old_entry[0]) else None
+        new_blob = new_entry[1] if new_entry is not None and not new_is_tree and is_python_blob(name, new_entry[0]) else None
+        if old_blob is not None and new_blob is not None:
+            modified[path] = (old_blob, new_blob)
+        elif old_blob is not None:
+            deleted[path] = old_blob
+        elif new_blob is not None:
+            added[path] = new_blob
+
+    return modified, deleted, added
+
+
+def get_similarity(old_lines, new_lines):
+    """
+    Get the similarity of two files: the size of the common lines over the size of the larger file
+    (close to the similarity score of git diff --find-renames).
+
+    Args:
+        old_lines: The lines of the old file.
+        new_lines: The lines of the new file.
+
+    Returns:
+        The similarity (between 0 and 1).
+    """
+    old_size = sum(len(line) + 1 for line in old_lines)
+    new_size = sum(len(line) + 1 for line in new_lines)
+    if max(old_size, new_size) == 0:
+        return 1.0
+    common = Counter(old_lines) & Counter(new_lines)
+    return sum((len(line) + 1) * count for line, count in common.items()) / max(old_size, new_size)
+
+
+def detect_renames(reader, deleted, added):
+    """
+    Detect the renamed Python files: identical blobs first, then the most similar files (at least RENAME_SIMILARITY).
+
+    Args:
+        reader: The GitBatchReader of the repository.
+        deleted: The deleted Python files (path -> SHA).
+        added: The added Python files (path -> SHA).
+
+    Returns:
+        A dictionary of the renames (new path -> old path).
+    """
+    renames = {}
+
+    # Identical blobs
+    deleted_by_sha = {}
+    for path, sha in sorted(deleted.items()):
+        deleted_by_sha.setdefault(sha, []).append(path)
+    for path, sha in sorted(added.items()):
+        if deleted_by_sha.get(sha):
+            renames[path] = deleted_by_sha[sha].pop(0)
+    remaining_deleted = sorted(set(deleted) - set(renames.values()))
+    remaining_added = sorted(set(added) - set(renames))
+    if not remaining_deleted or not remaining_added:
+        return renames
+
+    # Similar files (the pairs with the highest similarity first, each file is used once)
+    old_lines = {path: reader.read_lines(deleted[path]) for path in remaining_deleted}
+    new_lines = {path: reader.read_lines(added[path]) for path in remaining_added}
+    old_sizes = {path: sum(len(line) + 1 for line in lines) for path, lines in old_lines.items()}
+    new_sizes = {path: sum(len(line) + 1 for line in lines) for path, lines in new_lines.items()}
+    candidates = []
+    for new_path in remaining_added:
+        for old_path in remaining_deleted:
+            # Skip the pairs whose sizes are too different to be similar enough
+            if min(old_sizes[old_path], new_sizes[new_path]) < RENAME_SIMILARITY * max(old_sizes[old_path], new_sizes[new_path]):
+                continue
+            similarity = get_similarity(old_lines[old_path], new_lines[new_path])
+            if similarity >= RENAME_SIMILARITY:
+                candidates.append((-similarity, new_path, old_path))
+    used_old_paths = set()
+    for _, new_path, old_path in sorted(candidates):
+        if new_path not in renames and old_path not in used_old_paths:
+            renames[new_path] = old_path
+            used_old_paths.add(old_path)
+    return renames
+
+
+def track_changes_batch(repo_path, old_sha, new_sha):
+    """
+    Track the changes between two commits in a repository in process (see track_commit_changes.track_changes).
+
+    Args:
+        repo_path: The path to the repository.
+        old_sha: The SHA of the old commit.
+        new_sha: The SHA of the new commit.
+
+    Returns:
+        A dictionary containing the changes between the two commits (renames, offsets and new_file_changes).
+    """
+    reader = get_reader(repo_path)
+    modified, deleted, added = diff_trees(reader, old_sha, new_sha)
+    renames = detect_renames(reader, deleted, added)
+
+    # The files to compare: the modified files, the renamed files and the new files (compared with an empty file)
+    file_pairs = dict(modified)
+    for path, sha in added.items():
+        file_pairs[path] = (deleted[renames[path]] if path in renames else None, sha)
+
+    offsets = {}
+    new_file_changes = {}
+    for path in sorted(file_pairs):
+        old_blob, new_blob = file_pairs[path]
+        old_lines = reader.read_lines(old_blob) if old_blob is not None else []
+        new_lines = reader.read_lines(new_blob)
+        file_offsets = offsets.setdefault(path, {})
+        cumulative_offset = 0
+
+        # Store the cumulative offset at the first old line of each hunk (the line after the insertion point for an
+        # insertion, the line before it is unchanged)
+        for old_start, old_end, new_start, new_end in diff_lines(old_lines, new_lines):
+            cumulative_offset += (new_end - new_start) - (old_end - old_start)
+            if new_end > new_start:
+                new_file_changes.setdefault(path, []).append((new_start + 1, new_end))
+            file_offsets[old_start + 1] = cumulative_offset
+
+    return {
+        "renames": renames,
+        "offsets": offsets,
+        "new_file_changes": new_file_changes,
+    }
@@ -0,0 +1,95 @@
+import re
+import os
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+
+"""
+This script is used to read the per-test durations from the JUnit XML reports written by pytest (--junitxml).
+It should return the following information:
+- The duration of each test case, keyed by a test id built from the classname and name of the test case
+
+The test id can also be built from a pytest node id (e.g. tests/test_a.py::TestA::test_b[1]), so the durations
+of the original run can be looked up while the instrumented runs are executing.
+
+Only the standard library is used, as this script is also imported inside the PyMOP and DyLin test environments.
+"""
+
+
+def get_test_id(classname: str, name: str) -> str:
+    """
+    Build the test id of a test case from its JUnit classname and name.
+
+    Args:
+        classname: The classname attribute of the test case (e.g. tests.test_a.TestA).
+        name: The name attribute of the test case (e.g. test_b[1]).
+
+    Returns:
+        The test id of the test case (e.g. tests.test_a.TestA::test_b[1]).
+    """
+    if not classname:
+        return name
+    return f"{classname}::{name}"
+
+
+def nodeid_to_test_id(nodeid: str) -> str:
+    """
+    Convert a pytest node id to the test id used in the JUnit XML reports.
+    This follows the same mangling as pytest's junitxml plugin.
+
+    Args:
+        nodeid: The pytest node id (e.g. tests/test_a.py::TestA::test_b[1]).
+
+    Returns:
+        The test id of the test case (e.g. tests.test_a.TestA::test_b[1]).
+    """
+    # Split off the parameters (they may contain "::" or "/")
+    path, open_bracket, params = nodeid.partition("[")
+    names = path.split("::")
+
+    # Convert the file path to a dotted path
+    names[0] = names[0].replace("/", ".")
+    names[0] = re.sub(r"\.py$", "", names[0])
+
+    # Put the parameters back
+    names[-1] += open_bracket + params
+
+    return get_test_id(".".join(names[:-1]), names[-1])
+
+
+def read_junit_durations(junit_file: str) -> dict:
+    """
+    Read the duration of each test case from a JUnit XML report.
+
+    Args:
+        junit_file: The path to the JUnit XML report.
+
+    Returns:
+        An ordered dictionary mapping each test id to its duration in seconds, or None if the report cannot be read.
+    """
+    # Check if the JUnit XML report exists and is not empty
+    if not junit_file or not os.path.isfile(junit_file):
+        return None
+    if os.path.getsize(junit_file) == 0:
+        return None
+
+    # Parse the JUnit XML report
+    try:
+        tree = ET.parse(junit_file)
+    except ET.ParseError as e:
+        print(f"Error parsing JUnit XML file {junit_file}: {e}")
+        return None
+
+    # Iterate over all the test cases (they may be nested in one or more test suites)
+    durations = OrderedDict()
+    for testcase in tree.getroot().iter('testcase'):
+        test_id = get_test_id(testcase.get('classname', ''), testcase.get('name', ''))
+        try:
+            duration = float(testcase.get('time', 0.0))
+        except ValueError:
+            continue
+        # Sum the durations if a test case is reported more than once (e.g. reruns)
+        durations[test_id] = durations.get(test_id, 0.0) + duration
+
+    # Return the durations of all the test cases
+    return durations
@@ -0,0 +1,411 @@
+import os
+import re
+import csv
+import sys
+import json
+import heapq
+import shutil
+import signal
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from time import monotonic
+
+
+"""
+This script is used to run the pipeline for the commits of many projects on the local machine (instead of one GitHub
+workflow dispatch per commit).
+It schedules (project, commit) jobs with:
+- A priority queue: the jobs with the lowest priority number run first (then in the order they were submitted)
+- A worker pool sized to the machine: the number of cores divided by the cores of a job, and the available memory
+  divided by the memory of a job
+- Per-job resource limits: a wall-clock timeout (the process group of the job is terminated, then killed, and the
+  Docker container of the job is removed), and the cores and memory of the job passed to the job (JOB_CPUS and
+  JOB_MEMORY_MB, see run_local_pipeline.sh)
+- Retries of the timed-out jobs: at a lower priority (so the jobs of the other projects run first) and with a longer
+  timeout, the later jobs of the project wait for the retry (they need the results of its commit)
+- A status file: a JSON file with the state of each job, rewritten on each change
+
+The jobs of a project run one at a time, in the order they were queued (their priority, then their submission):
+a job uses the results of the previous commits
+of its project (the filter, the spec selection and the skip of unchanged commits), which are kept in the directory
+of the project (<work_dir>/<project>). The job body is run_local_pipeline.sh (the runner scripts, then
+run_pipeline.py), its output is written to <work_dir>/logs.
+
+The jobs file is a CSV file with the project (owner/name on GitHub, or a repository URL or path) and commit columns,
+and the optional parent (the parent commit to filter against) and priority columns.
+
+Usage: python3 local_scheduler.py <jobs.csv> --work-dir <dir> [--workers <n>] [--job-cpus <n>] [--job-memory-mb <n>]
+                                  [--job-timeout <s>] [--retries <n>] [--status-file <status.json>]
+"""
+
+
+# The defaults of the jobs (the cores, memory and timeout of a job, and the number of retries of a timed-out job)
+DEFAULT_JOB_CPUS = 2
+DEFAULT_JOB_MEMORY_MB = 8192
+DEFAULT_JOB_TIMEOUT = 4 * 3600
+DEFAULT_RETRIES = 1
+
+# A retried job is moved this many priority levels down, and its timeout is multiplied by this factor
+RETRY_PRIORITY_PENALTY = 100
+RETRY_TIMEOUT_FACTOR = 2
+
+# The time a job has to stop after SIGTERM before it is killed (the Docker client stops the container on SIGTERM)
+KILL_GRACE_PERIOD = 10
+
+# The job body
+JOB_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'run_local_pipeline.sh')
+
+
+def get_available_memory_mb() -> int:
+    """
+    Get the memory available for new processes.
+
+    Returns:
+        The available memory in MB (MemAvailable on Linux, the physical memory otherwise), or None if unknown.
+    """
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (ValueError, OSError):
+        return None
+
+
+def get_worker_count(job_cpus: int, job_memory_mb: int, cpus: int = None, memory_mb: int = None) -> int:
+    """
+    Get the number of workers the machine can run at the same time.
+
+    Args:
+        job_cpus: The cores of a job.
+        job_memory_mb: The memory of a job in MB.
+        cpus: The cores of the machine (the usable cores of the process if not given).
+        memory_mb: The available memory of the machine in MB (see get_available_memory_mb if not given).
+
+    Returns:
+        The number of workers (at least 1).
+    """
+    if cpus is None:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    if memory_mb is None:
+        memory_mb = get_available_memory_mb()
+    workers = cpus // max(1, job_cpus)
+    if memory_mb is not None and job_memory_mb:
+        workers = min(workers, memory_mb // job_memory_mb)
+    return max(1, workers)
+
+
+def get_repo_url(project: str) -> str:
+    # The projects are GitHub repositories (owner/name), like in the workflows, unless a URL or a path is given
+    if '://' in project or project.startswith('git@') or os.path.exists(project):
+        return project
+    return f'https://github.com/{project}.git'
+
+
+def get_container_name(job: dict) -> str:
+    # The name of the Docker container of an attempt of a job (letters, digits, _, . and - only)
+    return re.sub(r'[^a-zA-Z0-9_.-]', '-', f"ca-{job['name']}-{job['commit'][:12]}-{job['id']}-{job['attempts']}")
+
+
+def get_project_name(project: str) -> str:
+    # The name of the project directory (the repository name, like REPO_NAME in the workflows)
+    name = os.path.basename(project.rstrip('/'))
+    return name[:-len('.git')] if name.endswith('.git') else name
+
+
+def read_jobs(jobs_file: str) -> list:
+    """
+    Read the jobs from a CSV file.
+
+    Args:
+        jobs_file: The path to the CSV file (project, commit, and optionally parent and priority columns).
+
+    Returns:
+        A list of the jobs (dictionaries), in the order of the file.
+    """
+    jobs = []
+    with open(jobs_file, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if not row.get('project') or not row.get('commit'):
+                continue
+            jobs.append({
+                'project': row['project'].strip(),
+                'commit': row['commit'].strip(),
+                'parent': (row.get('parent') or '').strip(),
+                'priority': int(row.get('priority') or 0),
+            })
+    return jobs
+
+
+class LocalScheduler:
+    """
+    Run the pipeline jobs of many projects with a pool of workers.
+    """
+
+    def __init__(self, work_dir, workers=None, job_cpus=DEFAULT_JOB_CPUS, job_memory_mb=DEFAULT_JOB_MEMORY_MB,
+                 job_timeout=DEFAULT_JOB_TIMEOUT, retries=DEFAULT_RETRIES, status_file=None, command=None):
+        self.work_dir = os.path.abspath(work_dir)
+        self.workers = workers or get_worker_count(job_cpus, job_memory_mb)
+        self.job_cpus = job_cpus
+        self.job_memory_mb = job_memory_mb
+        self.job_timeout = job_timeout
+        self.retries = retries
+        self.status_file = status_file or os.path.join(self.work_dir, 'scheduler_status.json')
+        # The command of the job body (the project directory, repository URL, commit and parent are appended)
+        self.command = command or ['bash', JOB_SCRIPT]
+
+        self.jobs = []
+        self.queue = []
+        self.running_projects = set()
+        self.processes = {}
+        self.stopping = False
+        self.condition = threading.Condition()
+        self.status_lock = threading.Lock()
+
+    def submit(self, project, commit, parent='', priority=0):
+        """
+        Add a job to the queue.
+
+        Args:
+            project: The project (owner/name on GitHub, or a repository URL or path).
+            commit: The commit to analyze.
+            parent: The parent commit to filter against (optional).
+            priority: The priority of the job (the lowest number runs first).
+
+        Returns:
+            The job (a dictionary, updated as it runs).
+        """
+        job = {
+            'id': len(self.jobs),
+            'project': project,
+            'name': get_project_name(project),
+            'commit': commit,
+            'parent': parent,
+            'priority': priority,
+            # The order of the job among the jobs of its project (kept when it is retried)
+            'project_order': (priority, len(self.jobs)),
+            'state': 'queued',
+            'attempts': 0,
+            'timeout': self.job_timeout,
+            'exit_code': None,
+            'started_at': None,
+            'finished_at': None,
+            'duration': None,
+            'log': None,
+        }
+        with self.condition:
+            self.jobs.append(job)
+            heapq.heappush(self.queue, (priority, job['id'], job))
+            self.condition.notify_all()
+        return job
+
+    def next_job(self):
+        # Get the first job of the queue whose project has no running job and that is the next job of its project
+        # (a retried job has a lower priority, but the later jobs of its project still wait for it), None when the
+        # queue is empty
+        with self.condition:
+            while True:
+                if self.stopping:
+                    return None
+                next_orders = {}
+                for _, _, queued_job in self.queue:
+                    order = next_orders.get(queued_job['name'])
+                    if order is None or queued_job['project_order'] < order:
+                        next_orders[queued_job['name']] = queued_job['project_order']
+                skipped = []
+                job = None
+                while self.queue:
+                    entry = heapq.heappop(self.queue)
+                    if entry[2]['name'] in self.running_projects or entry[2]['project_order'] != next_orders[entry[2]['name']]:
+                        skipped.append(entry)
+                        continue
+                    job = entry[2]
+                    break
+                for entry in skipped:
+                    heapq.heappush(self.queue, entry)
+                if job is not None:
+                    self.running_projects.add(job['name'])
+                    job['state'] = 'running'
+                    return job
+                if not self.queue and not self.running_projects:
+                    return None
+                self.condition.wait()
+
+    def run_job(self, job):
+        """
+        Run a job (the job body in its own process group, killed if it exceeds the timeout of the job).
+
+        Args:
+            job: The job.
+
+        Returns:
+            The exit code of the job body, or None if it timed out.
+        """
+        job['attempts'] += 1
+        job['started_at'] = datetime.now().isoformat(timespec='seconds')
+        logs_dir = os.path.join(self.work_dir, 'logs')
+        os.makedirs(logs_dir, exist_ok=True)
+        job['log'] = os.path.join(logs_dir, f"{job['name']}_{job['commit']}_{job['attempts']}.log")
+        self.write_status()
+
+        # The PyMOP container of the job is named, so it can be removed when the job is killed
+        container = get_container_name(job)
+        env = dict(os.environ, JOB_CPUS=str(self.job_cpus), JOB_MEMORY_MB=str(self.job_memory_mb), JOB_CONTAINER_NAME=container)
+        args = self.command + [os.path.join(self.work_dir, job['name']), get_repo_url(job['project']), job['commit']]
+        if job['parent']:
+            args.append(job['parent'])
+
+        start = monotonic()
+        with open(job['log'], 'w') as log:
+            process = subprocess.Popen(args, stdout=log, stderr=subprocess.STDOUT, env=env, start_new_session=True)
+            with self.condition:
+                self.processes[job['id']] = (process, container)
+            try:
+                exit_code = process.wait(timeout=job['timeout'])
+            except subprocess.TimeoutExpired:
+                exit_code = None
+                self.kill(process, container)
+            finally:
+                with self.condition:
+                    self.processes.pop(job['id'], None)
+        job['duration'] = round(monotonic() - start, 1)
+        job['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        return exit_code
+
+    def kill(self, process, container=None):
+        # Terminate the process group of a job (the runner scripts, the tests and the Docker client), kill it if it
+        # does not stop in time, then remove the container of the job (killing the Docker client does not stop it)
+        for sig, timeout in ((signal.SIGTERM, KILL_GRACE_PERIOD), (signal.SIGKILL, None)):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                pass
+            try:
+                process.wait(timeout=timeout)
+                break
+            except subprocess.TimeoutExpired:
+                continue
+        if container and shutil.which('docker'):
+            subprocess.run(['docker', 'rm', '-f', container], capture_output=True)
+
+    def finish_job(self, job, exit_code):
+        # Record the result of a job, and queue the retry of a timed-out job at a lower priority with a longer timeout
+        # (it keeps its order among the jobs of its project, see next_job)
+        with self.condition:
+            job['exit_code'] = exit_code
+            if exit_code is None and job['attempts'] <= self.retries and not self.stopping:
+                job['state'] = 'queued'
+                job['priority'] += RETRY_PRIORITY_PENALTY
+                job['timeout'] *= RETRY_TIMEOUT_FACTOR
+                heapq.heappush(self.queue, (job['priority'], job['id'], job))
+            elif exit_code is None:
+                job['state'] = 'timeout'
+            else:
+                job['state'] = 'done' if exit_code == 0 else 'failed'
+            self.running_projects.discard(job['name'])
+            self.condition.notify_all()
+        self.write_status()
+
+    def worker(self):
+        while True:
+            job = self.next_job()
+            if job is None:
+                return
+            print(f"[{job['name']}] {job['commit']}: started (attempt {job['attempts'] + 1})", flush=True)
+            try:
+                exit_code = self.run_job(job)
+            except OSError as e:
+                print(f"[{job['name']}] {job['commit']}: could not run the job: {e}", flush=True)
+                exit_code = -1
+            self.finish_job(job, exit_code)
+            print(f"[{job['name']}] {job['commit']}: {job['state']} ({job['duration']}s)", flush=True)
+
+    def write_status(self):
+        """
+        Write the status file (written to a temporary file first, so it can be read at any time).
+        """
+        with self.status_lock:
+            with self.condition:
+                jobs = [{key: value for key, value in job.items()} for job in self.jobs]
+            states = {}
+            for job in jobs:
+                states[job['state']] = states.get(job['state'], 0) + 1
+            status = {
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+                'workers': self.workers,
+                'job_cpus': self.job_cpus,
+                'job_memory_mb': self.job_memory_mb,
+                'states': states,
+                'jobs': jobs,
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(self.status_file)), exist_ok=True)
+            with open(self.status_file + '.tmp', 'w') as f:
+                json.dump(status, f, indent=2)
+            os.replace(self.status_file + '.tmp', self.status_file)
+
+    def stop(self):
+        # Stop the workers and kill the running jobs
+        with self.condition:
+            self.stopping = True
+            processes = list(self.processes.values())
+            self.condition.notify_all()
+        for process, container in processes:
+            self.kill(process, container)
+
+    def run(self):
+        """
+        Run the queued jobs until the queue is empty.
+
+        Returns:
+            The jobs.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.write_status()
+        threads = [threading.Thread(target=self.worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            print('Stopping the jobs', flush=True)
+            self.stop()
+            for thread in threads:
+                thread.join()
+        self.write_status()
+        return self.jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the pipeline for the commits of many projects on the local machine.')
+    parser.add_argument('jobs_file', help='The CSV file of the jobs (project, commit, parent, priority).')
+    parser.add_argument('--work-dir', required=True, help='The directory of the projects, logs and status file.')
+    parser.add_argument('--workers', type=int, default=None, help='The number of workers (sized to the machine if not given).')
+    parser.add_argument('--job-cpus', type=int, default=DEFAULT_JOB_CPUS)
+    parser.add_argument('--job-memory-mb', type=int, default=DEFAULT_JOB_MEMORY_MB)
+    parser.add_argument('--job-timeout', type=int, default=DEFAULT_JOB_TIMEOUT, help='The timeout of a job in seconds.')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help='The number of retries of a timed-out job.')
+    parser.add_argument('--status-file', default=None, help='The status file (<work_dir>/scheduler_status.json by default).')
+    args = parser.parse_args()
+
+    scheduler = LocalScheduler(args.work_dir, args.workers, args.job_cpus, args.job_memory_mb, args.job_timeout,
+                               args.retries, args.status_file)
+    for job in read_jobs(args.jobs_file):
+        scheduler.submit(job['project'], job['commit'], job['parent'], job['priority'])
+    print(f'Running {len(scheduler.jobs)} jobs with {scheduler.workers} workers (status: {scheduler.status_file})', flush=True)
+
+    jobs = scheduler.run()
+    failed = [job for job in jobs if job['state'] != 'done']
+    print(f'{len(jobs) - len(failed)} jobs done, {len(failed)} jobs failed or timed out')
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+
+"""
+This script is used to run a command and measure the resources it consumed.
+It should record the following information once the command has finished:
+- The peak resident set size (RSS) of the command and all of its waited-for children
+- The user and system CPU time of the command and all of its waited-for children
+- The number of bytes read from and written to the block devices
+
+The measurements are appended to the output file as "Key: value" lines, so they can be
+concatenated to the results file of each runner script and parsed back by parse_continuous_analysis_output.py.
+
+The exit code of the measured command is returned unchanged (e.g. 124 or 137 for a timeout).
+
+Usage: python3 measure_resources.py --output <output_file> -- <command> [args...]
+"""
+
+
+# Size of a block reported by getrusage (ru_inblock and ru_oublock are counted in 512-byte units)
+BLOCK_SIZE = 512
+
+
+def run_and_measure(command: list) -> tuple:
+    """
+    Run a command and measure the resources it consumed.
+
+    Args:
+        command: The command to run as a list of arguments.
+
+    Returns:
+        A tuple containing the exit code of the command and a dictionary with the resource usage.
+    """
+    # Start the command and wait for it while collecting its resource usage
+    # wait4 reports the usage of the child and all of its children that it waited for
+    process = subprocess.Popen(command)
+    _, status, usage = os.wait4(process.pid, 0)
+
+    # Convert the wait status to a shell-like exit code (128 + signal number if killed by a signal)
+    exit_code = os.waitstatus_to_exitcode(status)
+    if exit_code < 0:
+        exit_code = 128 - exit_code
+    process.returncode = exit_code
+
+    # Format the resource usage (ru_maxrss is reported in kilobytes on Linux)
+    resource_usage = {
+        'Peak RSS': f'{usage.ru_maxrss}KB',
+        'User CPU Time': f'{usage.ru_utime}s',
+        'System CPU Time': f'{usage.ru_stime}s',
+        'Read Bytes': f'{usage.ru_inblock * BLOCK_SIZE}B',
+        'Write Bytes': f'{usage.ru_oublock * BLOCK_SIZE}B',
+    }
+
+    # Return the exit code and the resource usage
+    return exit_code, resource_usage
+
+
+def main():
+    # Get the output file and the command from the command line
+    # Usage: python3 measure_resources.py --output <output_file> -- <command> [args...]
+    if len(sys.argv) < 5 or sys.argv[1] != '--output' or sys.argv[3] != '--':
+        print(f"Usage: {sys.argv[0]} --output <output_file> -- <command> [args...]")
+        return 1
+    output_file = sys.argv[2]
+    command = sys.argv[4:]
+
+    # Run the command and measure the resources it consumed
+    exit_code, resource_usage = run_and_measure(command)
+
+    # Append the resource usage to the output file
+    with open(output_file, 'a') as f:
+        for key, value in resource_usage.items():
+            f.write(f'{key}: {value}\n')
+
+    # Return the exit code of the measured command
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
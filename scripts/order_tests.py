@@ -0,0 +1,296 @@
+import os
+import re
+import ast
+import csv
+import sys
+import json
+import argparse
+import subprocess
+from statistics import median
+from junit_durations import nodeid_to_test_id, read_junit_durations
+
+
+"""
+This script is used to order the tests of the PyMOP and DyLin runs so that a run that is stopped early (by the
+time limit of the run) has found as many violations as possible.
+It should return the following information (the order file read by continuous_analysis_plugin.py):
+- The number of violation locations each test triggered in the run of the parent commit (violations_by_test)
+- The estimated duration of each test in the instrumented run (the mean of its last instrumented durations, or its
+  duration in the original run times the median overhead of the project)
+- The tests whose code changed since the parent commit (found from the diff before DyLin instruments the files)
+
+The tests are then run in the following order:
+1. The tests whose code changed since the parent commit (new tests included)
+2. The tests by the number of violations they found per second, the tests without violations from the fastest one
+
+The tests of a module (or a class) are kept together, so that its module and class fixtures are set up once: the
+modules and classes are ordered by the violations per second of all their tests (the ones with a changed test first),
+and their tests in the order above. The tests can be interleaved across modules and classes instead (the
+--ca-test-order-global option of continuous_analysis_plugin.py, TEST_ORDER=global in the runner scripts).
+
+Only the standard library is used, as this script runs inside the PyMOP and DyLin test environments.
+
+Usage: python3 order_tests.py <project> <algorithm> --output <order.json> [--history <results.csv>] [--durations <test_durations.csv>] [--junit <junit.xml>] [--repo <repo>] [--parent <sha>]
+"""
+
+
+# The number of runs the durations are averaged over, and the minimum duration of a test (so that a test with a
+# duration of 0 does not get an infinite rate)
+DEFAULT_WINDOW = 5
+MIN_DURATION = 0.01
+
+# A violation location of the violations_by_test column (spec:filepath:line_num={'test1', 'test2'})
+VIOLATION_BY_TEST_ENTRY = re.compile(r'(?:^|;)([^;:=]+:[^;=]*:\d+)=(\{.*?\}|set\(\))(?=;[^;:=]+:[^;=]*:\d+=|$)')
+
+# A hunk header of a unified diff (the start line and number of lines of the new file)
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+def parse_violations_by_test(violations_by_test: str) -> dict:
+    """
+    Count the violation locations of each test from a violations_by_test value.
+
+    Args:
+        violations_by_test: The violations_by_test value of a run.
+
+    Returns:
+        A dictionary mapping each pytest node id to its number of violation locations.
+    """
+    counts = {}
+    for _, test_ids in VIOLATION_BY_TEST_ENTRY.findall(violations_by_test or ''):
+        try:
+            test_ids = ast.literal_eval(test_ids) if test_ids != 'set()' else set()
+        except (ValueError, SyntaxError):
+            continue
+        for test_id in test_ids:
+            counts[test_id] = counts.get(test_id, 0) + 1
+    return counts
+
+
+def read_violation_history(history_file: str, project: str, algorithm: str, parent: str = None) -> dict:
+    """
+    Read the violations of each test in the run of the parent commit from the over time results.
+
+    Args:
+        history_file: The path to the continuous_analysis_over_time_results.csv file.
+        project: The project.
+        algorithm: The algorithm (pymop or dylin).
+        parent: The SHA of the parent commit (the last run with violations by test if not given or not found).
+
+    Returns:
+        A dictionary mapping each pytest node id to its number of violation locations.
+    """
+    # The violations columns can be very large
+    csv.field_size_limit(sys.maxsize)
+
+    parent_value = None
+    last_value = None
+    with open(history_file, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('project') != project or row.get('algorithm') != algorithm or not row.get('violations_by_test'):
+                continue
+            last_value = row['violations_by_test']
+            if parent and row.get('commit_sha') == parent:
+                parent_value = last_value
+    return parse_violations_by_test(parent_value if parent_value is not None else last_value)
+
+
+def read_recent_durations(durations_file: str, project: str, algorithm: str, window: int = DEFAULT_WINDOW) -> tuple:
+    """
+    Read the recent instrumented durations of each test from the over time test durations.
+
+    Args:
+        durations_file: The path to the continuous_analysis_over_time_test_durations.csv file.
+        project: The project.
+        algorithm: The algorithm (pymop or dylin).
+        window: The number of most recent durations of a test that are averaged.
+
+    Returns:
+        A tuple containing a dictionary mapping each test id to its mean instrumented duration, and the median
+        overhead of the algorithm (None if there is no overhead).
+    """
+    durations = {}
+    overheads = []
+    with open(durations_file, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('project') != project:
+                continue
+            # The durations of the tests that did not run are crossed out (x)
+            try:
+                duration = float(row[f'{algorithm}_time'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            durations.setdefault(row['test_id'], []).append(duration)
+            try:
+                overheads.append(float(row[f'{algorithm}_overhead']))
+            except (KeyError, TypeError, ValueError):
+                pass
+    mean_durations = {test_id: sum(values[-window:]) / len(values[-window:]) for test_id, values in durations.items()}
+    return mean_durations, (median(overheads) if overheads else None)
+
+
+def get_changed_lines(repo_path: str, parent: str) -> dict:
+    """
+    Get the lines of the Python files changed since the parent commit (in the working tree).
+
+    Args:
+        repo_path: The path to the repository.
+        parent: The SHA (or revision) of the parent commit.
+
+    Returns:
+        A dictionary mapping each changed file (relative to the repository) to its changed line ranges
+        ([start, end], inclusive), or None if the diff is not available.
+    """
+    result = subprocess.run(['git', '-C', repo_path, 'diff', '--no-color', '--no-ext-diff', '-U0', parent, '--', '*.py'],
+                            capture_output=True, text=True, errors='replace')
+    if result.returncode != 0:
+        return None
+
+    changed_lines = {}
+    path = None
+    for line in result.stdout.splitlines():
+        if line.startswith('+++ '):
+            path = line[6:] if line.startswith('+++ b/') else None
+        elif path and line.startswith('@@'):
+            match = HUNK_HEADER.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                if count > 0:
+                    changed_lines.setdefault(path, []).append([start, start + count - 1])
+    return changed_lines
+
+
+def get_changed_tests(repo_path: str, changed_lines: dict) -> list:
+    """
+    Get the functions and methods whose code intersects the changed lines (read before the files are instrumented).
+
+    Args:
+        repo_path: The path to the repository.
+        changed_lines: The changed line ranges of each file (see get_changed_lines).
+
+    Returns:
+        The sorted pytest node ids (without parameters) of the changed functions and methods
+        (e.g. tests/test_a.py::TestA::test_b).
+    """
+    changed_tests = set()
+    for path, ranges in (changed_lines or {}).items():
+        try:
+            with open(os.path.join(repo_path, path), 'r', encoding='utf-8', errors='replace') as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            continue
+
+        # Walk the classes and functions, with the names of their enclosing classes
+        nodes = [(node, path) for node in tree.body]
+        while nodes:
+            node, prefix = nodes.pop()
+            if isinstance(node, ast.ClassDef):
+                nodes.extend((child, f'{prefix}::{node.name}') for child in node.body)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+                if any(first <= node.end_lineno and start <= last for first, last in ranges):
+                    changed_tests.add(f'{prefix}::{node.name}')
+    return sorted(changed_tests)
+
+
+def build_order_data(violations: dict, durations: dict, original_durations: dict, overhead: float, changed_tests: list) -> dict:
+    """
+    Build the order data of a run (see order_tests).
+
+    Args:
+        violations: The number of violation locations of each pytest node id (see read_violation_history).
+        durations: The recent instrumented duration of each test id (see read_recent_durations).
+        original_durations: The duration of each test id in the original run of the commit.
+        overhead: The median overhead of the instrumented run (applied to the original durations).
+        changed_tests: The node ids of the changed tests (see get_changed_tests).
+
+    Returns:
+        A dictionary with the violations, durations and changed tests.
+    """
+    estimated = {test_id: duration * (overhead or 1.0) for test_id, duration in (original_durations or {}).items()}
+    estimated.update(durations or {})
+    return {'violations': violations or {}, 'durations': estimated, 'changed_tests': list(changed_tests or [])}
+
+
+def get_test_group(nodeid: str) -> str:
+    # The module or class of a test (its node id without the parameters and the test name)
+    return nodeid.partition('[')[0].rpartition('::')[0]
+
+
+def order_tests(nodeids: list, data: dict, grouped: bool = True) -> list:
+    """
+    Order the tests of a run.
+
+    Args:
+        nodeids: The pytest node ids of the tests in their collection order.
+        data: The order data (see build_order_data).
+        grouped: Whether the tests of a module or class are kept together (interleaved across them otherwise).
+
+    Returns:
+        The indexes of the tests in the order they should run.
+    """
+    violations = data.get('violations', {})
+    durations = data.get('durations', {})
+    changed_tests = set(data.get('changed_tests', []))
+    default_duration = median(durations.values()) if durations else 1.0
+
+    # The changed state, number of violations and duration of each test
+    tests = []
+    for nodeid in nodeids:
+        duration = max(durations.get(nodeid_to_test_id(nodeid), default_duration), MIN_DURATION)
+        tests.append((nodeid.partition('[')[0] in changed_tests, violations.get(nodeid, 0), duration))
+
+    def key(index):
+        changed, num_violations, duration = tests[index]
+        return (not changed, -num_violations / duration, duration, index)
+
+    order = sorted(range(len(nodeids)), key=key)
+    if not grouped:
+        return order
+
+    # Order the groups by their changed tests and the violations per second of all their tests
+    groups = {}
+    for index in order:
+        groups.setdefault(get_test_group(nodeids[index]), []).append(index)
+
+    def group_key(indexes):
+        changed = any(tests[index][0] for index in indexes)
+        num_violations = sum(tests[index][1] for index in indexes)
+        duration = sum(tests[index][2] for index in indexes)
+        return (not changed, -num_violations / duration, duration, min(indexes))
+
+    return [index for indexes in sorted(groups.values(), key=group_key) for index in indexes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the test order of a PyMOP or DyLin run.')
+    parser.add_argument('project')
+    parser.add_argument('algorithm', choices=['pymop', 'dylin'])
+    parser.add_argument('--output', required=True, help='The JSON file to save the order data to.')
+    parser.add_argument('--history', default=None, help='The continuous_analysis_over_time_results.csv file.')
+    parser.add_argument('--durations', default=None, help='The continuous_analysis_over_time_test_durations.csv file.')
+    parser.add_argument('--junit', default=None, help='The JUnit XML report of the original run of the commit.')
+    parser.add_argument('--repo', default='.', help='The repository of the run.')
+    parser.add_argument('--parent', default=None, help='The parent commit (HEAD~1 by default).')
+    parser.add_argument('--window', type=int, default=int(os.environ.get('TEST_ORDER_WINDOW', DEFAULT_WINDOW)))
+    args = parser.parse_args()
+
+    violations = {}
+    if args.history and os.path.isfile(args.history):
+        violations = read_violation_history(args.history, args.project, args.algorithm, args.parent)
+    durations, overhead = {}, None
+    if args.durations and os.path.isfile(args.durations):
+        durations, overhead = read_recent_durations(args.durations, args.project, args.algorithm, args.window)
+    original_durations = read_junit_durations(args.junit) if args.junit and os.path.isfile(args.junit) else None
+    changed_tests = get_changed_tests(args.repo, get_changed_lines(args.repo, args.parent or 'HEAD~1'))
+
+    data = build_order_data(violations, durations, original_durations, overhead, changed_tests)
+    with open(args.output, 'w') as f:
+        json.dump(data, f)
+    print(f"Test order: {len(data['violations'])} tests with violations, {len(data['durations'])} tests with durations, "
+          f"{len(data['changed_tests'])} changed tests")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,13 @@ import csv
 from datetime import datetime
 import sys
 import xml.etree.ElementTree as ET
-from git import Repo
+from junit_durations import read_junit_durations
+from commit_metadata import get_commit, get_commit_metadata_file
+from analysis_scope import DEFAULT_SCOPE, in_analysis_scope, parse_analysis_scope
+from pipeline_profiler import get_profiler
+from capture_output import find_output_file, open_output_file
+from csv_schema import reconcile_header
+from select_specs import parse_counts
 
 
 dylin_spec_dict = {
@@ -35,6 +41,126 @@ dylin_spec_dict = {
              "TP-03": "Requests_DataMustOpenInBinary",
              "TP-04": "Session_DataMustOpenInBinary"}
 
+# The stage timers and counters of the script (enabled with the CA_PROFILE environment variable)
+profiler = get_profiler('parse_continuous_analysis_output')
+
+# The statistics files of the current run that were recovered from a truncated document (see load_json_tolerant)
+salvaged_statistics_files = set()
+
+
+def get_statistics_file(filename):
+    """
+    Get the statistics file to read
+
+    Args:
+        filename: A string containing the name of the JSON statistics file (e.g. D-violations.json)
+
+    Returns:
+        A string containing the name of the statistics file, or None if it does not exist or is empty
+    """
+    if os.path.isfile(filename) and os.path.getsize(filename) > 0:
+        return filename
+    return None
+
+def salvage_truncated_json(content, index=0):
+    """
+    Recover every complete value from a JSON document that was truncated (e.g. by a timeout while it was written)
+
+    Args:
+        content: A string containing the (possibly truncated) JSON document
+        index: The index in the content where the value to recover starts
+
+    Returns:
+        A tuple containing the recovered value (None if nothing could be recovered) and whether it was complete
+    """
+    decoder = json.JSONDecoder()
+
+    # Skip the leading whitespace
+    while index < len(content) and content[index].isspace():
+        index += 1
+    if index >= len(content):
+        return None, False
+
+    # Try to decode the value directly
+    try:
+        value, _ = decoder.raw_decode(content, index)
+        return value, True
+    except ValueError:
+        pass
+
+    # Only objects and arrays can be partially recovered
+    if content[index] not in '{[':
+        return None, False
+    is_object = content[index] == '{'
+    recovered = {} if is_object else []
+    index += 1
+
+    # Iterate over the members of the object or the items of the array
+    while True:
+        # Skip the whitespace and the separator before the next member
+        while index < len(content) and (content[index].isspace() or content[index] == ','):
+            index += 1
+        if index >= len(content):
+            return recovered, False
+
+        # Get the key of the member of the object
+        if is_object:
+            try:
+                key, index = decoder.raw_decode(content, index)
+            except ValueError:
+                return recovered, False
+            while index < len(content) and content[index] in ' \t\r\n:':
+                index += 1
+
+        # Try to decode the value of the member or item
+        try:
+            value, index = decoder.raw_decode(content, index)
+        except ValueError:
+            # Keep a truncated object member if part of it can be recovered (e.g. the violations of the last spec)
+            # A truncated array item is dropped, as it is an incomplete record
+            if is_object:
+                value, _ = salvage_truncated_json(content, index)
+                if value:
+                    recovered[key] = value
+            return recovered, False
+
+        # Add the complete member or item
+        if is_object:
+            recovered[key] = value
+        else:
+            recovered.append(value)
+
+def load_json_tolerant(filename):
+    """
+    Load a JSON statistics file, recovering the complete records of a truncated file (e.g. when the run timed out
+    while PyMOP was writing it). The recovered files are added to salvaged_statistics_files
+
+    Args:
+        filename: A string containing the path to the JSON file
+
+    Returns:
+        The loaded (or recovered) JSON data, or None if nothing could be recovered
+    """
+    # Read the content of the file
+    with open(filename, 'r') as f:
+        content = f.read()
+
+    # Try to load the whole file as a single JSON document
+    try:
+        return json.loads(content)
+    except (json.JSONDecodeError, ValueError) as e:
+        error = e
+
+    # Try to recover the complete records of a truncated JSON document
+    json_data, _ = salvage_truncated_json(content)
+    if json_data:
+        print(f"Recovered partial data from truncated JSON file {filename}: {error}")
+        salvaged_statistics_files.add(filename)
+        return json_data
+
+    # Nothing could be recovered
+    print(f"Error parsing JSON file {filename}: {error}")
+    return None
 
 def get_time_from_json():
     """
@@ -43,23 +169,16 @@ def get_time_from_json():
     Returns:
         A tuple containing the instrumentation duration, create monitor duration, and test duration
     """
-    # Define the time file name
-    filename = f'D-time.json'
+    # Get the time file name
+    filename = get_statistics_file('D-time.json')
 
-    # Check if the time file exists
-    if not os.path.isfile(filename):
-        return None
-    
-    # Check if the time file is empty
-    if os.path.getsize(filename) == 0:
+    # Check if the time file exists and is not empty
+    if filename is None:
         return None
     
-    # Load the time JSON file
-    try:
-        with open(filename, 'r') as f:
-            json_data = json.load(f)
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"Error parsing JSON file {filename}: {e}")
+    # Load the time JSON file (recovering partial data if it is truncated)
+    json_data = load_json_tolerant(filename)
+    if json_data is None:
         return None
 
     # Get the time information from the JSON file
@@ -77,23 +196,16 @@ def get_monitors_and_events_from_json(algorithm):
     Returns:
         A tuple containing the monitor and event information
     """
-    # Define the monitor and event filename
-    filename = f'{algorithm}-full.json'
+    # Get the monitor and event file name
+    filename = get_statistics_file(f'{algorithm}-full.json')
 
-    # Check if the monitor and event file exists
-    if not os.path.isfile(filename):
-        return None
-    
-    # Check if the monitor and event file is empty
-    if os.path.getsize(filename) == 0:
+    # Check if the monitor and event file exists and is not empty
+    if filename is None:
         return None
     
-    # Load the monitor and event JSON file
-    try:
-        with open(filename, 'r') as f:
-            json_data = json.load(f)
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"Error parsing JSON file {filename}: {e}")
+    # Load the monitor and event JSON file (recovering partial data if it is truncated)
+    json_data = load_json_tolerant(filename)
+    if json_data is None:
         return None
 
     # Initialize the variables for the monitor and event information
@@ -106,14 +218,14 @@ def get_monitors_and_events_from_json(algorithm):
     for spec in json_data.keys():
 
         # Get the number of monitors for the spec
-        num_monitors = json_data[spec]["monitors"]
+        num_monitors = json_data[spec].get("monitors", 0)
         # Get the total number of events for the spec
-        total_events_spec = sum(json_data[spec]["events"].values())
+        total_events_spec = sum(json_data[spec].get("events", {}).values())
 
         # Update the return string for the monitors of the spec
         return_str_monitors += f'{spec}={num_monitors}<>'
         # Update the return string for the events of the spec
-        for event, count in json_data[spec]["events"].items():
+        for event, count in json_data[spec].get("events", {}).items():
             return_str_events += f'{spec}={event}={count}<>'
 
         # Update the total number of monitors and events
@@ -128,25 +240,19 @@ def get_num_violations_from_json():
     Extract violation information from JSON file
 
     Returns:
-        A tuple containing the number of violations, the unique violations count, and the violations by location
+        A tuple containing the number of violations, the unique violations count, the violations by location and by test,
+        and the number of unique violations of each location
     """
-    # Define the violation filename
-    filename = f'D-violations.json'
+    # Get the violation file name
+    filename = get_statistics_file('D-violations.json')
 
-    # Check if the violation file exists
-    if not os.path.isfile(filename):
-        return None
-    
-    # Check if the violation file is empty
-    if os.path.getsize(filename) == 0:
+    # Check if the violation file exists and is not empty
+    if filename is None:
         return None
     
-    # Load the violation JSON file
-    try:
-        with open(filename, 'r') as f:
-            json_data = json.load(f)
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"Error parsing JSON file {filename}: {e}")
+    # Load the violation JSON file (recovering partial data if it is truncated)
+    json_data = load_json_tolerant(filename)
+    if json_data is None:
         return None
 
     # Initialize the variables for the violation information
@@ -156,6 +262,7 @@ def get_num_violations_from_json():
     unique_violations = ""
     unique_violations_by_location = {}
     unique_violations_by_test = {}
+    violations_by_location = {}
 
     # Iterate over the violation information for each spec
     for spec in json_data.keys():
@@ -175,7 +282,7 @@ def get_num_violations_from_json():
             
             # Extract the file name and line number and test id from the violation string
             violation_str = item['violation']
-            test_id_str = item['test']
+            test_id_str = item.get('test')
 
             # Add the violation to the unique violations by location
             if 'file_name:' in violation_str and 'line_num:' in violation_str:
@@ -189,6 +296,7 @@ def get_num_violations_from_json():
 
                 # Add the violation to the unique violations by location
                 unique_violations_by_location[location_key] = unique_violations_by_location.get(location_key, 0) + 1
+                violations_by_location.setdefault(location_key, set()).add(violation_str)
 
                 # Add the test id to the unique violations by test
                 if test_id_str is not None:
@@ -202,7 +310,57 @@ def get_num_violations_from_json():
 
         total_violations_count += size
 
-    return (total_violations_count, total_violations[:-1], unique_violations_count, unique_violations[:-1], unique_violations_by_location, unique_violations_by_test)
+    # Get the number of unique violations of each location
+    unique_count_by_location = {location: len(violations) for location, violations in violations_by_location.items()}
+
+    return (total_violations_count, total_violations[:-1], unique_violations_count, unique_violations[:-1], unique_violations_by_location, unique_violations_by_test, unique_count_by_location)
+
+def get_violations_from_dylin_findings(findings_file):
+    """
+    Extract violation information from the DyLin findings file
+
+    Args:
+        findings_file: A string containing the path to the findings txt file
+
+    Returns:
+        A tuple containing the violations by location and the unique violations count by spec
+    """
+    # Initialize the variables for the violation information
+    violations_by_location = {}
+    unique_violations = {}
+
+    # Parse the findings txt
+    with open(findings_file, 'r') as file:
+        for l in file:
+            if l.strip() != "":
+                l_split = l.split(': ')
+                if len(l_split) < 3 or '-' not in l_split[0]:
+                    continue
+                violation_number = l_split[0].strip()
+
+                # Convert the violation number to the spec name
+                if violation_number in dylin_spec_dict:
+                    spec_name = dylin_spec_dict[violation_number]
+                else:
+                    raise ValueError(f'Violation number {violation_number} not found in dylin_spec_dict')
+
+                # Form the violation location string
+                violation_file = l_split[1].strip()
+                if 'dylin' in violation_file:
+                    violation_file = violation_file.split('dylin')[-1]
+                if '.orig' in violation_file:
+                    violation_file = violation_file.replace('.orig', '')
+                violation_line = l_split[2].strip()
+
+                violation_str = f"{spec_name}:{violation_file}:{violation_line}"
+                if violation_str not in violations_by_location:
+                    violations_by_location[violation_str] = 1
+                    unique_violations[spec_name] = unique_violations.get(spec_name, 0) + 1
+                else:
+                    violations_by_location[violation_str] += 1
+
+    # Return the violations by location and the unique violations count by spec
+    return violations_by_location, unique_violations
 
 def get_test_time(test_summary):
     """
@@ -260,12 +418,14 @@ def get_coverage_from_file(coverage_file):
         print(f"Error parsing coverage file {coverage_file}: {e}")
         return None
 
-def get_commit_timestamp_and_message(commit_info_file):
+def get_commit_timestamp_and_message(commit_info_file, commit_metadata_file=None):
     """
-    Get the commit timestamp and commit message from the git log
+    Get the commit timestamp and commit message from the git log. When the commit is in the commit metadata table,
+    run_original.sh only writes the full SHA of the commit and they are read from the table
 
     Args:
         commit_info_file: A string containing the path to the commit info file
+        commit_metadata_file: A string containing the path to the commit metadata table (or None)
     Returns:
         A tuple containing the commit timestamp and commit message, or (None, None) if unable to retrieve
     """
@@ -278,12 +438,17 @@ def get_commit_timestamp_and_message(commit_info_file):
         return None, None
     
     # Open the commit info file and read the commit timestamp and commit message
+    commit_timestamp, commit_message = None, None
     with open(commit_info_file, 'r') as file:
         for line in file:
             if 'Commit timestamp:=' in line:
                 commit_timestamp = line.replace('Commit timestamp:= ', '').strip()
             if 'Commit message:=' in line:
                 commit_message = line.replace('Commit message:= ', '').strip()
+            if 'Commit SHA:=' in line:
+                commit = get_commit(line.replace('Commit SHA:= ', '').strip(), commit_metadata_file)
+                if commit is not None:
+                    commit_timestamp, commit_message = commit['timestamp'], commit['message']
     return commit_timestamp, commit_message
 
 def get_run_time_test_summary_from_files(result_file, output_file):
@@ -309,7 +474,7 @@ def get_run_time_test_summary_from_files(result_file, output_file):
     # If the output file is not None, open the output file and extract the test summary
     test_summary = None
     if output_file:
-        with open(output_file, 'r') as file:
+        with open_output_file(output_file) as file:
             # Iterate over the lines in the output file in reverse order
             for line in reversed(file.readlines()):
                 if "in" in line:
@@ -325,6 +490,174 @@ def get_run_time_test_summary_from_files(result_file, output_file):
     # Return the end-to-end time and test summary
     return end_to_end_time, test_summary
 
+def get_resource_usage(result_file, line):
+    """
+    Extract the resource usage of the test process from the result file and update the line dictionary
+
+    Args:
+        result_file: A string containing the result file
+        line: A dictionary containing the line
+    """
+    # Map the keys written by measure_resources.py to the columns of the line
+    resource_columns = {
+        'Peak RSS': ('peak_rss_kb', 'KB'),
+        'User CPU Time': ('user_cpu_time', 's'),
+        'System CPU Time': ('system_cpu_time', 's'),
+        'Read Bytes': ('read_bytes', 'B'),
+        'Write Bytes': ('write_bytes', 'B'),
+    }
+
+    # If the result file is None, there is no resource usage to extract
+    if result_file is None:
+        return
+
+    # Open the result file and extract the resource usage
+    with open(result_file, 'r') as file:
+        for l in file:
+            if ':' not in l:
+                continue
+            key, value = l.split(':', 1)
+            if key.strip() in resource_columns:
+                column, unit = resource_columns[key.strip()]
+                value = value.strip()
+                if value.endswith(unit):
+                    value = value[:-len(unit)]
+                try:
+                    line[column] = float(value) if column.endswith('time') else int(value)
+                except ValueError:
+                    pass
+
+def apply_analysis_scope(result_file, line, unique_by_location=None):
+    """
+    Keep only the violation locations in the analysis scope of the run (written to the result file by the runner
+    scripts, all the code for older runs), and record the scope and the number of out of scope violations.
+    The per-spec total and unique violations (and their counts) are recomputed without the removed locations
+
+    Args:
+        result_file: A string containing the path to the result file (or None)
+        line: A dictionary containing the results of the run (updated in place)
+        unique_by_location: A dictionary mapping each violation location to its number of unique violations
+            (1 for each location if not given, as for DyLin)
+    """
+    # Get the analysis scope of the run from the result file
+    scope_str = DEFAULT_SCOPE
+    if result_file is not None:
+        with open(result_file, 'r') as file:
+            for l in file:
+                if l.startswith('Analysis Scope:'):
+                    scope_str = l.split(':', 1)[1].strip()
+    scope, allowlist = parse_analysis_scope(scope_str)
+    line['analysis_scope'] = scope_str
+
+    # Remove the violation locations out of the scope (spec:filepath:line_num)
+    out_of_scope_violations = 0
+    total_violations = parse_counts(line.get('total_violations'), ';')
+    unique_violations = parse_counts(line.get('unique_violations'), ';')
+    if isinstance(line.get('violations_by_location'), dict):
+        for location in list(line['violations_by_location']):
+            if not in_analysis_scope(location.rsplit(':', 2)[-2], scope, allowlist):
+                violations = line['violations_by_location'].pop(location)
+                out_of_scope_violations += violations
+                if isinstance(line.get('violations_by_test'), dict):
+                    line['violations_by_test'].pop(location, None)
+
+                # Remove the violations of the location from the counts of its spec
+                spec = location.rsplit(':', 2)[0]
+                if spec in total_violations:
+                    total_violations[spec] -= violations
+                if spec in unique_violations:
+                    unique_violations[spec] -= (unique_by_location or {}).get(location, 1)
+    line['out_of_scope_violations'] = out_of_scope_violations
+
+    # Recompute the per-spec counts of the violations in the scope (the specs without violations are dropped)
+    if out_of_scope_violations > 0:
+        for column, counts in [('total_violations', total_violations), ('unique_violations', unique_violations)]:
+            counts = {spec: count for spec, count in counts.items() if count > 0}
+            line[column] = ';'.join(f'{spec}={count}' for spec, count in counts.items())
+            line[f'{column}_count'] = sum(counts.values())
+
+def get_workspace_setup(workspace_file, lines):
+    """
+    Add the method and the setup time of the working tree of each run (written by workspace_manager.py) to the lines
+
+    Args:
+        workspace_file: A string containing the path to the workspace timing file
+        lines: A list of dictionaries containing the results (updated in place)
+    """
+    if not os.path.isfile(workspace_file):
+        return
+    try:
+        with open(workspace_file, 'r') as file:
+            timing = json.load(file)
+    except (OSError, ValueError):
+        print(f'Could not read the workspace timing file {workspace_file}')
+        return
+    for line in lines:
+        line['workspace_method'] = timing.get('method', '')
+        line['workspace_setup_time'] = timing.get('copies', {}).get(line['algorithm'], '')
+
+def get_killed_tests(killed_tests_files):
+    """
+    Extract the tests that were killed because they exceeded their per-test time budget
+
+    Args:
+        killed_tests_files: A list of killed tests files (only the first one is used)
+
+    Returns:
+        A list containing the node ids of the killed tests
+    """
+    # If there is no killed tests file, no test was killed
+    if not killed_tests_files:
+        return []
+
+    # Open the killed tests file and read one node id per line
+    with open(killed_tests_files[0], 'r') as file:
+        return [l.strip() for l in file if l.strip() != ""]
+
+def get_suite_progress(progress_files, line):
+    """
+    Get how much of the test suite ran from the progress file written by continuous_analysis_plugin.py and update
+    the line dictionary
+
+    Args:
+        progress_files: A list of the progress files of the run (only the first one is used)
+        line: A dictionary containing the line
+    """
+    # The progress is unknown when the plugin did not write it
+    if not progress_files:
+        return
+
+    try:
+        with open(progress_files[0], 'r') as file:
+            progress = json.load(file)
+    except (OSError, ValueError):
+        return
+    line['test_order'] = progress.get('test_order', '')
+    line['tests_collected'] = progress.get('collected', '')
+    line['tests_completed'] = progress.get('completed', '')
+    if progress.get('collected'):
+        line['suite_completion'] = round(min(progress.get('completed', 0) / progress['collected'], 1.0), 4)
+
+def get_spec_selection(selection_files):
+    """
+    Get the spec selection of the PyMOP run from the selection file written by select_specs.py
+
+    Args:
+        selection_files: A list of the spec selection files of the run (there is none if all the specs were monitored)
+    Returns:
+        A tuple containing the selection (full or selected), the selected specs (joined by ';', empty for a full
+        selection) and the estimated number of saved events
+    """
+    # All the specs are monitored when the selection was not run
+    if not selection_files:
+        return 'full', '', 0
+
+    with open(selection_files[0], 'r') as file:
+        selection = json.load(file)
+    if selection.get('spec_selection') != 'selected':
+        return 'full', '', 0
+    return 'selected', ';'.join(selection.get('selected_specs', [])), selection.get('estimated_saved_events', 0)
+
 def get_test_summary(test_summary, time, line):
     """
     Extract test summary from test summary and update the line dictionary (only test results, not time)
@@ -405,8 +738,66 @@ def create_base_data_structure(project, algorithm):
         'monitors': '',
         'total_events': '',
         'events': '',
+        'peak_rss_kb': 'x',
+        'user_cpu_time': 'x',
+        'system_cpu_time': 'x',
+        'read_bytes': 'x',
+        'write_bytes': 'x',
+        'killed_tests_count': 0,
+        'killed_tests': '',
+        'spec_selection': '',
+        'selected_specs': '',
+        'estimated_saved_events': '',
+        'analysis_scope': '',
+        'out_of_scope_violations': '',
+        'synthesized_from': '',
+        'workspace_method': '',
+        'workspace_setup_time': '',
+        'test_order': '',
+        'tests_collected': '',
+        'tests_completed': '',
+        'suite_completion': '',
+        'statistics_salvaged': '',
     })
 
+def create_empty_data_structure(project, algorithm):
+    """
+    Create OrderedDict for an analysis that produced no output folder (all results crossed out)
+
+    Args:
+        project: A string containing the project
+        algorithm: A string containing the algorithm
+    """
+    # Create the base data structure
+    line = create_base_data_structure(project, algorithm)
+
+    # Cross out the test results
+    columns_to_cross_out = ['passed', 'failed', 'skipped', 'xfailed', 'xpassed', 'errors', 'time']
+    for column in columns_to_cross_out:
+        line[column] = 'x'
+    return line
+
+def get_violation_records(lines):
+    """
+    Get the violations of each algorithm as records, before they are converted to strings for the CSV files
+
+    Args:
+        lines: A list of dictionaries containing the results
+
+    Returns:
+        A dictionary of the violations of each algorithm (the first line of the algorithm), a list of tuples
+        (spec, filepath, line_num, count) in the order of the violations_by_location column
+    """
+    records = {}
+    for line in lines:
+        violations_by_location = line.get('violations_by_location')
+        if line['algorithm'] in records or not isinstance(violations_by_location, dict):
+            continue
+        records[line['algorithm']] = [
+            (*location.rsplit(':', 2), count) for location, count in violations_by_location.items()
+        ]
+    return records
+
 def results_csv_file(lines, commit_sha, timestamp):
     """
     Write results to a CSV file
@@ -484,20 +875,23 @@ def append_to_results_over_time(lines, commit_sha, timestamp):
     # Check if continuous_analysis_over_time_results.csv exists
     file_exists = os.path.isfile('continuous_analysis_over_time_results.csv')
 
+    # Get fieldnames from the first line
+    max_columns_line = max(lines, key=lambda line: len(line.keys()))
+    fieldnames = list(max_columns_line.keys())
+
+    # Add commit_sha to fieldnames if it's not already there
+    if 'commit_sha' not in fieldnames:
+        fieldnames.append('commit_sha')
+
+    # Add timestamp to fieldnames if it's not already there
+    if 'timestamp' not in fieldnames:
+        fieldnames.append('timestamp')
+
+    # Add the new columns to the header of a file written by an older version (the rows could not be read otherwise)
+    fieldnames = reconcile_header('continuous_analysis_over_time_results.csv', fieldnames)
+
     # Open the CSV file for appending
     with open('continuous_analysis_over_time_results.csv', 'a', newline='', encoding='utf-8') as f:
-        # Get fieldnames from the first line
-        max_columns_line = max(lines, key=lambda line: len(line.keys()))
-        fieldnames = list(max_columns_line.keys())
-        
-        # Add commit_sha to fieldnames if it's not already there
-        if 'commit_sha' not in fieldnames:
-            fieldnames.append('commit_sha')
-
-        # Add timestamp to fieldnames if it's not already there
-        if 'timestamp' not in fieldnames:
-            fieldnames.append('timestamp')
-        
         # Create the writer object
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         
@@ -544,14 +938,217 @@ def append_to_results_over_time(lines, commit_sha, timestamp):
             except Exception as e:
                 print('could not write line:', line.keys(), str(e))
 
+def create_test_durations_lines(project, test_durations):
+    """
+    Join the per-test durations of the original, PyMOP and DyLin runs into a per-test overhead table
+
+    Args:
+        project: A string containing the project
+        test_durations: A dictionary mapping each algorithm to its per-test durations (or None)
+
+    Returns:
+        A list of dictionaries containing the duration and overhead of each test
+    """
+    # Get the per-test durations of each run (empty if the run has no JUnit XML report)
+    original_durations = test_durations.get('original') or {}
+    pymop_durations = test_durations.get('pymop') or {}
+    dylin_durations = test_durations.get('dylin') or {}
+
+    # Get all the test ids in the order they were first seen
+    test_ids = list(OrderedDict.fromkeys(list(original_durations) + list(pymop_durations) + list(dylin_durations)))
+
+    # Create a line for each test
+    lines = []
+    for test_id in test_ids:
+        line = OrderedDict({
+            'project': project,
+            'timestamp': 'x',
+            'commit_sha': 'x',
+            'test_id': test_id,
+            'original_time': original_durations.get(test_id, 'x'),
+            'pymop_time': pymop_durations.get(test_id, 'x'),
+            'dylin_time': dylin_durations.get(test_id, 'x'),
+            'pymop_overhead': 'x',
+            'dylin_overhead': 'x',
+        })
+
+        # Compute the overhead of the instrumented runs (instrumented time / original time)
+        original_time = line['original_time']
+        if isinstance(original_time, float) and original_time > 0:
+            if isinstance(line['pymop_time'], float):
+                line['pymop_overhead'] = line['pymop_time'] / original_time
+            if isinstance(line['dylin_time'], float):
+                line['dylin_overhead'] = line['dylin_time'] / original_time
+
+        lines.append(line)
+
+    # Return the lines of the per-test overhead table
+    return lines
+
+def append_to_test_durations_over_time(lines, commit_sha, timestamp):
+    """
+    Append the per-test overhead table to a CSV file that tracks the test durations over time
+
+    Args:
+        lines: A list of dictionaries containing the duration and overhead of each test
+        commit_sha: A string containing the commit SHA
+        timestamp: A string containing the timestamp for the run
+    """
+    # Check if there is no data to append
+    if not lines:
+        print('No test durations to append.')
+        return
+
+    # Check if continuous_analysis_over_time_test_durations.csv exists
+    file_exists = os.path.isfile('continuous_analysis_over_time_test_durations.csv')
+
+    # Open the CSV file for appending
+    with open('continuous_analysis_over_time_test_durations.csv', 'a', newline='', encoding='utf-8') as f:
+        # Create the writer object and write header only if file doesn't exist
+        writer = csv.DictWriter(f, fieldnames=list(lines[0].keys()))
+        if not file_exists:
+            writer.writeheader()
+
+        # Iterate over the lines to append each line into the CSV file
+        for line in lines:
+            line['commit_sha'] = commit_sha
+            line['timestamp'] = timestamp
+            try:
+                writer.writerow(line)
+            except Exception as e:
+                print('could not write line:', line.keys(), str(e))
+
+def to_float(value):
+    # Convert a time of a results line to a float (None if it is crossed out)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def create_spec_costs_lines(project, lines):
+    """
+    Attribute the monitoring cost of the PyMOP run to each spec
+
+    The time to create the monitors (time_create_monitor) is split between the specs by their number of monitors, and
+    the remaining slowdown of the tests (the PyMOP test duration minus the original end-to-end time) is split by their
+    number of events. The instrumentation time is shared by all specs and is not attributed.
+
+    Args:
+        project: A string containing the project
+        lines: A list of dictionaries containing the results of the original, PyMOP and DyLin runs
+
+    Returns:
+        A list of dictionaries containing the monitors, events, violations and estimated time of each spec
+    """
+    # Get the original and PyMOP lines
+    original_line = next((line for line in lines if line['algorithm'] == 'original'), None)
+    pymop_line = next((line for line in lines if line['algorithm'] == 'pymop'), None)
+    if pymop_line is None:
+        return []
+
+    # Get the per-spec counts of the PyMOP run
+    monitors = parse_counts(pymop_line.get('monitors'), '<>')
+    events = parse_counts(pymop_line.get('events'), '<>')
+    violations = parse_counts(pymop_line.get('total_violations'), ';')
+    unique_violations = parse_counts(pymop_line.get('unique_violations'), ';')
+    violation_locations = Counter()
+    if isinstance(pymop_line.get('violations_by_location'), dict):
+        violation_locations.update(location.rsplit(':', 2)[0] for location in pymop_line['violations_by_location'])
+
+    # Get the time to split between the specs
+    create_monitor_time = to_float(pymop_line.get('time_create_monitor'))
+    pymop_test_time = to_float(pymop_line.get('test_duration'))
+    original_time = to_float(original_line.get('end_to_end_time')) if original_line is not None else None
+    event_time = max(pymop_test_time - original_time, 0.0) if pymop_test_time is not None and original_time is not None else None
+    total_monitors = sum(monitors.values())
+    total_events = sum(events.values())
+
+    # Create a line for each spec
+    specs = list(OrderedDict.fromkeys(list(monitors) + list(events) + list(violations)))
+    spec_lines = []
+    for spec in specs:
+        line = OrderedDict({
+            'project': project,
+            'timestamp': 'x',
+            'commit_sha': 'x',
+            'spec': spec,
+            'monitors': monitors.get(spec, 0),
+            'events': events.get(spec, 0),
+            'violations': violations.get(spec, 0),
+            'unique_violations': unique_violations.get(spec, 0),
+            'violation_locations': violation_locations.get(spec, 0),
+            'estimated_monitor_time': 'x',
+            'estimated_event_time': 'x',
+            'estimated_time': 'x',
+        })
+        if create_monitor_time is not None:
+            line['estimated_monitor_time'] = create_monitor_time * line['monitors'] / total_monitors if total_monitors else 0.0
+        if event_time is not None:
+            line['estimated_event_time'] = event_time * line['events'] / total_events if total_events else 0.0
+        if create_monitor_time is not None and event_time is not None:
+            line['estimated_time'] = line['estimated_monitor_time'] + line['estimated_event_time']
+        spec_lines.append(line)
+
+    # Return the lines of the per-spec cost table
+    return spec_lines
+
+def append_to_spec_costs_over_time(lines, commit_sha, timestamp):
+    """
+    Append the per-spec cost table to a CSV file that tracks the monitoring costs over time
+
+    Args:
+        lines: A list of dictionaries containing the monitors, events, violations and estimated time of each spec
+        commit_sha: A string containing the commit SHA
+        timestamp: A string containing the timestamp for the run
+    """
+    # Check if there is no data to append
+    if not lines:
+        print('No spec costs to append.')
+        return
+
+    # Check if continuous_analysis_over_time_spec_costs.csv exists
+    file_exists = os.path.isfile('continuous_analysis_over_time_spec_costs.csv')
+
+    # Open the CSV file for appending
+    with open('continuous_analysis_over_time_spec_costs.csv', 'a', newline='', encoding='utf-8') as f:
+        # Create the writer object and write header only if file doesn't exist
+        writer = csv.DictWriter(f, fieldnames=list(lines[0].keys()))
+        if not file_exists:
+            writer.writeheader()
+
+        # Iterate over the lines to append each line into the CSV file
+        for line in lines:
+            line['commit_sha'] = commit_sha
+            line['timestamp'] = timestamp
+            try:
+                writer.writerow(line)
+            except Exception as e:
+                print('could not write line:', line.keys(), str(e))
+
 def main(project: str, commit_sha: str):
-    """Main function to process projects and generate results"""
+    """
+    Main function to process projects and generate results
+
+    Returns:
+        The parsed results of the commit (used by run_pipeline.py to filter them without reading the CSV files):
+        the lines written to the results files, and the violations of each algorithm (see get_violation_records),
+        or None if there are no results
+    """
+    # Start the stage timers and counters of the run
+    profiler.start()
+
     # Get the timestamp for the current run
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     # Initialize the lines list
     lines = []
 
+    # Initialize the per-test durations of each run
+    test_durations = {}
+
+    # Get the commit metadata table (resolved before changing to the output folders)
+    commit_metadata_file = get_commit_metadata_file()
+
     # Parse the output for the project
     original_folder = f"./continuous-analysis-output/{project}_original_output"
     pymop_folder = f"./continuous-analysis-output/{project}_pymop_output"
@@ -572,19 +1169,19 @@ def main(project: str, commit_sha: str):
 
     # Get the result and output files
     result_files = [f for f in files if f.endswith(f'results.txt')]
-    output_files = [f for f in files if f.endswith('Output.txt')]
+    output_file = find_output_file(files, 'Output.txt')
     coverage_files = [f for f in files if f.endswith('coverage.xml')]
     commit_info_files = [f for f in files if f.endswith('commit_info.txt')]
+    junit_files = [f for f in files if f.endswith('junit.xml')]
 
     # If no result or output files, print error and skip to next project
-    if not result_files or not output_files:
+    if not result_files or not output_file:
         print(f'No original files found for {project}')
         result_file = None
         output_file = None
     else:
-        # Get the first result, output, and coverage files
+        # Get the first result file
         result_file = result_files[0]
-        output_file = output_files[0]
 
     if not coverage_files:
         coverage_file = None
@@ -597,7 +1194,8 @@ def main(project: str, commit_sha: str):
         commit_info_file = commit_info_files[0]
 
     # Get the end-to-end time and test summary
-    end_to_end_time, test_summary = get_run_time_test_summary_from_files(result_file, output_file)
+    with profiler.stage('original_output'):
+        end_to_end_time, test_summary = get_run_time_test_summary_from_files(result_file, output_file)
 
     # If no result file, print error and skip to next project
     if result_file is None:
@@ -615,10 +1213,20 @@ def main(project: str, commit_sha: str):
         return
 
     # Get the coverage from the coverage file
-    coverage = get_coverage_from_file(coverage_file)
-
-    # Get the commit timestamp and commit message from the git log
-    commit_timestamp, commit_message = get_commit_timestamp_and_message(commit_info_file)
+    with profiler.stage('original_coverage'):
+        coverage = get_coverage_from_file(coverage_file)
+
+    # Get the per-test durations from the JUnit XML report
+    with profiler.stage('junit_durations'):
+        test_durations['original'] = read_junit_durations(junit_files[0]) if junit_files else None
+
+    # Get the commit timestamp and commit message from the commit metadata table,
+    # or from the commit info file written by run_original.sh if the commit SHA is not in a table (or is ambiguous)
+    commit = get_commit(commit_sha, commit_metadata_file)
+    if commit is not None:
+        commit_timestamp, commit_message = commit['timestamp'], commit['message']
+    else:
+        commit_timestamp, commit_message = get_commit_timestamp_and_message(commit_info_file, commit_metadata_file)
 
     # Create the base data structure
     line = create_base_data_structure(project, algorithm)
@@ -643,6 +1251,9 @@ def main(project: str, commit_sha: str):
 
     # Add the post-run time
     line['post_run_time'] = '0.0'
+
+    # Add the resource usage of the test process
+    get_resource_usage(result_file, line)
     
     # Add the coverage
     if coverage is not None:
@@ -669,38 +1280,7 @@ def main(project: str, commit_sha: str):
     # If no pymop folder, print error , append a empty line to the results file, and skip to next project
     if not os.path.exists(pymop_folder):
         print(f'No pymop folder found for {project}')
-        line = OrderedDict({
-            'project': project,
-            'timestamp': 'x',
-            'commit_sha': 'x',
-            'commit_timestamp': 'x',
-            'commit_message': 'x',
-            'algorithm': 'pymop',
-            'passed': 'x',
-            'failed': 'x',
-            'skipped': 'x',
-            'xfailed': 'x',
-            'xpassed': 'x',
-            'errors': 'x',
-            'time': 'x',
-            'coverage': 'x',
-            'type_project': 'pymop',
-            'time_instrumentation': 'x',
-            'time_create_monitor': 'x',
-            'test_duration': 'x',
-            'post_run_time': 'x',
-            'end_to_end_time': 'x',
-            'total_violations_count': '',
-            'total_violations': '',
-            'unique_violations_count': '',
-            'unique_violations': '',
-            'violations_by_location': '',
-            'violations_by_test': '',
-            'total_monitors': '',
-            'monitors': '',
-            'total_events': '',
-            'events': '',
-        })
+        line = create_empty_data_structure(project, 'pymop')
         # Append the empty line to the results file
         lines.append(line)
     else:
@@ -714,19 +1294,24 @@ def main(project: str, commit_sha: str):
 
             # the result and output files
             result_files = [f for f in files if f.endswith(f'results.txt')]
-            output_files = [f for f in files if f.endswith('_Output.txt')]
+            output_file = find_output_file(files)
 
             # If no result or output files, print error and skip to next project
-            if not result_files or not output_files:
+            if not result_files or not output_file:
                 print(f'No pymop files found for {project}')
                 result_file = None
                 output_file = None
             else:
                 result_file = result_files[0]
-                output_file = output_files[0]
+
+            # Get the per-test durations from the JUnit XML report
+            junit_files = [f for f in files if f.endswith('junit.xml')]
+            with profiler.stage('junit_durations'):
+                test_durations['pymop'] = read_junit_durations(junit_files[0]) if junit_files else None
 
             # Get the end-to-end time and test summary
-            end_to_end_time, test_summary = get_run_time_test_summary_from_files(result_file, output_file)
+            with profiler.stage('pymop_output'):
+                end_to_end_time, test_summary = get_run_time_test_summary_from_files(result_file, output_file)
 
             # Get the time from the test summary
             time = get_test_time(test_summary)
@@ -741,6 +1326,7 @@ def main(project: str, commit_sha: str):
             get_test_summary(test_summary, time, line)
 
             # Get the instrumentation time, create monitor time, and test duration
+            salvaged_statistics_files.clear()
             try:
                 ret_time = get_time_from_json()
             except Exception as e:
@@ -763,7 +1349,9 @@ def main(project: str, commit_sha: str):
             if algorithm != "original":
 
                 # Get the number of violations
-                ret_violation = get_num_violations_from_json()
+                with profiler.stage('pymop_violations'):
+                    ret_violation = get_num_violations_from_json()
+                unique_count_by_location = None
 
                 # If ret_violation is not None, set the number of violations
                 if ret_violation is not None:
@@ -773,7 +1361,8 @@ def main(project: str, commit_sha: str):
                         unique_violations_count,
                         unique_violations,
                         unique_violations_by_location,
-                        unique_violations_by_test
+                        unique_violations_by_test,
+                        unique_count_by_location
                     ) = ret_violation
                 
                     line['total_violations_count'] = total_violations_count
@@ -782,9 +1371,11 @@ def main(project: str, commit_sha: str):
                     line['unique_violations'] = unique_violations
                     line['violations_by_location'] = unique_violations_by_location
                     line['violations_by_test'] = unique_violations_by_test
+                    profiler.count('violations_parsed', total_violations_count)
 
                 # Get the monitors and events
-                ret_full = get_monitors_and_events_from_json(algorithm)
+                with profiler.stage('pymop_monitors_and_events'):
+                    ret_full = get_monitors_and_events_from_json(algorithm)
 
                 # If ret_full is not None, set the monitors and events
                 if ret_full is not None:
@@ -798,6 +1389,28 @@ def main(project: str, commit_sha: str):
                 # Add the post-run time
                 line['post_run_time'] = '0.0'
 
+                # Mark the results recovered from truncated statistics files (e.g. the run timed out)
+                line['statistics_salvaged'] = bool(salvaged_statistics_files)
+
+                # Add the resource usage of the test process
+                get_resource_usage(result_file, line)
+
+                # Keep only the violations in the analysis scope of the run
+                apply_analysis_scope(result_file, line, unique_count_by_location)
+
+                # Add the tests that exceeded their per-test time budget
+                killed_tests = get_killed_tests([f for f in files if f.endswith('killed_tests.txt')])
+                line['killed_tests_count'] = len(killed_tests)
+                line['killed_tests'] = ';'.join(killed_tests)
+
+                # Add how much of the test suite ran (and in which order)
+                get_suite_progress([f for f in files if f.endswith('progress.json')], line)
+
+                # Add the spec selection of the run
+                line['spec_selection'], line['selected_specs'], line['estimated_saved_events'] = get_spec_selection(
+                    [f for f in files if f.endswith('spec_selection.json')]
+                )
+
                 # Add the coverage
                 if coverage is not None:
                     line['coverage'] = str(coverage)
@@ -823,38 +1436,7 @@ def main(project: str, commit_sha: str):
     # If no dylin folder, print error, append a empty line to the results file, and skip to next project
     if not os.path.exists(dylin_folder):
         print(f'No dylin folder found for {project}')
-        line = OrderedDict({
-            'project': project,
-            'timestamp': 'x',
-            'commit_sha': 'x',
-            'commit_timestamp': 'x',
-            'commit_message': 'x',
-            'algorithm': 'dylin',
-            'passed': 'x',
-            'failed': 'x',
-            'skipped': 'x',
-            'xfailed': 'x',
-            'xpassed': 'x',
-            'errors': 'x',
-            'time': 'x',
-            'coverage': 'x',
-            'type_project': 'dylin',
-            'time_instrumentation': 'x',
-            'time_create_monitor': 'x',
-            'test_duration': 'x',
-            'post_run_time': 'x',
-            'end_to_end_time': 'x',
-            'total_violations_count': '',
-            'total_violations': '',
-            'unique_violations_count': '',
-            'unique_violations': '',
-            'violations_by_location': '',
-            'violations_by_test': '',
-            'total_monitors': '',
-            'monitors': '',
-            'total_events': '',
-            'events': '',
-        })
+        line = create_empty_data_structure(project, 'dylin')
         # Append the empty line to the results file
         lines.append(line)
     else:
@@ -869,19 +1451,23 @@ def main(project: str, commit_sha: str):
 
         # Get the result and output files
         result_files = [f for f in files if f.endswith(f'results.txt')]
-        output_files = [f for f in files if f.endswith('_Output.txt')]
+        output_file = find_output_file(files)
         findings_csv = [f for f in files if f.endswith('_findings.csv')]
         findings_txt = [f for f in files if f.endswith('_findings.txt')]
+        junit_files = [f for f in files if f.endswith('junit.xml')]
 
         # If no result or output files, print error and skip to next project
-        if not result_files or not output_files:
+        if not result_files or not output_file:
             print(f'No dylin files found for {project}')
             result_file = None
             output_file = None
         else:
-            # Get the first result and output files (should only be one)
+            # Get the first result file (should only be one)
             result_file = result_files[0]
-            output_file = output_files[0]
+
+        # Get the per-test durations from the JUnit XML report
+        with profiler.stage('junit_durations'):
+            test_durations['dylin'] = read_junit_durations(junit_files[0]) if junit_files else None
 
         # Get the instrumentation duration and test duration
         instrumentation_duration = "x"
@@ -924,34 +1510,9 @@ def main(project: str, commit_sha: str):
                         total_violations_count += int(row[1])
 
             # Parse the findings txt
-            with open(findings_txt[0], 'r') as file:
-                for l in file:
-                    if l.strip() != "":
-                        l_split = l.split(': ')
-                        if len(l_split) < 3 or '-' not in l_split[0]:
-                            continue
-                        violation_number = l_split[0].strip()
-
-                        # Convert the violation number to the spec name
-                        if violation_number in dylin_spec_dict:
-                            spec_name = dylin_spec_dict[violation_number]
-                        else:
-                            raise ValueError(f'Violation number {violation_number} not found in dylin_spec_dict')
-
-                        # Form the violation location string
-                        violation_file = l_split[1].strip()
-                        if 'dylin' in violation_file:
-                            violation_file = violation_file.split('dylin')[-1]
-                        if '.orig' in violation_file:
-                            violation_file = violation_file.replace('.orig', '')
-                        violation_line = l_split[2].strip()
-
-                        violation_str = f"{spec_name}:{violation_file}:{violation_line}"
-                        if violation_str not in violations_by_location:
-                            violations_by_location[violation_str] = 1
-                            unique_violations[spec_name] = unique_violations.get(spec_name, 0) + 1
-                        else:
-                            violations_by_location[violation_str] += 1
+            with profiler.stage('dylin_findings'):
+                violations_by_location, unique_violations = get_violations_from_dylin_findings(findings_txt[0])
+            profiler.count('violations_parsed', sum(violations_by_location.values()))
 
         # Convert lists to strings
         total_violations = ';'.join(total_violations) if total_violations else ""
@@ -964,7 +1525,7 @@ def main(project: str, commit_sha: str):
         # Get the test summary from the output file
         test_summary = None
         if output_file:
-            with open(output_file, 'r') as file:
+            with open_output_file(output_file) as file:
                 for line in reversed(file.readlines()):
                     if "passed" in line.lower() and "in" in line:
                         test_summary = line.strip()
@@ -1005,6 +1566,20 @@ def main(project: str, commit_sha: str):
         # Add the time to create the monitor
         line['time_create_monitor'] = 0.0  # DynaPyt doesn't track this
 
+        # Add the resource usage of the test process
+        get_resource_usage(result_file, line)
+
+        # Keep only the violations in the analysis scope of the run
+        apply_analysis_scope(result_file, line)
+
+        # Add the tests that exceeded their per-test time budget
+        killed_tests = get_killed_tests([f for f in files if f.endswith('killed_tests.txt')])
+        line['killed_tests_count'] = len(killed_tests)
+        line['killed_tests'] = ';'.join(killed_tests)
+
+        # Add how much of the test suite ran (and in which order)
+        get_suite_progress([f for f in files if f.endswith('progress.json')], line)
+
         # Add the coverage
         if coverage is not None:
             line['coverage'] = str(coverage)
@@ -1021,19 +1596,51 @@ def main(project: str, commit_sha: str):
         lines.append(line)
         os.chdir('../..')
 
+    # Add the setup of the working trees of the runs
+    get_workspace_setup(f"./continuous-analysis-output/{project}_workspace.json", lines)
+
+    # Attribute the monitoring cost of PyMOP to each spec (before the violations are converted to strings)
+    spec_costs_lines = create_spec_costs_lines(project, lines)
+
+    # Keep the violations of each algorithm before they are converted to strings
+    violations = get_violation_records(lines)
+
     # Add the results to the continuous_analysis_results_${timestamp}.csv file
     print("\n====== RESULTS CSV ======\n")
     print(f'creating continuous_analysis_results_{timestamp}.csv')
-    results_csv_file(lines, commit_sha, timestamp)
+    with profiler.stage('write_results'):
+        results_csv_file(lines, commit_sha, timestamp)
     print(f'created continuous_analysis_results_{timestamp}.csv')
 
     # Append the results to the continuous_analysis_over_time_results.csv file
     print("\n====== APPENDING TO RESULTS OVER TIME ======\n")
     print(f'appending to continuous_analysis_over_time_results.csv')
-    append_to_results_over_time(lines, commit_sha, timestamp)
+    with profiler.stage('write_results_over_time'):
+        append_to_results_over_time(lines, commit_sha, timestamp)
     print('appended to continuous_analysis_over_time_results.csv')
 
+    # Append the per-test overhead table to the continuous_analysis_over_time_test_durations.csv file
+    print("\n====== APPENDING TO TEST DURATIONS OVER TIME ======\n")
+    print(f'appending to continuous_analysis_over_time_test_durations.csv')
+    with profiler.stage('write_test_durations'):
+        test_durations_lines = create_test_durations_lines(project, test_durations)
+        append_to_test_durations_over_time(test_durations_lines, commit_sha, timestamp)
+    profiler.count('tests_timed', len(test_durations_lines))
+    print('appended to continuous_analysis_over_time_test_durations.csv')
+
+    # Append the per-spec cost table to the continuous_analysis_over_time_spec_costs.csv file
+    print("\n====== APPENDING TO SPEC COSTS OVER TIME ======\n")
+    print(f'appending to continuous_analysis_over_time_spec_costs.csv')
+    with profiler.stage('write_spec_costs'):
+        append_to_spec_costs_over_time(spec_costs_lines, commit_sha, timestamp)
+    print('appended to continuous_analysis_over_time_spec_costs.csv')
+
+    return {'lines': lines, 'violations': violations}
+
 if __name__ == "__main__":
     project = sys.argv[1]
     commit_sha = sys.argv[2]
-    main(project, commit_sha)
+    try:
+        main(project, commit_sha)
+    finally:
+        profiler.write_report()
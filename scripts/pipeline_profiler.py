@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import cProfile
+import contextlib
+from datetime import datetime
+
+
+"""
+This script provides an opt-in instrumentation layer for the pipeline scripts.
+It is enabled with the CA_PROFILE environment variable and provides:
+- Named stage timers (total time and number of calls of each stage)
+- Counters (e.g. violations parsed, parent comparisons, diff hunks)
+- An optional cProfile capture of the process (CA_PROFILE=cprofile), started by the main function of a script
+
+At the end of the script, a machine-readable timing report is appended (one JSON object per run) to
+continuous_analysis_timing_report.jsonl in the directory the script was started in (beside the output CSVs),
+and the cProfile statistics are saved to {script}_{timestamp}.prof.
+
+When CA_PROFILE is not set, the stage timers and counters do nothing.
+
+Usage:
+    profiler = get_profiler('filter_new_violations')
+    profiler.start()
+    with profiler.stage('track_changes'):
+        ...
+    profiler.count('diff_hunks', num_hunks)
+    profiler.write_report()
+"""
+
+
+# The file the timing reports are appended to
+TIMING_REPORT_FILE = 'continuous_analysis_timing_report.jsonl'
+
+# The cProfile of the process (only one profiler can be active in a process, and the scripts are imported together
+# by run_pipeline.py, analysis_daemon.py, ...)
+_process_cprofile = None
+
+
+def get_process_cprofile():
+    """
+    Get the cProfile of the process, enabling it on the first call.
+
+    Returns:
+        The cProfile.Profile shared by all the profilers of the process.
+    """
+    global _process_cprofile
+    if _process_cprofile is None:
+        _process_cprofile = cProfile.Profile()
+        _process_cprofile.enable()
+    return _process_cprofile
+
+
+class PipelineProfiler:
+    """
+    Collect the stage timings and counters of a pipeline script and write them to the timing report.
+    """
+
+    def __init__(self, script, mode):
+        self.script = script
+        self.mode = mode
+        self.enabled = mode != ''
+        self.reset()
+
+    def reset(self):
+        # Clear the measurements (nothing is enabled, the profilers are created when the scripts are imported)
+        self.stages = {}
+        self.counters = {}
+        self.start_time = time.perf_counter()
+        self.started_at = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # The report is written beside the output CSVs, even if the script changes its working directory
+        self.output_dir = os.getcwd()
+        self.cprofile = None
+
+    def start(self):
+        """
+        Start (or restart) the measurements of a run of the script (called by the main function of the script).
+        With CA_PROFILE=cprofile, the cProfile of the process is enabled (see get_process_cprofile).
+        """
+        self.reset()
+        if self.mode == 'cprofile':
+            self.cprofile = get_process_cprofile()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Time a named stage (the time of all the calls of the same stage is summed).
+
+        Args:
+            name: The name of the stage.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, {'total_time': 0.0, 'calls': 0})
+            stage['total_time'] += time.perf_counter() - start
+            stage['calls'] += 1
+
+    def count(self, name, value=1):
+        """
+        Increment a named counter.
+
+        Args:
+            name: The name of the counter.
+            value: The value to add to the counter.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def write_report(self):
+        """
+        Append the timing report of the run to the timing report file (and save the cProfile statistics).
+        """
+        if not self.enabled:
+            return
+
+        # Save the cProfile statistics (of the whole process so far), and keep profiling the rest of the process
+        profile_file = None
+        if self.cprofile is not None:
+            profile_file = os.path.join(self.output_dir, f'{self.script}_{self.started_at}.prof')
+            self.cprofile.dump_stats(profile_file)
+            self.cprofile.enable()
+
+        # Append the timing report of the run
+        report = {
+            'script': self.script,
+            'timestamp': self.started_at,
+            'total_time': time.perf_counter() - self.start_time,
+            'stages': self.stages,
+            'counters': self.counters,
+            'cprofile_file': profile_file,
+        }
+        with open(os.path.join(self.output_dir, TIMING_REPORT_FILE), 'a') as f:
+            f.write(json.dumps(report) + '\n')
+        print(f'Timing report appended to {TIMING_REPORT_FILE}')
+
+
+def get_profiler(script):
+    """
+    Create the profiler of a pipeline script (enabled by the CA_PROFILE environment variable).
+
+    Args:
+        script: The name of the script.
+
+    Returns:
+        A PipelineProfiler.
+    """
+    mode = os.environ.get('CA_PROFILE', '').strip().lower()
+    if mode in ('0', 'false', 'no'):
+        mode = ''
+    return PipelineProfiler(script, mode)
@@ -0,0 +1,95 @@
+import sys
+import argparse
+
+
+"""
+This script is used to rank the PyMOP specs by their monitoring cost, from the per-spec cost table written by
+parse_continuous_analysis_output.py (continuous_analysis_over_time_spec_costs.csv).
+It should report the following for each spec (summed over the selected commits):
+- The monitors, events and violation locations of the spec, and the number of commits it was monitored in
+- The estimated monitoring time of the spec and its share of the estimated time of all specs
+- The estimated time per violation location found (infinite for the specs that cost time without finding anything)
+
+The specs are ranked by their estimated time per violation location (then by their estimated time), so the specs
+that slow down the tests the most for what they find come first.
+
+Usage: python3 report_spec_costs.py [--input <spec_costs.csv>] [--project <project>] [--last <n>] [--top <n>] [--output <report.csv>]
+"""
+
+
+# The numeric columns of the per-spec cost table that are summed over the commits
+COST_COLUMNS = ['monitors', 'events', 'violations', 'violation_locations', 'estimated_monitor_time', 'estimated_event_time', 'estimated_time']
+
+
+def rank_spec_costs(spec_costs, project=None, last=None):
+    """
+    Sum the costs of each spec over the commits and rank the specs by their estimated time per violation location.
+
+    Args:
+        spec_costs: The dataframe of the per-spec cost table.
+        project: Only use the costs of this project (optional).
+        last: Only use the costs of the last n commits of each project (optional).
+
+    Returns:
+        A DataFrame with one row per spec, ranked.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if project is not None:
+        spec_costs = spec_costs[spec_costs['project'] == project]
+
+    # Keep the last commits of each project (in the order they were analyzed)
+    if last is not None:
+        runs = spec_costs[['project', 'timestamp']].drop_duplicates().sort_values('timestamp')
+        runs = runs.groupby('project').tail(last)
+        spec_costs = spec_costs.merge(runs, on=['project', 'timestamp'])
+
+    # The crossed out times ('x') are not summed
+    spec_costs = spec_costs.assign(**{column: pd.to_numeric(spec_costs[column], errors='coerce') for column in COST_COLUMNS})
+    report = spec_costs.groupby('spec').agg(
+        commits=('timestamp', 'count'),
+        **{column: (column, 'sum') for column in COST_COLUMNS},
+    ).reset_index()
+
+    # Get the share of the estimated time and the estimated time per violation location
+    total_time = report['estimated_time'].sum()
+    report['time_share'] = report['estimated_time'] / total_time if total_time > 0 else 0.0
+    report['time_per_violation'] = np.where(
+        report['violation_locations'] > 0,
+        report['estimated_time'] / report['violation_locations'].where(report['violation_locations'] > 0, 1),
+        np.where(report['estimated_time'] > 0, np.inf, 0.0),
+    )
+    return report.sort_values(['time_per_violation', 'estimated_time'], ascending=False, kind='stable').reset_index(drop=True)
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Rank the PyMOP specs by their monitoring cost per violation found.')
+    parser.add_argument('--input', default='continuous_analysis_over_time_spec_costs.csv', help='The per-spec cost table.')
+    parser.add_argument('--project', default=None, help='Only report the costs of this project.')
+    parser.add_argument('--last', type=int, default=None, help='Only report the costs of the last n commits of each project.')
+    parser.add_argument('--top', type=int, default=20, help='The number of specs to print.')
+    parser.add_argument('--output', default=None, help='The CSV file to save the full ranking to.')
+    args = parser.parse_args()
+
+    report = rank_spec_costs(pd.read_csv(args.input), args.project, args.last)
+    if report.empty:
+        print(f'No spec costs found in {args.input}')
+        return 1
+
+    # Print the most expensive specs
+    print(f"{'spec':<48} {'commits':>7} {'monitors':>10} {'events':>12} {'locations':>9} {'time (s)':>10} {'share':>6} {'s/violation':>11}")
+    for row in report.head(args.top).itertuples(index=False):
+        print(f"{row.spec:<48} {row.commits:>7} {row.monitors:>10.0f} {row.events:>12.0f} {row.violation_locations:>9.0f} "
+              f"{row.estimated_time:>10.2f} {row.time_share:>6.1%} {row.time_per_violation:>11.2f}")
+
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f'Ranking saved to {args.output}')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
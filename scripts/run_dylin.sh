@@ -90,6 +90,23 @@ cp analyses.txt "${TMPDIR}/dynapyt_analyses-${DYNAPYT_SESSION_ID}.txt"
 # Go to the project directory
 cd "$PROJECT-dylin"
 
+# Order the tests from the violations and durations of the previous runs and the changed tests (see order_tests.py,
+# TEST_ORDER=0 keeps the collection order, TEST_ORDER=global interleaves the tests across modules and classes), before
+# the instrumentation rewrites the files
+TEST_ORDER_ARGS=()
+if [ "${TEST_ORDER:-1}" != "0" ]; then
+    python3 ./../continuous-analysis/scripts/order_tests.py "$PROJECT" dylin \
+        --output "$PWD/${PROJECT}_test_order.json" \
+        --history "$PWD/../continuous_analysis_over_time_results.csv" \
+        --durations "$PWD/../continuous_analysis_over_time_test_durations.csv" \
+        --junit "$PWD/../continuous-analysis-output/${PROJECT}_original_output/${PROJECT}_junit.xml" \
+        --parent "${PARENT_COMMIT:-HEAD~1}" \
+        && TEST_ORDER_ARGS+=(--ca-test-order-file="$PWD/${PROJECT}_test_order.json")
+    if [ "$TEST_ORDER" = "global" ]; then
+        TEST_ORDER_ARGS+=(--ca-test-order-global)
+    fi
+fi
+
 # Record the start time of the instrumentation process
 INSTRUMENTATION_START_TIME=$(python3 -c 'import time; print(time.time())')
 
@@ -98,19 +115,45 @@ python3 -m dynapyt.run_instrumentation \
     --directory="." \
     --analysisFile="${TMPDIR}/dynapyt_analyses-${DYNAPYT_SESSION_ID}.txt"
 
+# Instrument the allowlisted packages of the analysis scope (ANALYSIS_SCOPE, see analysis_scope.py)
+ANALYSIS_SCOPE_STR=$(python3 ./../continuous-analysis/scripts/analysis_scope.py describe) || exit 1
+echo "Analysis scope: $ANALYSIS_SCOPE_STR"
+for package_dir in $(python3 ./../continuous-analysis/scripts/analysis_scope.py instrumentation-dirs); do
+    echo "Instrumenting $package_dir"
+    python3 -m dynapyt.run_instrumentation \
+        --directory="$package_dir" \
+        --analysisFile="${TMPDIR}/dynapyt_analyses-${DYNAPYT_SESSION_ID}.txt"
+done
+
 # Record the end time and calculate the instrumentation duration
 INSTRUMENTATION_END_TIME=$(python3 -c 'import time; print(time.time())')
 INSTRUMENTATION_TIME=$(python3 -c "print($INSTRUMENTATION_END_TIME - $INSTRUMENTATION_START_TIME)")
 
 # ===== Run the tests =====
 
+# Per-test time budget: original per-test duration times this overhead factor
+PER_TEST_TIMEOUT_FACTOR=${PER_TEST_TIMEOUT_FACTOR:-10}
+ORIGINAL_JUNIT_FILE=$PWD/../continuous-analysis-output/${PROJECT}_original_output/${PROJECT}_junit.xml
+
+# Make the continuous-analysis pytest plugin importable
+export PYTHONPATH="$PWD/../continuous-analysis/scripts${PYTHONPATH:+:$PYTHONPATH}"
+
 # Record the start time of the test execution
 TEST_START_TIME=$(python3 -c 'import time; print(time.time())')
 
-# Run dylin
-timeout -k 9 3600 pytest -W ignore::DeprecationWarning \
-       --continue-on-collection-errors > ${PROJECT}_Output.txt
-exit_code=$?
+# Run dylin (measure the resources used by the test process)
+python3 ./../continuous-analysis/scripts/measure_resources.py --output "${PROJECT}_resources.txt" -- \
+timeout -k 120 3600 pytest -W ignore::DeprecationWarning \
+       --continue-on-collection-errors \
+       --junitxml=${PROJECT}_junit.xml \
+       -p continuous_analysis_plugin \
+       --ca-durations-file=${ORIGINAL_JUNIT_FILE} \
+       --ca-timeout-factor=${PER_TEST_TIMEOUT_FACTOR} \
+       --ca-killed-tests-file=$PWD/${PROJECT}_killed_tests.txt \
+       --ca-progress-file=$PWD/${PROJECT}_progress.json \
+       "${TEST_ORDER_ARGS[@]}" \
+    | python3 ./../continuous-analysis/scripts/capture_output.py "${PROJECT}_Output.txt"
+exit_code=${PIPESTATUS[0]}
 
 # Process test results if no timeout occurred
 if [ $exit_code -ne 124 ] && [ $exit_code -ne 137 ]; then
@@ -155,12 +198,31 @@ RESULTS_FILE="${PROJECT}_dylin_output/${PROJECT}_results.txt"
 echo "Instrumentation Time: ${INSTRUMENTATION_TIME}s" >> $RESULTS_FILE
 echo "Test Time: ${TEST_TIME}s" >> $RESULTS_FILE
 echo "Post-Run Time: ${POST_RUN_TIME}s" >> $RESULTS_FILE
+echo "Analysis Scope: ${ANALYSIS_SCOPE_STR}" >> $RESULTS_FILE
+
+# Save the resource usage of the test process
+if [ -f "${PROJECT}-dylin/${PROJECT}_resources.txt" ]; then
+    cat "${PROJECT}-dylin/${PROJECT}_resources.txt" >> $RESULTS_FILE
+fi
 
 # Copy the ${PROJECT}_findings.txt file to the $CLONE_DIR directory
 cp "${PROJECT}-dylin/${PROJECT}_findings.txt" "${PROJECT}_dylin_output/"
 
 # Copy the ${PROJECT}_Output.txt file to the $CLONE_DIR directory
-cp "${PROJECT}-dylin/${PROJECT}_Output.txt" "${PROJECT}_dylin_output/"
+cp "${PROJECT}-dylin/${PROJECT}_Output.txt"* "${PROJECT}_dylin_output/"
+
+# Copy the ${PROJECT}_junit.xml file (per-test durations) to the $CLONE_DIR directory
+cp "${PROJECT}-dylin/${PROJECT}_junit.xml" "${PROJECT}_dylin_output/"
+
+# Copy the ${PROJECT}_killed_tests.txt file (tests that exceeded their time budget) if any test was killed
+if [ -f "${PROJECT}-dylin/${PROJECT}_killed_tests.txt" ]; then
+    cp "${PROJECT}-dylin/${PROJECT}_killed_tests.txt" "${PROJECT}_dylin_output/"
+fi
+
+# Copy the ${PROJECT}_progress.json file (how much of the test suite ran) to the $CLONE_DIR directory
+if [ -f "${PROJECT}-dylin/${PROJECT}_progress.json" ]; then
+    cp "${PROJECT}-dylin/${PROJECT}_progress.json" "${PROJECT}_dylin_output/"
+fi
 
 # Copy the /tmp/dynapyt_output-454852b3-74be-498a-8968-c1bceaaf3293/findings.csv and output.json files to the $CLONE_DIR directory
 # Rename them to temp_findings.csv and temp_output.json
@@ -0,0 +1,137 @@
+#!/bin/bash
+
+# Local Pipeline Runner Script (the job body of local_scheduler.py)
+# Runs the steps of the auto-runner and auto-filter workflows for a commit of a project on the local machine:
+# the original, PyMOP (in the PyMOP Docker image) and DyLin runs, then the parse and filter stages (run_pipeline.py).
+# The results of all the commits of the project are kept in the project directory, so the PyMOP spec selection
+# and the filter use the results of the previous commits. A commit without Python or dependency changes is not run,
+# its results are synthesized from the results of its parent commit (see skip_unchanged_commit.py). The metadata of
+# the commits is extracted once per project (commit_metadata.csv in the project directory, see commit_metadata.py).
+# Usage: ./run_local_pipeline.sh <project_dir> <repo_url> <commit> [<parent_commit>]
+#
+# Environment variables:
+#   JOB_CPUS, JOB_MEMORY_MB: the resource limits of the job (the PyMOP container limits, and the virtual memory
+#       limit of the original and DyLin runs)
+#   PYMOP_IMAGE: the PyMOP Docker image (stephen0512/pymop-exp:latest by default)
+#   JOB_CONTAINER_NAME: the name of the PyMOP container (set by local_scheduler.py, which removes the container when
+#       the job is killed)
+#   TEST_ORDER: 0 to run the PyMOP and DyLin tests in their collection order, global to interleave them across
+#       modules and classes (see order_tests.py)
+
+PROJECT_DIR=$1
+REPO_URL=$2
+COMMIT=$3
+PARENT_COMMIT=$4
+
+if [ -z "$PROJECT_DIR" ] || [ -z "$REPO_URL" ] || [ -z "$COMMIT" ]; then
+    echo "Usage: $0 <project_dir> <repo_url> <commit> [<parent_commit>]"
+    exit 1
+fi
+
+CA_ROOT=$(cd "$(dirname "$0")/.." && pwd)
+PYMOP_IMAGE=${PYMOP_IMAGE:-stephen0512/pymop-exp:latest}
+REPO_NAME=$(basename "$REPO_URL" .git)
+MIRROR="$REPO_NAME-mirror"
+
+echo "Running the pipeline for $REPO_NAME at $COMMIT (parent: ${PARENT_COMMIT:-none})"
+mkdir -p "$PROJECT_DIR"
+cd "$PROJECT_DIR" || exit 1
+PROJECT_DIR=$PWD
+
+# Copy the continuous-analysis scripts (the Docker container only sees the project directory)
+rm -rf continuous-analysis
+mkdir -p continuous-analysis
+cp -r "$CA_ROOT/scripts" "$CA_ROOT/projects_requirements" continuous-analysis/
+
+# Clone the repository once, and fetch the new commits for the next jobs
+if [ -d "$MIRROR" ]; then
+    git -C "$MIRROR" fetch -q origin '+refs/heads/*:refs/heads/*' '+refs/pull/*/head:refs/pull/*/head' || git -C "$MIRROR" fetch -q origin
+else
+    git clone -q --bare "$REPO_URL" "$MIRROR" || exit 1
+fi
+
+# Extract the metadata of all the commits of the mirror in one git log pass (again only when the commit is not in
+# the table, i.e. the fetch brought new commits), so the runs and the parser read it instead of running git log for
+# each commit (see commit_metadata.py)
+export COMMIT_METADATA_FILE="$PROJECT_DIR/commit_metadata.csv"
+COMMIT_FULL_SHA=$(git -C "$MIRROR" rev-parse --verify -q "$COMMIT^{commit}")
+if [ -z "$COMMIT_FULL_SHA" ] || ! grep -q "^$COMMIT_FULL_SHA," "$COMMIT_METADATA_FILE" 2>/dev/null; then
+    python3 continuous-analysis/scripts/commit_metadata.py "$MIRROR" --all --output "$COMMIT_METADATA_FILE" \
+        || rm -f "$COMMIT_METADATA_FILE"
+fi
+
+# Skip the commit if it cannot change the results of its parent commit
+if [ -n "$PARENT_COMMIT" ] && [ -f continuous_analysis_over_time_results.csv ]; then
+    if python3 continuous-analysis/scripts/skip_unchanged_commit.py check "$MIRROR" "$PARENT_COMMIT" "$COMMIT"; then
+        python3 continuous-analysis/scripts/skip_unchanged_commit.py synthesize "$MIRROR" "$PARENT_COMMIT" "$COMMIT"
+        exit_code=$?
+        # The commit must be analyzed if the parent commit has no results
+        if [ $exit_code -eq 0 ]; then
+            echo "Results of $COMMIT synthesized from $PARENT_COMMIT"
+            exit 0
+        fi
+    fi
+fi
+
+# Create the working trees of the runs at the commit (see workspace_manager.py), and remove them when the job exits
+rm -rf continuous-analysis-output
+trap 'python3 continuous-analysis/scripts/workspace_manager.py remove "$MIRROR" --prefix "$REPO_NAME"' EXIT
+python3 continuous-analysis/scripts/workspace_manager.py create "$MIRROR" --prefix "$REPO_NAME" --commit "$COMMIT" \
+    --timing-file "continuous-analysis-output/${REPO_NAME}_workspace.json" || exit 1
+
+# Limit the virtual memory of the original and DyLin runs
+MEMORY_LIMIT_KB=""
+if [ -n "$JOB_MEMORY_MB" ]; then
+    MEMORY_LIMIT_KB=$((JOB_MEMORY_MB * 1024))
+fi
+
+# Run the original tests
+(
+    python3 -m venv original-venv && source original-venv/bin/activate || exit 1
+    [ -n "$MEMORY_LIMIT_KB" ] && ulimit -v "$MEMORY_LIMIT_KB"
+    bash continuous-analysis/scripts/run_original.sh "$REPO_NAME"
+)
+rm -rf original-venv
+
+# Run PyMOP in the Docker container (with the results of the previous commits for the spec selection)
+DOCKER_LIMITS=()
+[ -n "$JOB_CONTAINER_NAME" ] && DOCKER_LIMITS+=(--name "$JOB_CONTAINER_NAME")
+[ -n "$JOB_CPUS" ] && DOCKER_LIMITS+=(--cpus "$JOB_CPUS")
+[ -n "$JOB_MEMORY_MB" ] && DOCKER_LIMITS+=(--memory "${JOB_MEMORY_MB}m")
+SPEC_HISTORY_ENV=()
+[ -f continuous_analysis_over_time_results.csv ] && SPEC_HISTORY_ENV+=(-e SPEC_HISTORY_CSV=/local/continuous_analysis_over_time_results.csv)
+docker run --rm "${DOCKER_LIMITS[@]}" \
+    -v "$PROJECT_DIR:/local" \
+    -e ANALYSIS_SCOPE \
+    -e ANALYSIS_SCOPE_ALLOWLIST \
+    -e PER_TEST_TIMEOUT_FACTOR \
+    -e TEST_ORDER \
+    -e PARENT_COMMIT="$PARENT_COMMIT" \
+    "${SPEC_HISTORY_ENV[@]}" \
+    "$PYMOP_IMAGE" \
+    bash -c "set -euxo pipefail && \
+    cp /local/continuous-analysis/scripts/run_pymop.sh /workspace/run_pymop.sh && \
+    cp -r /local/$REPO_NAME-pymop /workspace && \
+    rm -rf /local/$REPO_NAME-pymop && \
+    source /workspace/pymop-venv/bin/activate && \
+    chmod +x /workspace/run_pymop.sh && \
+    /workspace/run_pymop.sh $REPO_NAME && \
+    deactivate"
+
+# Run DyLin
+(
+    python3 -m venv dylin-venv && source dylin-venv/bin/activate || exit 1
+    [ -n "$MEMORY_LIMIT_KB" ] && ulimit -v "$MEMORY_LIMIT_KB"
+    PARENT_COMMIT="$PARENT_COMMIT" bash continuous-analysis/scripts/run_dylin.sh "$REPO_NAME"
+)
+rm -rf dylin-venv
+
+# Parse the outputs and filter the new violations (the mirror has the commits to diff)
+python3 continuous-analysis/scripts/run_pipeline.py "$REPO_NAME" "$MIRROR" "$COMMIT" $PARENT_COMMIT
+exit_code=$?
+
+# Remove the outputs of the runs (the working trees are removed on exit)
+rm -rf continuous-analysis-output
+
+echo "Pipeline completed for $REPO_NAME at $COMMIT"
+exit $exit_code
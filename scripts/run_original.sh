@@ -13,18 +13,31 @@ fi
 # Print project name
 echo "Running Original Test for project: $PROJECT"
 
+# The commit metadata table is relative to the directory the script was started in
+if [ -n "$COMMIT_METADATA_FILE" ] && [ -f "$COMMIT_METADATA_FILE" ]; then
+    COMMIT_METADATA_FILE=$(cd "$(dirname "$COMMIT_METADATA_FILE")" && pwd)/$(basename "$COMMIT_METADATA_FILE")
+fi
+
 # Go to project directory
 cd "$PROJECT-original"
 
 # Get the commit timestamp and commit message from the git log
-commit_timestamp=$(git log -1 --format="%at" HEAD)
-commit_message=$(git log -1 --format="%s" HEAD)
-echo "Commit timestamp: $commit_timestamp"
-echo "Commit message: $commit_message"
-
-# Add the commit timestamp and commit message to the output file
-echo "Commit timestamp:= $commit_timestamp" >> ${PROJECT}_commit_info.txt
-echo "Commit message:= $commit_message" >> ${PROJECT}_commit_info.txt
+# (only the SHA is written when the commit is in the commit metadata table, the parser reads them from the table,
+# see commit_metadata.py)
+commit_sha=$(git rev-parse HEAD)
+if [ -n "$COMMIT_METADATA_FILE" ] && [ -f "$COMMIT_METADATA_FILE" ] && grep -q "^$commit_sha," "$COMMIT_METADATA_FILE"; then
+    echo "Commit metadata: $COMMIT_METADATA_FILE"
+    echo "Commit SHA:= $commit_sha" > ${PROJECT}_commit_info.txt
+else
+    commit_timestamp=$(git log -1 --format="%at" HEAD)
+    commit_message=$(git log -1 --format="%s" HEAD)
+    echo "Commit timestamp: $commit_timestamp"
+    echo "Commit message: $commit_message"
+
+    # Add the commit timestamp and commit message to the output file
+    echo "Commit timestamp:= $commit_timestamp" >> ${PROJECT}_commit_info.txt
+    echo "Commit message:= $commit_message" >> ${PROJECT}_commit_info.txt
+fi
 
 # Install github submodules if they exist
 if [ -f .gitmodules ]; then
@@ -56,13 +69,15 @@ pip install pytest-cov
 # Record the start time of the test execution
 TEST_START_TIME=$(python3 -c 'import time; print(time.time())')
 
-# Run PyMOP with coverage
+# Run the tests with coverage (measure the resources used by the test process)
+python3 ./../continuous-analysis/scripts/measure_resources.py --output "${PROJECT}_resources.txt" -- \
 timeout -k 9 3600 pytest -W ignore::DeprecationWarning \
                          --continue-on-collection-errors \
                          --cov=${PROJECT} \
                          --cov-report=xml:${PROJECT}_coverage.xml \
-                         > "${PROJECT}_Output.txt"
-exit_code=$?
+                         --junitxml=${PROJECT}_junit.xml \
+    | python3 ./../continuous-analysis/scripts/capture_output.py "${PROJECT}_Output.txt"
+exit_code=${PIPESTATUS[0]}
 
 # Process test results if no timeout occurred
 if [ $exit_code -ne 124 ] && [ $exit_code -ne 137 ]; then
@@ -87,9 +102,15 @@ mkdir -p "${PROJECT}_original_output"
 RESULTS_FILE="${PROJECT}_original_output/${PROJECT}_results.txt"
 echo "Test Time: ${TEST_TIME}s" >> $RESULTS_FILE
 
+# Save the resource usage of the test process
+if [ -f "${PROJECT}-original/${PROJECT}_resources.txt" ]; then
+    cat "${PROJECT}-original/${PROJECT}_resources.txt" >> $RESULTS_FILE
+fi
+
 # Copy all output files
-cp "${PROJECT}-original/${PROJECT}_Output.txt" "${PROJECT}_original_output/"
+cp "${PROJECT}-original/${PROJECT}_Output.txt"* "${PROJECT}_original_output/"
 cp "${PROJECT}-original/${PROJECT}_coverage.xml" "${PROJECT}_original_output/"
+cp "${PROJECT}-original/${PROJECT}_junit.xml" "${PROJECT}_original_output/"
 cp "${PROJECT}-original/${PROJECT}_commit_info.txt" "${PROJECT}_original_output/"
 
 # Copy the folder to local directory (remove the old one first if it exists)
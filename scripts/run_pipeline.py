@@ -0,0 +1,69 @@
+import sys
+import argparse
+import parse_continuous_analysis_output
+import filter_new_violations
+from violation_snapshots import get_snapshots
+
+
+"""
+This script runs the parse and filter stages of the pipeline for a commit in a single process:
+- parse_continuous_analysis_output.py parses the outputs of the runs and writes the results CSV files
+- filter_new_violations.py filters the new violations of the commit, using the violations parsed in memory
+
+It writes the same CSV files as running the two scripts one after the other, without the second interpreter start
+and without reading the results of the commit back from continuous_analysis_over_time_results.csv. Only the results
+of the previous commits are read (before the parse, and only the columns used by the filter, see read_results),
+and not at all when the parent commit has a violation snapshot (see violation_snapshots.py).
+
+Usage: python3 run_pipeline.py <project> <repo_path> <current_commit_sha> [<parent_commit_sha>]
+"""
+
+
+def run_pipeline(project: str, repo_path: str, current_sha: str, parent_sha: str = None) -> bool:
+    """
+    Parse the outputs of the runs of a commit and filter its new violations.
+
+    Args:
+        project: The project.
+        repo_path: The path to the repository.
+        current_sha: The SHA of the current commit.
+        parent_sha: The SHA of the parent commit (optional, from the commit metadata table if not given).
+
+    Returns:
+        True if the violations were filtered, False if the runs had no results.
+    """
+    # Read the results of the previous commits before the results of the commit are appended
+    # (unless the violations of the parent commit are loaded from its snapshot)
+    snapshots = get_snapshots()
+    df = None
+    if snapshots is None or snapshots.find(parent_sha) is None:
+        df = filter_new_violations.read_results()
+
+    parsed = parse_continuous_analysis_output.main(project, current_sha)
+    if parsed is None:
+        print(f"No results parsed for {project} at {current_sha}, skipping the filter")
+        return False
+
+    print("\n====== FILTERING NEW VIOLATIONS ======\n")
+    filter_new_violations.main(repo_path, current_sha, parent_sha, df=df, parsed=parsed)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse the outputs of a commit and filter its new violations in one process.')
+    parser.add_argument('project')
+    parser.add_argument('repo_path')
+    parser.add_argument('current_sha')
+    parser.add_argument('parent_sha', nargs='?', default=None)
+    args = parser.parse_args()
+
+    try:
+        filtered = run_pipeline(args.project, args.repo_path, args.current_sha, args.parent_sha)
+    finally:
+        parse_continuous_analysis_output.profiler.write_report()
+        filter_new_violations.profiler.write_report()
+    return 0 if filtered else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,16 +39,64 @@ fi
 # Install the project with all optional dependencies
 pip install .
 
+# Per-test time budget: original per-test duration times this overhead factor
+PER_TEST_TIMEOUT_FACTOR=${PER_TEST_TIMEOUT_FACTOR:-10}
+ORIGINAL_JUNIT_FILE=/local/continuous-analysis-output/${PROJECT}_original_output/${PROJECT}_junit.xml
+
+# Select the specs to monitor from the history of the project (all the specs if there is no history, see select_specs.py)
+# SPEC_HISTORY_CSV is only set by run_local_pipeline.sh, the auto-runner workflow always monitors all the specs
+SPECS_PATH=$PWD/../pymop/pymop/specs-new
+if [ -n "$SPEC_HISTORY_CSV" ] && [ -f "$SPEC_HISTORY_CSV" ]; then
+    SPECS_PATH=$(python3 /local/continuous-analysis/scripts/select_specs.py "$PROJECT" "$SPECS_PATH" \
+        --history "$SPEC_HISTORY_CSV" \
+        --output-dir "$PWD/../${PROJECT}_specs" \
+        --selection-file "$PWD/${PROJECT}_spec_selection.json") || SPECS_PATH=$PWD/../pymop/pymop/specs-new
+fi
+echo "Specs: $SPECS_PATH"
+
+# Get the analysis scope (ANALYSIS_SCOPE, the violations out of the scope are dropped by the parser, see analysis_scope.py)
+ANALYSIS_SCOPE_STR=$(python3 /local/continuous-analysis/scripts/analysis_scope.py describe) || exit 1
+echo "Analysis scope: $ANALYSIS_SCOPE_STR"
+
+# Make the continuous-analysis pytest plugin importable
+export PYTHONPATH="/local/continuous-analysis/scripts${PYTHONPATH:+:$PYTHONPATH}"
+
+# Order the tests from the violations and durations of the previous runs and the changed tests (see order_tests.py,
+# TEST_ORDER=0 keeps the collection order, TEST_ORDER=global interleaves the tests across modules and classes)
+TEST_ORDER_ARGS=()
+if [ "${TEST_ORDER:-1}" != "0" ]; then
+    HISTORY_DIR=$(dirname "${SPEC_HISTORY_CSV:-/local/continuous_analysis_over_time_results.csv}")
+    python3 /local/continuous-analysis/scripts/order_tests.py "$PROJECT" pymop \
+        --output "$PWD/${PROJECT}_test_order.json" \
+        --history "$SPEC_HISTORY_CSV" \
+        --durations "$HISTORY_DIR/continuous_analysis_over_time_test_durations.csv" \
+        --junit "$ORIGINAL_JUNIT_FILE" \
+        --parent "${PARENT_COMMIT:-HEAD~1}" \
+        && TEST_ORDER_ARGS+=(--ca-test-order-file="$PWD/${PROJECT}_test_order.json")
+    if [ "$TEST_ORDER" = "global" ]; then
+        TEST_ORDER_ARGS+=(--ca-test-order-global)
+    fi
+fi
+
 # Record the start time of the test execution
 TEST_START_TIME=$(python3 -c 'import time; print(time.time())')
 
-# Run PyMOP
-timeout -k 9 3600 pytest -W ignore::DeprecationWarning --path=$PWD/../pymop/pymop/specs-new \
+# Run PyMOP (measure the resources used by the test process)
+python3 /local/continuous-analysis/scripts/measure_resources.py --output "${PROJECT}_resources.txt" -- \
+timeout -k 120 3600 pytest -W ignore::DeprecationWarning --path=$SPECS_PATH \
        --algo=D \
        --continue-on-collection-errors \
        --statistics \
-       --statistics_file=D.json > "${PROJECT}_Output.txt"
-exit_code=$?
+       --statistics_file=D.json \
+       --junitxml=${PROJECT}_junit.xml \
+       -p continuous_analysis_plugin \
+       --ca-durations-file=${ORIGINAL_JUNIT_FILE} \
+       --ca-timeout-factor=${PER_TEST_TIMEOUT_FACTOR} \
+       --ca-killed-tests-file=$PWD/${PROJECT}_killed_tests.txt \
+       --ca-progress-file=$PWD/${PROJECT}_progress.json \
+       "${TEST_ORDER_ARGS[@]}" \
+    | python3 /local/continuous-analysis/scripts/capture_output.py "${PROJECT}_Output.txt"
+exit_code=${PIPESTATUS[0]}
 
 # Process test results if no timeout occurred
 if [ $exit_code -ne 124 ] && [ $exit_code -ne 137 ]; then
@@ -72,9 +120,25 @@ mkdir -p "${PROJECT}_pymop_output"
 # Save test results
 RESULTS_FILE="${PROJECT}_pymop_output/${PROJECT}_results.txt"
 echo "Test Time: ${TEST_TIME}s" >> $RESULTS_FILE
+echo "Analysis Scope: ${ANALYSIS_SCOPE_STR}" >> $RESULTS_FILE
+
+# Save the resource usage of the test process
+if [ -f "${PROJECT}-pymop/${PROJECT}_resources.txt" ]; then
+    cat "${PROJECT}-pymop/${PROJECT}_resources.txt" >> $RESULTS_FILE
+fi
 
 # Copy all output files
-cp "${PROJECT}-pymop/${PROJECT}_Output.txt" "${PROJECT}_pymop_output/"
+cp "${PROJECT}-pymop/${PROJECT}_Output.txt"* "${PROJECT}_pymop_output/"
+cp "${PROJECT}-pymop/${PROJECT}_junit.xml" "${PROJECT}_pymop_output/"
+if [ -f "${PROJECT}-pymop/${PROJECT}_killed_tests.txt" ]; then
+    cp "${PROJECT}-pymop/${PROJECT}_killed_tests.txt" "${PROJECT}_pymop_output/"
+fi
+if [ -f "${PROJECT}-pymop/${PROJECT}_progress.json" ]; then
+    cp "${PROJECT}-pymop/${PROJECT}_progress.json" "${PROJECT}_pymop_output/"
+fi
+if [ -f "${PROJECT}-pymop/${PROJECT}_spec_selection.json" ]; then
+    cp "${PROJECT}-pymop/${PROJECT}_spec_selection.json" "${PROJECT}_pymop_output/"
+fi
 cp "${PROJECT}-pymop/D-full.json" "${PROJECT}_pymop_output/D-full.json"
 cp "${PROJECT}-pymop/D-time.json" "${PROJECT}_pymop_output/D-time.json"
 cp "${PROJECT}-pymop/D-violations.json" "${PROJECT}_pymop_output/D-violations.json"
@@ -0,0 +1,199 @@
+import os
+import csv
+import sys
+import json
+import argparse
+
+
+"""
+This script is used to select the PyMOP specs to monitor for a run of a project, from the history of its previous
+runs (the events and unique_violations columns of continuous_analysis_over_time_results.csv).
+It should return the following information:
+- The directory of specs to pass to PyMOP (--path): a project specific directory linking the selected spec files,
+  or the full spec directory
+- The selection of the run (full or selected), the selected specs and the estimated number of saved events
+
+A spec is dropped when it was monitored in each of the last N runs of the project, never found a violation in them,
+and generated at least the minimum number of events per run on average. A run with all the specs is done every K
+runs (and when there is no history), so the dropped specs are checked again and the results stay sound over time.
+
+The selection only runs in the local pipeline (run_local_pipeline.sh passes the results of the previous commits of
+the project to the PyMOP container with SPEC_HISTORY_CSV). The auto-runner workflow has no history of the project, so
+its runs always monitor all the specs.
+
+Only the standard library is used, as this script runs inside the PyMOP test environment.
+
+Usage: python3 select_specs.py <project> <specs_dir> --history <results.csv> --output-dir <dir> [--selection-file <selection.json>]
+"""
+
+
+# The defaults of the selection (the number of runs of the evidence window, the period of the full runs and the
+# minimum average number of events of a dropped spec)
+DEFAULT_WINDOW = 10
+DEFAULT_FULL_EVERY = 5
+DEFAULT_MIN_EVENTS = 10000
+
+
+def parse_counts(counts_str, separator):
+    """
+    Parse the per-spec counts of a results string (spec=count or spec=event=count, joined by a separator).
+    It is also used by parse_continuous_analysis_output.py.
+
+    Args:
+        counts_str: The per-spec counts (e.g. the monitors or events of a PyMOP run), anything else is empty.
+        separator: The separator of the counts ('<>' or ';').
+
+    Returns:
+        A dictionary mapping each spec to its count (the counts of the events of a spec are summed).
+    """
+    counts = {}
+    if not isinstance(counts_str, str):
+        return counts
+    for item in counts_str.split(separator):
+        spec, _, count = item.partition('=')
+        try:
+            counts[spec] = counts.get(spec, 0) + int(count.rpartition('=')[2])
+        except ValueError:
+            continue
+    return counts
+
+
+def read_history(history_file, project):
+    """
+    Read the PyMOP runs of a project from the over time results.
+
+    Args:
+        history_file: The path to the continuous_analysis_over_time_results.csv file.
+        project: The project.
+
+    Returns:
+        A list of the runs (in order), each a dictionary with the events and violations of each spec and the
+        monitored specs (None if all the specs were monitored).
+    """
+    # The violations columns can be very large
+    csv.field_size_limit(sys.maxsize)
+
+    runs = []
+    with open(history_file, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('project') != project or row.get('algorithm') != 'pymop':
+                continue
+            # Skip the runs without PyMOP statistics
+            if not row.get('events') and not row.get('total_events'):
+                continue
+            selected_specs = row.get('selected_specs') or ''
+            runs.append({
+                'events': parse_counts(row.get('events'), '<>'),
+                'violations': parse_counts(row.get('unique_violations'), ';'),
+                'monitored': set(selected_specs.split(';')) if row.get('spec_selection') == 'selected' else None,
+            })
+    return runs
+
+
+def select_specs(runs, specs, window=DEFAULT_WINDOW, full_every=DEFAULT_FULL_EVERY, min_events=DEFAULT_MIN_EVENTS):
+    """
+    Select the specs to monitor in the next run.
+
+    Args:
+        runs: The previous runs of the project (see read_history).
+        specs: The names of all the specs.
+        window: The number of runs in which a spec must have been monitored without violations to be dropped.
+        full_every: Monitor all the specs once every full_every runs.
+        min_events: The minimum average number of events per run of a dropped spec.
+
+    Returns:
+        A dictionary with the selection (full or selected), the selected specs, the dropped specs and the
+        estimated number of saved events.
+    """
+    full = {'spec_selection': 'full', 'selected_specs': list(specs), 'dropped_specs': [], 'estimated_saved_events': 0}
+
+    # Monitor all the specs when it is the turn of a full run
+    runs_since_full = 0
+    for run in reversed(runs):
+        if run['monitored'] is None:
+            break
+        runs_since_full += 1
+    if not runs or runs_since_full >= full_every - 1:
+        return full
+
+    dropped = {}
+    for spec in specs:
+        # Get the last runs in which the spec was monitored
+        monitored_runs = [run for run in runs if run['monitored'] is None or spec in run['monitored']][-window:]
+        if len(monitored_runs) < window:
+            continue
+        if any(run['violations'].get(spec, 0) > 0 for run in monitored_runs):
+            continue
+        average_events = sum(run['events'].get(spec, 0) for run in monitored_runs) / window
+        if average_events >= min_events:
+            dropped[spec] = average_events
+
+    if not dropped:
+        return full
+    return {
+        'spec_selection': 'selected',
+        'selected_specs': [spec for spec in specs if spec not in dropped],
+        'dropped_specs': sorted(dropped),
+        'estimated_saved_events': int(sum(dropped.values())),
+    }
+
+
+def create_specs_dir(specs_dir, output_dir, dropped_specs):
+    """
+    Create a spec directory that links all the files of the spec directory except the dropped spec files.
+
+    Args:
+        specs_dir: The directory of all the specs.
+        output_dir: The directory to create (replaced if it exists).
+        dropped_specs: The names of the dropped specs (the spec files are named after their spec).
+    """
+    if os.path.isdir(output_dir):
+        for name in os.listdir(output_dir):
+            os.unlink(os.path.join(output_dir, name))
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(specs_dir):
+        if os.path.splitext(name)[0] in dropped_specs:
+            continue
+        os.symlink(os.path.join(os.path.abspath(specs_dir), name), os.path.join(output_dir, name))
+
+
+def get_spec_names(specs_dir):
+    # The specs are the Python files of the spec directory
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(specs_dir)
+                  if name.endswith('.py') and not name.startswith('__'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Select the PyMOP specs to monitor from the history of the project.')
+    parser.add_argument('project')
+    parser.add_argument('specs_dir', help='The directory of all the specs.')
+    parser.add_argument('--history', required=True, help='The continuous_analysis_over_time_results.csv file.')
+    parser.add_argument('--output-dir', required=True, help='The project specific spec directory to create.')
+    parser.add_argument('--selection-file', default=None, help='The JSON file to save the selection to.')
+    parser.add_argument('--window', type=int, default=int(os.environ.get('SPEC_SELECTION_WINDOW', DEFAULT_WINDOW)))
+    parser.add_argument('--full-every', type=int, default=int(os.environ.get('SPEC_SELECTION_FULL_EVERY', DEFAULT_FULL_EVERY)))
+    parser.add_argument('--min-events', type=int, default=int(os.environ.get('SPEC_SELECTION_MIN_EVENTS', DEFAULT_MIN_EVENTS)))
+    args = parser.parse_args()
+
+    runs = read_history(args.history, args.project) if os.path.isfile(args.history) else []
+    selection = select_specs(runs, get_spec_names(args.specs_dir), args.window, args.full_every, args.min_events)
+
+    # The logs go to stderr, stdout is the spec directory to use
+    if selection['spec_selection'] == 'selected':
+        create_specs_dir(args.specs_dir, args.output_dir, selection['dropped_specs'])
+        specs_path = os.path.abspath(args.output_dir)
+        print(f"Dropped {len(selection['dropped_specs'])} specs (about {selection['estimated_saved_events']} events per run): "
+              f"{', '.join(selection['dropped_specs'])}", file=sys.stderr)
+    else:
+        specs_path = os.path.abspath(args.specs_dir)
+        print(f"Monitoring all the specs ({len(runs)} previous runs)", file=sys.stderr)
+
+    if args.selection_file:
+        with open(args.selection_file, 'w') as f:
+            json.dump(selection, f)
+    print(specs_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
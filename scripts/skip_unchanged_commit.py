@@ -0,0 +1,252 @@
+import os
+import re
+import csv
+import sys
+import hashlib
+import argparse
+import subprocess
+from datetime import datetime
+from fnmatch import fnmatch
+from git_batch_diff import get_reader, diff_trees
+from track_commit_changes import track_changes, get_offseted_line_num
+from commit_metadata import get_commit
+from analysis_scope import is_library_path
+
+
+"""
+This script is the pre-flight stage of the analysis of a commit. It checks if the commit can change the results of
+the analyses, and synthesizes the results of a commit that cannot from the results of its parent commit, so the
+original, PyMOP and DyLin runs are skipped.
+
+A commit cannot change the results if:
+- No Python file was added, deleted, renamed or modified, except in the ignored paths (the SKIP_IGNORED_PATHS
+  environment variable, comma separated path prefixes, docs/, doc/ and .github/ by default)
+- No submodule was added, removed or moved to another commit (even in the ignored paths)
+- The dependency files (requirements*.txt, setup.py, setup.cfg, pyproject.toml, ...) are the same
+
+The synthesized rows are the rows of the parent commit in continuous_analysis_over_time_results.csv, with the
+violation locations remapped through the changes of the commit (see track_changes) and the synthesized_from column
+set to the parent commit. The filtered row of the commit is then computed from them by filter_new_violations.py.
+
+Usage:
+    python3 skip_unchanged_commit.py check <repo_path> <parent_sha> <current_sha> (exit code 0 if the commit can be skipped)
+    python3 skip_unchanged_commit.py synthesize <repo_path> <parent_sha> <current_sha> [--no-filter]
+"""
+
+
+# The dependency files of a project (in the root of the repository) and their directories
+DEPENDENCY_FILES = [
+    'requirements*.txt', 'setup.py', 'setup.cfg', 'pyproject.toml', 'tox.ini', 'pytest.ini', '.gitmodules',
+    'Pipfile', 'Pipfile.lock', 'poetry.lock', 'environment.yml', 'requirements',
+]
+
+# The path prefixes whose Python files cannot change the results
+DEFAULT_IGNORED_PATHS = 'docs/,doc/,.github/'
+
+# The results file the rows are synthesized in
+RESULTS_FILE = 'continuous_analysis_over_time_results.csv'
+
+# A violation location in the violations_by_test column (spec:filepath:line_num=)
+VIOLATION_BY_TEST_SEPARATOR = re.compile(r';(?=[^;:=]+:[^;=]*:\d+=)')
+
+
+def get_ignored_paths() -> list:
+    # The path prefixes whose Python files cannot change the results
+    return [path.strip() for path in os.environ.get('SKIP_IGNORED_PATHS', DEFAULT_IGNORED_PATHS).split(',') if path.strip()]
+
+
+def get_dependency_hash(reader, sha: str) -> str:
+    """
+    Hash the dependency files of a commit (their names, modes and blob or tree SHAs, so no file is read).
+
+    Args:
+        reader: The GitBatchReader of the repository.
+        sha: The SHA of the commit.
+
+    Returns:
+        The hash of the dependency files.
+    """
+    entries = reader.read_tree(sha)
+    dependency_entries = sorted(
+        f'{name} {mode} {object_sha}' for name, (mode, object_sha) in entries.items()
+        if any(fnmatch(name, pattern) for pattern in DEPENDENCY_FILES)
+    )
+    return hashlib.sha256('\n'.join(dependency_entries).encode()).hexdigest()
+
+
+def check_commit(repo_path: str, parent_sha: str, current_sha: str) -> tuple:
+    """
+    Check if a commit can change the results of the analyses.
+
+    Args:
+        repo_path: The path to the repository.
+        parent_sha: The SHA of the parent commit.
+        current_sha: The SHA of the commit.
+
+    Returns:
+        A tuple containing whether the commit can be skipped and the reason.
+    """
+    reader = get_reader(repo_path)
+
+    # The dependencies are installed before the tests are run
+    if get_dependency_hash(reader, parent_sha) != get_dependency_hash(reader, current_sha):
+        return False, 'the dependency files changed'
+
+    # The Python files (including the deleted ones, which track_changes does not report) and the submodules
+    submodules = {}
+    modified, deleted, added = diff_trees(reader, parent_sha, current_sha, submodules=submodules)
+
+    # The code of a submodule is not diffed, so any change of a submodule (gitlink) must be analyzed
+    if submodules:
+        return False, f'{len(submodules)} submodules changed (e.g. {next(iter(submodules))})'
+
+    ignored_paths = get_ignored_paths()
+    changed_files = [path for path in list(modified) + list(deleted) + list(added)
+                     if not any(path.startswith(prefix) for prefix in ignored_paths)]
+    if changed_files:
+        return False, f'{len(changed_files)} Python files changed (e.g. {changed_files[0]})'
+    return True, 'no Python or dependency changes'
+
+
+def remap_location(location: str, changes: dict, old_to_new: dict) -> str:
+    """
+    Remap a violation location of the parent commit to the commit (spec:filepath:line_num).
+
+    Args:
+        location: The violation location in the parent commit.
+        changes: The changes between the parent commit and the commit (see track_changes).
+        old_to_new: The renamed files (old filepath -> new filepath).
+
+    Returns:
+        The violation location in the commit.
+    """
+    try:
+        spec, filepath, line_num = location.rsplit(':', 2)
+        line_num = int(line_num)
+    except ValueError:
+        return location
+    if is_library_path(filepath):
+        return location
+
+    # The instrumented DyLin files end with .orig
+    suffix = '.orig' if filepath.endswith('.orig') else ''
+    filepath = filepath[:len(filepath) - len(suffix)]
+
+    # Find the path of the file relative to the repository (the filepath may have a prefix, e.g. /project-pymop/)
+    for path in list(old_to_new) + list(changes['offsets']):
+        if filepath.endswith('/' + path) or filepath == path:
+            new_path = old_to_new.get(path, path)
+            file_offsets = changes['offsets'].get(new_path, {})
+            filepath = filepath[:len(filepath) - len(path)] + new_path
+            line_num = get_offseted_line_num(file_offsets, line_num)
+            break
+    return f'{spec}:{filepath}{suffix}:{line_num}'
+
+
+def remap_violations(violations_str: str, changes: dict, old_to_new: dict, by_test: bool = False) -> str:
+    # Remap the locations of a violations_by_location (location=count;...) or violations_by_test (location=tests;...) cell
+    if not violations_str or (not changes['offsets'] and not old_to_new):
+        return violations_str
+    items = VIOLATION_BY_TEST_SEPARATOR.split(violations_str) if by_test else violations_str.split(';')
+    remapped = []
+    for item in items:
+        location, separator, value = item.partition('=')
+        remapped.append(remap_location(location, changes, old_to_new) + separator + value)
+    return ';'.join(remapped)
+
+
+def get_commit_info(repo_path: str, sha: str) -> tuple:
+    # Get the commit timestamp and message (from the commit metadata table, or git log)
+    commit = get_commit(sha)
+    if commit is not None:
+        return commit['timestamp'], commit['message']
+    output = subprocess.run(['git', '-C', repo_path, 'log', '-1', '--format=%at%n%s', sha],
+                            capture_output=True, text=True, check=True).stdout
+    timestamp, _, message = output.partition('\n')
+    return timestamp, message.strip()
+
+
+def synthesize_results(repo_path: str, parent_sha: str, current_sha: str, results_file: str = RESULTS_FILE,
+                       changes: dict = None) -> int:
+    """
+    Append the results of a commit that cannot change them, synthesized from the results of its parent commit.
+
+    Args:
+        repo_path: The path to the repository.
+        parent_sha: The SHA of the parent commit.
+        current_sha: The SHA of the commit.
+        results_file: The path to the continuous_analysis_over_time_results.csv file.
+        changes: The changes between the parent commit and the commit (optional, tracked if not given).
+
+    Returns:
+        The number of synthesized rows (0 if the parent commit has no results).
+    """
+    # The violations columns can be very large
+    csv.field_size_limit(sys.maxsize)
+    with open(results_file, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        parent_rows = [row for row in reader if row['commit_sha'] == parent_sha]
+    if not parent_rows:
+        return 0
+
+    # Only the last run of each algorithm of the parent commit is used
+    parent_rows = list({row['algorithm']: row for row in parent_rows}.values())
+    if changes is None:
+        changes = track_changes(repo_path, parent_sha, current_sha)
+    old_to_new = {old: new for new, old in changes['renames'].items()}
+    commit_timestamp, commit_message = get_commit_info(repo_path, current_sha)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    with open(results_file, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        for row in parent_rows:
+            row = dict(row)
+            row['commit_sha'] = current_sha
+            row['timestamp'] = timestamp
+            row['commit_timestamp'] = commit_timestamp
+            row['commit_message'] = commit_message
+            row['violations_by_location'] = remap_violations(row.get('violations_by_location'), changes, old_to_new)
+            row['violations_by_test'] = remap_violations(row.get('violations_by_test'), changes, old_to_new, by_test=True)
+            if 'synthesized_from' in row:
+                row['synthesized_from'] = parent_sha
+            writer.writerow(row)
+    return len(parent_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Skip the analysis of the commits that cannot change the results.')
+    parser.add_argument('command', choices=['check', 'synthesize'])
+    parser.add_argument('repo_path')
+    parser.add_argument('parent_sha')
+    parser.add_argument('current_sha')
+    parser.add_argument('--results-file', default=RESULTS_FILE)
+    parser.add_argument('--no-filter', action='store_true', help='Do not filter the violations of the synthesized rows.')
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        skip, reason = check_commit(args.repo_path, args.parent_sha, args.current_sha)
+        print(f"{'Skip' if skip else 'Run'} {args.current_sha}: {reason}")
+        return 0 if skip else 1
+
+    changes = track_changes(args.repo_path, args.parent_sha, args.current_sha)
+    num_rows = synthesize_results(args.repo_path, args.parent_sha, args.current_sha, args.results_file, changes)
+    if num_rows == 0:
+        print(f'No results found for the parent commit {args.parent_sha}, the commit must be analyzed')
+        return 1
+    print(f'Synthesized {num_rows} rows of {args.current_sha} from {args.parent_sha}')
+
+    # Filter the violations of the synthesized rows (the filtered row of the commit)
+    if not args.no_filter:
+        import pandas as pd
+        import filter_new_violations
+        try:
+            filter_new_violations.main(args.repo_path, args.current_sha, args.parent_sha,
+                                       df=pd.read_csv(args.results_file), changes=changes)
+        finally:
+            filter_new_violations.profiler.write_report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import os
+import subprocess
+
+import pytest
+
+
+def run_git(repo_dir, *args):
+    # Run a git command in a repository and return its output
+    return subprocess.run(['git', '-C', repo_dir] + list(args), check=True, capture_output=True, text=True).stdout.strip()
+
+
+class GitRepoFactory:
+    """
+    Create the git repositories of a test (with a committer identity) and commit files to them.
+    """
+
+    def __call__(self, repo_dir):
+        os.makedirs(repo_dir, exist_ok=True)
+        run_git(repo_dir, 'init', '-q')
+        run_git(repo_dir, 'config', 'user.email', 'test@example.com')
+        run_git(repo_dir, 'config', 'user.name', 'Test User')
+        return repo_dir
+
+    def commit(self, repo_dir, files, message):
+        """
+        Write files to a repository and commit all its changes.
+
+        Args:
+            repo_dir: The path to the repository.
+            files: A dictionary of the files to write (path relative to the repository -> content, None to remove it).
+            message: The commit message.
+
+        Returns:
+            The SHA of the commit.
+        """
+        for path, content in files.items():
+            filepath = os.path.join(repo_dir, path)
+            if content is None:
+                os.remove(filepath)
+                continue
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            with open(filepath, 'w') as f:
+                f.write(content)
+        run_git(repo_dir, 'add', '-A')
+        run_git(repo_dir, 'commit', '-q', '-m', message)
+        return run_git(repo_dir, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def git():
+    # git(repo_dir, *args) runs a git command and returns its output
+    return run_git
+
+
+@pytest.fixture
+def git_repo():
+    # git_repo(repo_dir) creates a repository, git_repo.commit(repo_dir, files, message) commits files to it
+    return GitRepoFactory()
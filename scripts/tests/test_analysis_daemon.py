@@ -0,0 +1,63 @@
+import sys
+import os
+import socket
+import threading
+
+import pytest
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analysis_daemon import AnalysisCache, AnalysisServer, handle_request
+from analysis_client import send_request
+
+
+def test_unknown_operation():
+    response = handle_request(AnalysisCache(), {'op': 'unknown'})
+    assert response['ok'] is False
+
+
+def test_track_changes_over_socket(tmp_path, git_repo):
+    # Create a repository with two commits
+    repo_dir = git_repo(str(tmp_path / 'repo'))
+    git_repo.commit(repo_dir, {'a.py': 'a = 1\nb = 2\n'}, 'first')
+    git_repo.commit(repo_dir, {'a.py': 'x = 0\na = 1\nb = 2\n'}, 'second')
+
+    # Serve the requests in a thread
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = AnalysisServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        request = {'op': 'track_changes', 'cwd': str(tmp_path), 'repo_path': repo_dir, 'old_sha': 'HEAD~1', 'new_sha': 'HEAD'}
+        for _ in range(2):
+            response = send_request(socket_path, request)
+            assert response['ok'], response
+            assert response['result']['new_file_changes'] == {'a.py': [[1, 1]]}
+        assert len(server.cache.changes) == 1
+        assert send_request(socket_path, {'op': 'ping'})['ok']
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert not os.path.exists(socket_path)
+
+
+def test_stale_and_running_socket(tmp_path):
+    # A socket left by a daemon that did not exit cleanly refuses the connections and is replaced
+    socket_path = str(tmp_path / 'daemon.sock')
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    server = AnalysisServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        # The socket of a running daemon is kept
+        with pytest.raises(OSError):
+            AnalysisServer(socket_path)
+        assert send_request(socket_path, {'op': 'ping'})['ok']
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,40 @@
+import sys
+import os
+
+import pytest
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analysis_scope import format_analysis_scope, get_analysis_scope, get_module_name, in_analysis_scope, parse_analysis_scope
+
+
+SITE_PACKAGES_FILE = '/venv/lib/python3.12/site-packages/requests/adapters.py'
+STDLIB_FILE = '/usr/lib/python3.12/json/__init__.py'
+
+
+def test_get_module_name():
+    assert get_module_name(SITE_PACKAGES_FILE) == 'requests.adapters'
+    assert get_module_name(STDLIB_FILE) == 'json'
+    assert get_module_name('/pkg/module.py') is None
+
+
+def test_in_analysis_scope():
+    assert in_analysis_scope('/pkg/module.py', 'project', [])
+    assert not in_analysis_scope(SITE_PACKAGES_FILE, 'project', [])
+    assert in_analysis_scope(SITE_PACKAGES_FILE, 'allowlist', ['requests'])
+    assert not in_analysis_scope(SITE_PACKAGES_FILE, 'allowlist', ['req'])
+    assert not in_analysis_scope(STDLIB_FILE, 'allowlist', ['requests'])
+    assert in_analysis_scope(STDLIB_FILE, 'all', [])
+
+
+def test_scope_from_environment(monkeypatch):
+    monkeypatch.setenv('ANALYSIS_SCOPE', 'allowlist')
+    monkeypatch.setenv('ANALYSIS_SCOPE_ALLOWLIST', 'requests, numpy.linalg')
+    scope, allowlist = get_analysis_scope()
+    assert format_analysis_scope(scope, allowlist) == 'allowlist:requests,numpy.linalg'
+    assert parse_analysis_scope('allowlist:requests,numpy.linalg') == (scope, allowlist)
+
+    monkeypatch.setenv('ANALYSIS_SCOPE', 'everything')
+    with pytest.raises(ValueError):
+        get_analysis_scope()
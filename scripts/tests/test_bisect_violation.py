@@ -0,0 +1,27 @@
+import sys
+import os
+import argparse
+
+import pytest
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bisect_violation import bisect_violation, get_worktree_env
+
+
+def test_bisect_empty_range(tmp_path, git_repo):
+    repo_dir = git_repo(str(tmp_path / 'repo'))
+    good, bad = [git_repo.commit(repo_dir, {'a.py': f'a = {i}\n'}, f'commit {i}') for i in range(2)]
+
+    # The good commit must be a first-parent ancestor of the bad commit
+    args = argparse.Namespace(tests=['test_a.py::test_a'], results_csv=None, tool='pymop')
+    for good_sha, bad_sha in [(bad, bad), (bad, good)]:
+        with pytest.raises(ValueError):
+            bisect_violation(repo_dir, good_sha, bad_sha, 'Spec:a.py:1', args)
+
+
+def test_worktree_env(tmp_path):
+    os.makedirs(tmp_path / 'src')
+    env = get_worktree_env(str(tmp_path), {'PYTHONPATH': '/other'})
+    assert env['PYTHONPATH'] == os.pathsep.join([str(tmp_path), str(tmp_path / 'src'), '/other'])
@@ -0,0 +1,52 @@
+import sys
+import os
+import io
+import gzip
+
+import pytest
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from capture_output import capture, find_output_file, open_output_file
+from parse_continuous_analysis_output import get_run_time_test_summary_from_files
+
+
+def make_output(num_lines):
+    lines = [f'tests/test_a.py::test_{i} PASSED' for i in range(num_lines)]
+    lines.append('========== 3 failed, 97 passed in 12.34s ==========')
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def test_capture_tail_and_gzip(tmp_path):
+    output = make_output(5000)
+    output_file = str(tmp_path / 'proj_Output.txt')
+    result = capture(io.BytesIO(output), output_file, tail_lines=10, compression='gzip')
+
+    assert result == {'lines': 5001, 'bytes': len(output), 'full_file': output_file + '.gz'}
+    with gzip.open(output_file + '.gz', 'rb') as f:
+        assert f.read() == output
+    with open(output_file) as f:
+        tail = f.read().splitlines()
+    assert tail[0] == '[4991 earlier lines omitted, see proj_Output.txt.gz]'
+    assert tail[1:] == output.decode().splitlines()[-10:]
+
+    # The summary line is read from the tail file, or from the compressed file if there is no tail file
+    _, summary = get_run_time_test_summary_from_files(None, output_file)
+    assert summary == '========== 3 failed, 97 passed in 12.34s =========='
+    os.remove(output_file)
+    assert find_output_file(os.listdir(tmp_path)) == 'proj_Output.txt.gz'
+    assert get_run_time_test_summary_from_files(None, output_file + '.gz')[1] == summary
+
+
+def test_capture_without_compression(tmp_path):
+    output = b'line 1\nline 2 without a newline'
+    output_file = str(tmp_path / 'proj_Output.txt')
+    result = capture(io.BytesIO(output), output_file, tail_lines=1, compression='none')
+
+    assert result['full_file'] is None
+    with open_output_file(output_file) as f:
+        assert f.read() == output.decode()
+    assert find_output_file(['proj_results.txt', 'proj_Output.txt', 'proj_Output.txt.gz']) == 'proj_Output.txt'
+    with pytest.raises(ValueError):
+        capture(io.BytesIO(output), output_file, compression='lz4')
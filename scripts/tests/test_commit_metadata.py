@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from commit_metadata import extract_commit_metadata, write_commit_metadata, get_commit, get_first_parent
+from parse_continuous_analysis_output import get_commit_timestamp_and_message
+
+
+def create_repo(git_repo, repo_dir):
+    git_repo(repo_dir)
+    for i, message in enumerate(['first', 'second, with a comma', 'third "quoted"']):
+        git_repo.commit(repo_dir, {'a.py': f'a = {i}\n'}, message)
+
+
+def test_extract_and_look_up_commits(tmp_path, git, git_repo):
+    repo_dir = str(tmp_path / 'repo')
+    create_repo(git_repo, repo_dir)
+    shas = git(repo_dir, 'rev-list', 'HEAD').split()
+
+    records = extract_commit_metadata(repo_dir)
+    assert [record['sha'] for record in records] == shas
+    assert records[0]['message'] == 'third "quoted"'
+    assert records[0]['author_name'] == 'Test User'
+    assert records[0]['timestamp'] == git(repo_dir, 'log', '-1', '--format=%at', shas[0])
+    assert records[-1]['parents'] == ''
+
+    metadata_file = str(tmp_path / 'commit_metadata.csv')
+    write_commit_metadata(records, metadata_file)
+    assert get_commit(shas[1][:10], metadata_file)['message'] == 'second, with a comma'
+    assert get_first_parent(shas[0], metadata_file) == shas[1]
+    assert get_first_parent(shas[2], metadata_file) is None
+    assert get_commit('0' * 40, metadata_file) is None
+
+
+def test_extract_given_commits_only(tmp_path, git, git_repo):
+    repo_dir = str(tmp_path / 'repo')
+    create_repo(git_repo, repo_dir)
+    shas = git(repo_dir, 'rev-list', 'HEAD').split()
+
+    records = extract_commit_metadata(repo_dir, [shas[2], shas[0]], no_walk=True)
+    assert [record['sha'] for record in records] == [shas[2], shas[0]]
+
+
+def test_extract_all_refs_and_read_commit_info(tmp_path, git, git_repo):
+    repo_dir = str(tmp_path / 'repo')
+    create_repo(git_repo, repo_dir)
+    git(repo_dir, 'checkout', '-q', '-b', 'feature', 'HEAD~1')
+    git(repo_dir, 'commit', '-q', '--allow-empty', '-m', 'feature')
+    feature = git(repo_dir, 'rev-parse', 'HEAD')
+
+    records = extract_commit_metadata(repo_dir, all_refs=True)
+    assert len(records) == 4
+    metadata_file = str(tmp_path / 'commit_metadata.csv')
+    write_commit_metadata(records, metadata_file)
+
+    # run_original.sh only writes the full SHA of a commit in the table
+    commit_info_file = tmp_path / 'proj_commit_info.txt'
+    commit_info_file.write_text(f'Commit SHA:= {feature}\n')
+    assert get_commit_timestamp_and_message(str(commit_info_file), metadata_file) == \
+        (git(repo_dir, 'log', '-1', '--format=%at', feature), 'feature')
+    commit_info_file.write_text(f'Commit SHA:= {"0" * 40}\n')
+    assert get_commit_timestamp_and_message(str(commit_info_file), metadata_file) == (None, None)
@@ -0,0 +1,56 @@
+import sys
+import os
+import csv
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from csv_schema import append_rows, merge_files, reconcile_header
+from parse_continuous_analysis_output import append_to_results_over_time, create_base_data_structure
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        return list(reader)
+
+
+def test_reconcile_header(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    assert reconcile_header(path, ['a', 'b']) == ['a', 'b']
+
+    append_rows(path, ['a', 'b'], [{'a': 1, 'b': 2}])
+    assert reconcile_header(path, ['b']) == ['a', 'b']
+
+    # The new columns are added at the end, the existing rows are padded
+    append_rows(path, ['a', 'c', 'b'], [{'a': 3, 'b': 4, 'c': 5}])
+    assert read_rows(path) == [['a', 'b', 'c'], ['1', '2', ''], ['3', '4', '5']]
+
+
+def test_append_results_to_old_header(tmp_path, monkeypatch):
+    import pandas as pd
+
+    # A results file written before the resource and selection columns were added
+    monkeypatch.chdir(tmp_path)
+    old_columns = ['project', 'timestamp', 'commit_sha', 'algorithm', 'passed', 'events']
+    with open('continuous_analysis_over_time_results.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(old_columns)
+        writer.writerow(['proj', 't0', 'c0', 'pymop', '3', ''])
+
+    line = create_base_data_structure('proj', 'pymop')
+    line['peak_rss_kb'] = 1024
+    append_to_results_over_time([line], 'c1', 't1')
+
+    df = pd.read_csv('continuous_analysis_over_time_results.csv')
+    assert list(df.columns[:len(old_columns)]) == old_columns
+    assert df['commit_sha'].tolist() == ['c0', 'c1']
+    assert pd.isna(df['peak_rss_kb'].iloc[0]) and df['peak_rss_kb'].iloc[1] == 1024
+
+
+def test_merge_files(tmp_path):
+    old_file, new_file, output_file = (str(tmp_path / name) for name in ['old.csv', 'new.csv', 'merged.csv'])
+    append_rows(old_file, ['a', 'b'], [{'a': 1, 'b': 2}])
+    append_rows(new_file, ['a', 'c', 'b'], [{'a': 3, 'b': 4, 'c': 5}])
+    merge_files(output_file, [old_file, new_file, str(tmp_path / 'missing.csv')])
+    assert read_rows(output_file) == [['a', 'b', 'c'], ['1', '2', ''], ['3', '4', '5']]
@@ -0,0 +1,149 @@
+import sys
+import os
+from collections import OrderedDict
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from filter_new_violations import (
+    append_to_violations_filtered_over_time, classify_violations, filter_violations, get_violations_of_commit, get_violations_of_parsed_commit,
+    match_moved_violations, normalize_filepath, parse_violations, violations_to_frame,
+)
+from track_commit_changes import track_changes
+from violation_fingerprints import FingerprintReader
+
+
+NO_CHANGES = {"renames": {}, "offsets": {}, "new_file_changes": {}}
+
+
+def test_parse_violations():
+    violations = ["SpecA:/pkg/a.py:10=2", "SpecB:/lib/python3.12/site-packages/x.py:3=1"]
+    assert parse_violations(violations) == [
+        ("SpecA", "/pkg/a.py", "10"),
+        ("SpecB", "/lib/python3.12/site-packages/x.py", "3"),
+    ]
+
+
+def test_violations_of_parsed_commit_match_the_results():
+    import pandas as pd
+
+    parsed = {'violations': {
+        'original': [],
+        'pymop': [('SpecA', '/pkg/a.py', '10', 2), ('SpecB', '/pkg/b.py', '3', 1)],
+        'dylin': [('SpecC', '/pkg/c.py', '7', 4)],
+    }}
+    df = pd.DataFrame({
+        'commit_sha': ['abc'] * 3,
+        'algorithm': ['original', 'pymop', 'dylin'],
+        'violations_by_location': [None, 'SpecA:/pkg/a.py:10=2;SpecB:/pkg/b.py:3=1', 'SpecC:/pkg/c.py:7=4'],
+    })
+    violations, frame = get_violations_of_parsed_commit(parsed)
+    assert violations == get_violations_of_commit(df, 'abc')
+    assert frame.equals(violations_to_frame(violations))
+
+
+def test_normalize_filepath():
+    assert normalize_filepath("/pkg/a.py") == "pkg/a.py"
+    assert normalize_filepath("/work/proj-pymop/pkg/a.py") == "pkg/a.py"
+    assert normalize_filepath("/work/proj-dylin/pkg/a.py.orig") == "pkg/a.py"
+
+
+def test_unchanged_files():
+    current = [("SpecA", "/pkg/a.py", "10"), ("SpecA", "/pkg/a.py", "20")]
+    parent = [("SpecA", "/pkg/a.py", "10"), ("SpecA", "/pkg/a.py", "30")]
+    new, old = filter_violations(current, parent, NO_CHANGES)
+    assert new == ["SpecA:/pkg/a.py:20"]
+    assert old == ["SpecA:/pkg/a.py:30"]
+
+
+def test_library_violations():
+    current = [("SpecA", "/lib/python3.12/site-packages/x.py", "3")]
+    parent = [("SpecA", "/lib/python3.12/site-packages/x.py", "3")]
+    changes = {"renames": {}, "offsets": {"lib/python3.12/site-packages/x.py": {1: 5}}, "new_file_changes": {}}
+    new, old = filter_violations(current, parent, changes)
+    assert new == []
+    assert old == []
+
+
+def test_changed_file_offsets():
+    # Two lines were added at line 5, so line 10 moved to line 12
+    changes = {"renames": {}, "offsets": {"pkg/a.py": {4: 2}}, "new_file_changes": {"pkg/a.py": [(5, 6)]}}
+    current = [("SpecA", "/pkg/a.py", "12"), ("SpecA", "/pkg/a.py", "6"), ("SpecA", "/pkg/a.py", "3")]
+    parent = [("SpecA", "/pkg/a.py", "10"), ("SpecA", "/pkg/a.py", "3")]
+    new, old = filter_violations(current, parent, changes)
+    assert new == ["SpecA:/pkg/a.py:6"]
+    assert old == []
+
+
+def test_renamed_file():
+    changes = {"renames": {"pkg/b.py": "pkg/a.py"}, "offsets": {"pkg/b.py": {}}, "new_file_changes": {}}
+    current = [("SpecA", "/pkg/b.py", "10"), ("SpecB", "/pkg/b.py", "11")]
+    parent = [("SpecA", "/pkg/a.py", "10"), ("SpecA", "/pkg/a.py", "11")]
+    new, old = filter_violations(current, parent, changes)
+    assert new == ["SpecB:/pkg/b.py:11"]
+    assert old == ["SpecA:/pkg/a.py:11"]
+
+
+def test_changed_file_exact_path():
+    # A changed file only matches the parent violations of the same file (not of files whose path contains it)
+    changes = {"renames": {}, "offsets": {"a.py": {1: 1}}, "new_file_changes": {"a.py": [(1, 1)]}}
+    current = [("SpecA", "/a.py", "11")]
+    parent = [("SpecA", "/pkg/a.py", "10")]
+    new, old = filter_violations(current, parent, changes)
+    assert new == ["SpecA:/a.py:11"]
+    assert old == ["SpecA:/pkg/a.py:10"]
+
+
+def test_duplicate_locations():
+    # Each occurrence of a location matches at most one occurrence in the parent commit
+    current = [("SpecA", "/pkg/a.py", "10"), ("SpecA", "/pkg/a.py", "10"), ("SpecA", "/lib/python3.12/x.py", "1")]
+    parent = [("SpecA", "/pkg/a.py", "10"), ("SpecA", "/lib/python3.12/x.py", "1"), ("SpecA", "/lib/python3.12/x.py", "1")]
+    new, old = filter_violations(current, parent, NO_CHANGES)
+    assert new == ["SpecA:/pkg/a.py:10"]
+    assert old == ["SpecA:/lib/python3.12/x.py:1"]
+
+
+def test_violation_hit_counts():
+    current, parent = classify_violations(["SpecA:/pkg/a.py:10=3", "SpecA:/pkg/a.py:20=5"], ["SpecA:/pkg/a.py:30=7"], NO_CHANGES)
+    assert current.loc[current["new"], "count"].tolist() == [3, 5]
+    assert parent.loc[parent["old"], "count"].tolist() == [7]
+
+
+def test_moved_violations(tmp_path, git_repo):
+    # Move a function to another file and indent another one into a class
+    repo_dir = git_repo(str(tmp_path / 'repo'))
+    parent_sha = git_repo.commit(repo_dir, {
+        'a.py': 'import os\n\ndef moved():\n    x = sorted(os.listdir())\n    return x\n\n'
+                'def indented():\n    y = open("f")\n    return y\n',
+    }, 'first')
+    current_sha = git_repo.commit(repo_dir, {
+        'a.py': 'import os\n\nclass A:\n    def indented(self):\n        y = open("f")\n        return y\n\n'
+                '    def added(self):\n        return open("g")\n',
+        'b.py': 'import os\n\n\ndef moved():\n    x = sorted(os.listdir())\n    return x\n',
+    }, 'second')
+
+    current = ["SpecA:/repo-pymop/b.py:5", "SpecB:/repo-pymop/a.py:5", "SpecB:/repo-pymop/a.py:9"]
+    parent = ["SpecA:/repo-pymop/a.py:4", "SpecB:/repo-pymop/a.py:8", "SpecC:/repo-pymop/a.py:1"]
+    current_frame, parent_frame = classify_violations(current, parent, track_changes(repo_dir, parent_sha, current_sha))
+    assert current_frame['new'].all()
+
+    moved = match_moved_violations(current_frame, parent_frame, FingerprintReader(repo_dir), current_sha, parent_sha)
+    assert moved == 2
+    assert current_frame['new'].tolist() == [False, False, True]
+    assert parent_frame['old'].tolist() == [False, False, True]
+
+
+def test_append_to_old_filtered_header(tmp_path, monkeypatch):
+    import pandas as pd
+
+    # A filtered violations file written before the hit counts were added
+    monkeypatch.chdir(tmp_path)
+    with open('continuous_analysis_over_time_violations_filtered.csv', 'w') as f:
+        f.write('timestamp,current_commit_sha,num_new_violations\nt0,c0,1\n')
+
+    append_to_violations_filtered_over_time(OrderedDict({'timestamp': 't1', 'current_commit_sha': 'c1', 'num_new_violations': 2, 'num_new_violation_hits': 5}))
+
+    df = pd.read_csv('continuous_analysis_over_time_violations_filtered.csv')
+    assert list(df.columns) == ['timestamp', 'current_commit_sha', 'num_new_violations', 'num_new_violation_hits']
+    assert df['current_commit_sha'].tolist() == ['c0', 'c1']
+    assert df['num_new_violation_hits'].iloc[1] == 5
@@ -0,0 +1,37 @@
+import sys
+import os
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from junit_durations import nodeid_to_test_id, read_junit_durations
+
+
+def test_nodeid_to_test_id_function():
+    assert nodeid_to_test_id("tests/test_a.py::test_one") == "tests.test_a::test_one"
+
+
+def test_nodeid_to_test_id_class_with_params():
+    nodeid = "tests/test_a.py::TestB::test_two[a/b::c]"
+    assert nodeid_to_test_id(nodeid) == "tests.test_a.TestB::test_two[a/b::c]"
+
+
+def test_read_junit_durations(tmp_path):
+    junit_file = tmp_path / "junit.xml"
+    junit_file.write_text(
+        """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest">
+<testcase classname="tests.test_a" name="test_one" time="0.5"/>
+<testcase classname="tests.test_a.TestB" name="test_two[1]" time="1.25"/>
+</testsuite></testsuites>
+"""
+    )
+    durations = read_junit_durations(str(junit_file))
+    assert durations == {
+        "tests.test_a::test_one": 0.5,
+        "tests.test_a.TestB::test_two[1]": 1.25,
+    }
+
+
+def test_read_junit_durations_missing_file(tmp_path):
+    assert read_junit_durations(str(tmp_path / "missing.xml")) is None
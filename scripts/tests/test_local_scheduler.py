@@ -0,0 +1,102 @@
+import sys
+import os
+import json
+import signal
+import subprocess
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import local_scheduler
+from local_scheduler import LocalScheduler, get_container_name, get_worker_count, get_project_name, get_repo_url, read_jobs
+
+
+# A job body that records its start and end in the project directory, sleeps for the commits named slow and fails
+# for the commits named bad
+FAKE_JOB = '''
+import os, sys, time
+project_dir, repo_url, commit = sys.argv[1:4]
+os.makedirs(project_dir, exist_ok=True)
+with open(os.path.join(project_dir, 'runs.txt'), 'a') as f:
+    f.write(f"start {commit} {os.environ['JOB_CPUS']}\\n")
+time.sleep(5 if commit == 'slow' else 0.1)
+with open(os.path.join(project_dir, 'runs.txt'), 'a') as f:
+    f.write(f"end {commit}\\n")
+sys.exit(1 if commit == 'bad' else 0)
+'''
+
+
+def test_get_worker_count():
+    assert get_worker_count(2, 4096, cpus=16, memory_mb=10000) == 2
+    assert get_worker_count(2, 4096, cpus=16, memory_mb=10 ** 6) == 8
+    assert get_worker_count(4, 4096, cpus=2, memory_mb=1000) == 1
+
+
+def test_projects():
+    assert get_repo_url('owner/repo') == 'https://github.com/owner/repo.git'
+    assert get_repo_url('git@github.com:owner/repo.git') == 'git@github.com:owner/repo.git'
+    assert get_project_name('https://github.com/owner/repo.git') == 'repo'
+    assert get_project_name('owner/repo') == 'repo'
+
+
+def test_read_jobs(tmp_path):
+    jobs_file = tmp_path / 'jobs.csv'
+    jobs_file.write_text('project,commit,parent,priority\nowner/a,c2,c1,\nowner/b,c1,,5\n,c3,,\n')
+    assert read_jobs(str(jobs_file)) == [
+        {'project': 'owner/a', 'commit': 'c2', 'parent': 'c1', 'priority': 0},
+        {'project': 'owner/b', 'commit': 'c1', 'parent': '', 'priority': 5},
+    ]
+
+
+def test_run_jobs(tmp_path):
+    job_script = tmp_path / 'job.py'
+    job_script.write_text(FAKE_JOB)
+    work_dir = tmp_path / 'work'
+    scheduler = LocalScheduler(str(work_dir), workers=3, job_cpus=1, job_timeout=0.5, retries=1,
+                               command=[sys.executable, str(job_script)])
+    scheduler.submit('owner/a', 'c1')
+    scheduler.submit('owner/a', 'c2', parent='c1')
+    scheduler.submit('owner/b', 'slow', priority=-1)
+    scheduler.submit('owner/c', 'bad')
+    scheduler.submit('owner/b', 'after', parent='slow')
+    jobs = scheduler.run()
+
+    assert [job['state'] for job in jobs] == ['done', 'done', 'timeout', 'failed', 'done']
+
+    # The timed-out job was retried at a lower priority with a longer timeout
+    slow = jobs[2]
+    assert (slow['attempts'], slow['priority'], slow['timeout']) == (2, 99, 1.0)
+    assert os.path.isfile(slow['log'])
+
+    # The later job of its project waited for the retry
+    runs = (work_dir / 'b' / 'runs.txt').read_text().split('\n')
+    assert runs[:3] == ['start slow 1', 'start slow 1', 'start after 1']
+
+    # The jobs of a project ran one at a time, in order
+    runs = (work_dir / 'a' / 'runs.txt').read_text().split('\n')
+    assert runs[:4] == ['start c1 1', 'end c1', 'start c2 1', 'end c2']
+
+    status = json.loads((work_dir / 'scheduler_status.json').read_text())
+    assert status['states'] == {'done': 3, 'timeout': 1, 'failed': 1}
+    assert status['jobs'][3]['exit_code'] == 1
+
+
+def test_kill_removes_the_container(tmp_path, monkeypatch):
+    # A fake docker command that records its arguments
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    docker = bin_dir / 'docker'
+    docker.write_text(f'#!/bin/sh\necho "$@" >> {tmp_path / "docker.txt"}\n')
+    docker.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(local_scheduler, 'KILL_GRACE_PERIOD', 0.2)
+
+    # A job that ignores SIGTERM is killed after the grace period
+    process = subprocess.Popen([sys.executable, '-c', 'import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print(1, flush=True); time.sleep(30)'],
+                               stdout=subprocess.PIPE, start_new_session=True)
+    process.stdout.readline()
+    scheduler = LocalScheduler(str(tmp_path / 'work'), workers=1)
+    scheduler.kill(process, 'ca-a-c1-0-1')
+    assert process.returncode == -signal.SIGKILL
+    assert (tmp_path / 'docker.txt').read_text() == 'rm -f ca-a-c1-0-1\n'
+    assert get_container_name({'name': 'a', 'commit': 'c' * 40, 'id': 3, 'attempts': 2}) == f"ca-a-{'c' * 12}-3-2"
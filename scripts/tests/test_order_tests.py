@@ -0,0 +1,104 @@
+import sys
+import os
+import csv
+import json
+import subprocess
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from order_tests import build_order_data, get_changed_lines, get_changed_tests, order_tests, parse_violations_by_test, read_recent_durations, read_violation_history
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_parse_violations_by_test():
+    value = "Spec_A:src/a.py:10={'tests/test_a.py::test_x', 'tests/test_a.py::test_y[1;2]'};Spec_B:src/b.py:3={'tests/test_a.py::test_x'};Spec_C:src/c.py:4=set()"
+    assert parse_violations_by_test(value) == {'tests/test_a.py::test_x': 2, 'tests/test_a.py::test_y[1;2]': 1}
+    assert parse_violations_by_test('') == {}
+
+
+def test_read_history(tmp_path):
+    history_file = tmp_path / 'results.csv'
+    write_csv(history_file, [
+        {'project': 'proj', 'algorithm': 'pymop', 'commit_sha': 'c1', 'violations_by_test': "S:a.py:1={'t::a'}"},
+        {'project': 'proj', 'algorithm': 'pymop', 'commit_sha': 'c2', 'violations_by_test': "S:a.py:1={'t::b'}"},
+        {'project': 'proj', 'algorithm': 'dylin', 'commit_sha': 'c2', 'violations_by_test': ''},
+    ])
+    assert read_violation_history(str(history_file), 'proj', 'pymop', 'c1') == {'t::a': 1}
+    assert read_violation_history(str(history_file), 'proj', 'pymop', 'unknown') == {'t::b': 1}
+    assert read_violation_history(str(history_file), 'proj', 'dylin') == {}
+
+    durations_file = tmp_path / 'durations.csv'
+    write_csv(durations_file, [
+        {'project': 'proj', 'test_id': 't::a', 'pymop_time': 1.0, 'pymop_overhead': 2.0},
+        {'project': 'proj', 'test_id': 't::a', 'pymop_time': 3.0, 'pymop_overhead': 4.0},
+        {'project': 'proj', 'test_id': 't::b', 'pymop_time': 'x', 'pymop_overhead': 'x'},
+    ])
+    assert read_recent_durations(str(durations_file), 'proj', 'pymop', window=2) == ({'t::a': 2.0}, 3.0)
+
+
+def test_changed_tests(tmp_path, git_repo):
+    repo_dir = git_repo(str(tmp_path / 'proj'))
+    git_repo.commit(repo_dir, {
+        'tests/test_a.py': 'def test_x():\n    assert 1\n\n\nclass TestA:\n    def test_y(self):\n        assert 1\n',
+    }, 'commit 0')
+
+    # The changes are not committed, the tests changed in the working tree are found
+    with open(os.path.join(repo_dir, 'tests', 'test_a.py'), 'w') as f:
+        f.write('def test_x():\n    assert 1\n\n\nclass TestA:\n    def test_y(self):\n        assert 2\n\n    def test_z(self):\n        assert 1\n')
+    changed_lines = get_changed_lines(repo_dir, 'HEAD')
+    assert list(changed_lines) == ['tests/test_a.py']
+    assert get_changed_tests(repo_dir, changed_lines) == ['tests/test_a.py::TestA::test_y', 'tests/test_a.py::TestA::test_z']
+    assert get_changed_lines(repo_dir, 'unknown') is None
+
+
+def test_order_tests():
+    nodeids = ['t.py::slow', 't.py::fast', 't.py::finds[1]', 't.py::finds_slowly', 't.py::changed[2]']
+    data = build_order_data(
+        violations={'t.py::finds[1]': 2, 't.py::finds_slowly': 2},
+        durations={'t::finds_slowly': 40.0},
+        original_durations={'t::slow': 5.0, 't::fast': 0.5, 't::finds[1]': 1.0, 't::finds_slowly': 1.0},
+        overhead=2.0,
+        changed_tests=['t.py::changed'],
+    )
+    assert data['durations'] == {'t::slow': 10.0, 't::fast': 1.0, 't::finds[1]': 2.0, 't::finds_slowly': 40.0}
+    assert [nodeids[index] for index in order_tests(nodeids, data)] == \
+        ['t.py::changed[2]', 't.py::finds[1]', 't.py::finds_slowly', 't.py::fast', 't.py::slow']
+
+
+def test_order_tests_grouped():
+    nodeids = ['a.py::test_1', 'a.py::test_2', 'b.py::TestB::test_1', 'b.py::TestB::test_2[x]', 'b.py::test_3', 'c.py::test_1']
+    data = build_order_data(
+        violations={'a.py::test_2': 1, 'b.py::TestB::test_2[x]': 4, 'b.py::test_3': 1},
+        durations={},
+        original_durations={'a::test_1': 1.0, 'a::test_2': 1.0, 'b::TestB::test_1': 1.0, 'b::TestB::test_2': 1.0,
+                            'b::test_3': 1.0, 'c::test_1': 1.0},
+        overhead=1.0,
+        changed_tests=['c.py::test_1'],
+    )
+    # The tests of a module or class are kept together, the modules and classes are ordered by violations per second
+    assert [nodeids[index] for index in order_tests(nodeids, data)] == \
+        ['c.py::test_1', 'b.py::TestB::test_2[x]', 'b.py::TestB::test_1', 'b.py::test_3', 'a.py::test_2', 'a.py::test_1']
+    assert [nodeids[index] for index in order_tests(nodeids, data, grouped=False)] == \
+        ['c.py::test_1', 'b.py::TestB::test_2[x]', 'a.py::test_2', 'b.py::test_3', 'a.py::test_1', 'b.py::TestB::test_1']
+
+
+def test_plugin_order_and_progress(tmp_path):
+    (tmp_path / 'test_a.py').write_text('def test_a():\n    pass\n\ndef test_b():\n    pass\n\ndef test_c():\n    pass\n')
+    (tmp_path / 'order.json').write_text(json.dumps({'violations': {'test_a.py::test_c': 1}, 'durations': {}, 'changed_tests': ['test_a.py::test_b']}))
+    env = dict(os.environ, PYTHONPATH=SCRIPTS_DIR)
+    result = subprocess.run([sys.executable, '-m', 'pytest', '-v', '-p', 'continuous_analysis_plugin', '-p', 'no:cacheprovider',
+                             '--ca-test-order-file=order.json', '--ca-progress-file=progress.json', 'test_a.py'],
+                            cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout
+    ran = [line.split(' ')[0] for line in result.stdout.splitlines() if ' PASSED' in line]
+    assert ran == ['test_a.py::test_b', 'test_a.py::test_c', 'test_a.py::test_a']
+    assert json.loads((tmp_path / 'progress.json').read_text()) == {'collected': 3, 'completed': 3, 'test_order': 'ordered'}
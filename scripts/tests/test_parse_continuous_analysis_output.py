@@ -0,0 +1,155 @@
+import sys
+import os
+import json
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parse_continuous_analysis_output import apply_analysis_scope, create_base_data_structure, create_spec_costs_lines, get_suite_progress, get_workspace_setup, load_json_tolerant, salvage_truncated_json, salvaged_statistics_files
+
+
+VIOLATIONS = {
+    "SpecA": [
+        {"violation": "file_name: /a.py, line_num: 1", "test": "t1"},
+        {"violation": "file_name: /a.py, line_num: 2", "test": "t2"},
+    ],
+    "SpecB": [
+        {"violation": "file_name: /b.py, line_num: 3", "test": "t3"},
+        {"violation": "file_name: /b.py, line_num: 4", "test": "t4"},
+    ],
+}
+
+
+def test_salvage_complete_document():
+    value, complete = salvage_truncated_json(json.dumps(VIOLATIONS))
+    assert complete
+    assert value == VIOLATIONS
+
+
+def test_salvage_truncated_in_last_record():
+    content = json.dumps(VIOLATIONS)
+    truncated = content[: content.index('"t4"') + 2]
+    value, complete = salvage_truncated_json(truncated)
+    assert not complete
+    assert value["SpecA"] == VIOLATIONS["SpecA"]
+    # The incomplete record of the last spec is dropped
+    assert value["SpecB"] == VIOLATIONS["SpecB"][:1]
+
+
+def test_salvage_truncated_in_key():
+    content = json.dumps(VIOLATIONS)
+    truncated = content[: content.index('"SpecB"') + 4]
+    value, complete = salvage_truncated_json(truncated)
+    assert not complete
+    assert value == {"SpecA": VIOLATIONS["SpecA"]}
+
+
+def test_salvage_nothing_recoverable():
+    assert salvage_truncated_json('{"Spec') == ({}, False)
+    assert salvage_truncated_json("") == (None, False)
+
+
+def test_load_json_tolerant_truncated_file(tmp_path):
+    filename = tmp_path / "D-violations.json"
+    content = json.dumps(VIOLATIONS)
+    filename.write_text(content[: content.index('"SpecB"')])
+    assert load_json_tolerant(str(filename)) == {"SpecA": VIOLATIONS["SpecA"]}
+
+
+def test_load_json_tolerant_records_salvaged_files(tmp_path):
+    complete_file = tmp_path / "D-time.json"
+    complete_file.write_text(json.dumps({"test_duration": 1.0}))
+    truncated_file = tmp_path / "D-violations.json"
+    content = json.dumps(VIOLATIONS)
+    truncated_file.write_text(content[: content.index('"SpecB"')])
+
+    salvaged_statistics_files.clear()
+    load_json_tolerant(str(complete_file))
+    assert not salvaged_statistics_files
+    load_json_tolerant(str(truncated_file))
+    assert salvaged_statistics_files == {str(truncated_file)}
+
+def test_create_spec_costs_lines():
+    original = create_base_data_structure('proj', 'original')
+    original['end_to_end_time'] = '10.0'
+    pymop = create_base_data_structure('proj', 'pymop')
+    pymop.update({
+        'time_create_monitor': 2.0,
+        'test_duration': 16.0,
+        'monitors': 'SpecA=3<>SpecB=1',
+        'events': 'SpecA=e1=10<>SpecA=e2=20<>SpecB=e1=90',
+        'total_violations': 'SpecA=5',
+        'unique_violations': 'SpecA=2',
+        'violations_by_location': {'SpecA:/a.py:1': 3, 'SpecA:/a.py:2': 2},
+    })
+
+    lines = create_spec_costs_lines('proj', [original, pymop])
+    assert [line['spec'] for line in lines] == ['SpecA', 'SpecB']
+    spec_a, spec_b = lines
+    assert (spec_a['monitors'], spec_a['events'], spec_a['violations'], spec_a['violation_locations']) == (3, 30, 5, 2)
+    assert spec_a['estimated_monitor_time'] == 1.5
+    assert spec_a['estimated_event_time'] == 1.5
+    assert spec_b['estimated_time'] == 0.5 + 4.5
+
+
+def test_create_spec_costs_lines_without_times():
+    pymop = create_base_data_structure('proj', 'pymop')
+    pymop['monitors'] = 'SpecA=1'
+    lines = create_spec_costs_lines('proj', [pymop])
+    assert lines[0]['estimated_time'] == 'x'
+
+
+def test_apply_analysis_scope(tmp_path):
+    result_file = tmp_path / 'proj_results.txt'
+    result_file.write_text('Test Time: 1.0s\nAnalysis Scope: project\n')
+    line = create_base_data_structure('proj', 'pymop')
+    line['violations_by_location'] = {'SpecA:/a.py:1': 2, 'SpecA:/lib/python3.12/site-packages/x.py:3': 5}
+    line['violations_by_test'] = {'SpecA:/a.py:1': {'t1'}, 'SpecA:/lib/python3.12/site-packages/x.py:3': {'t2'}}
+
+    apply_analysis_scope(str(result_file), line)
+    assert line['analysis_scope'] == 'project'
+    assert line['violations_by_location'] == {'SpecA:/a.py:1': 2}
+    assert list(line['violations_by_test']) == ['SpecA:/a.py:1']
+    assert line['out_of_scope_violations'] == 5
+
+    # The per-spec counts only have the violations in the scope
+    line = create_base_data_structure('proj', 'pymop')
+    line.update({'total_violations': 'SpecA=7;SpecB=1', 'total_violations_count': 8,
+                 'unique_violations': 'SpecA=3;SpecB=1', 'unique_violations_count': 4})
+    line['violations_by_location'] = {'SpecA:/a.py:1': 2, 'SpecA:/lib/python3.12/site-packages/x.py:3': 5,
+                                      'SpecB:/lib/python3.12/site-packages/y.py:4': 1}
+    apply_analysis_scope(str(result_file), line, {'SpecA:/lib/python3.12/site-packages/x.py:3': 2})
+    assert line['total_violations'] == 'SpecA=2'
+    assert line['total_violations_count'] == 2
+    assert line['unique_violations'] == 'SpecA=1'
+    assert line['unique_violations_count'] == 1
+    assert line['out_of_scope_violations'] == 6
+
+    # Older runs did not record a scope, all the violations are kept
+    line = create_base_data_structure('proj', 'pymop')
+    line['violations_by_location'] = {'SpecA:/lib/python3.12/site-packages/x.py:3': 5}
+    apply_analysis_scope(None, line)
+    assert line['analysis_scope'] == 'all'
+    assert line['out_of_scope_violations'] == 0
+
+
+def test_get_workspace_setup(tmp_path):
+    lines = [create_base_data_structure('proj', algorithm) for algorithm in ['original', 'pymop', 'dylin']]
+    get_workspace_setup(str(tmp_path / 'missing.json'), lines)
+    assert lines[0]['workspace_method'] == ''
+
+    workspace_file = tmp_path / 'proj_workspace.json'
+    workspace_file.write_text(json.dumps({'method': 'clone', 'setup_time': 0.6, 'copies': {'original': 0.1, 'pymop': 0.2, 'dylin': 0.3}}))
+    get_workspace_setup(str(workspace_file), lines)
+    assert [(line['workspace_method'], line['workspace_setup_time']) for line in lines] == [('clone', 0.1), ('clone', 0.2), ('clone', 0.3)]
+
+
+def test_get_suite_progress(tmp_path):
+    line = create_base_data_structure('proj', 'pymop')
+    get_suite_progress([], line)
+    assert line['suite_completion'] == ''
+
+    progress_file = tmp_path / 'proj_progress.json'
+    progress_file.write_text(json.dumps({'collected': 8, 'completed': 6, 'test_order': 'ordered'}))
+    get_suite_progress([str(progress_file)], line)
+    assert (line['test_order'], line['tests_collected'], line['tests_completed'], line['suite_completion']) == ('ordered', 8, 6, 0.75)
@@ -0,0 +1,38 @@
+import sys
+import os
+import json
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pipeline_profiler
+from pipeline_profiler import get_profiler
+
+
+def test_profilers_share_the_process_cprofile(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('CA_PROFILE', 'cprofile')
+    monkeypatch.setattr(pipeline_profiler, '_process_cprofile', None)
+
+    # Creating the profilers (when the scripts are imported) enables nothing
+    parse_profiler = get_profiler('parse')
+    filter_profiler = get_profiler('filter')
+    assert pipeline_profiler._process_cprofile is None
+
+    # The scripts run in one process (e.g. run_pipeline.py)
+    try:
+        parse_profiler.start()
+        with parse_profiler.stage('parse'):
+            sum(range(1000))
+        filter_profiler.start()
+        filter_profiler.count('violations', 3)
+        assert parse_profiler.cprofile is filter_profiler.cprofile
+        parse_profiler.write_report()
+        filter_profiler.write_report()
+    finally:
+        pipeline_profiler._process_cprofile.disable()
+
+    reports = [json.loads(line) for line in (tmp_path / 'continuous_analysis_timing_report.jsonl').read_text().splitlines()]
+    assert [report['script'] for report in reports] == ['parse', 'filter']
+    assert reports[0]['stages']['parse']['calls'] == 1 and reports[1]['counters'] == {'violations': 3}
+    assert all(os.path.isfile(report['cprofile_file']) for report in reports)
@@ -0,0 +1,31 @@
+import sys
+import os
+import math
+
+import pandas as pd
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from report_spec_costs import rank_spec_costs
+
+
+def test_rank_spec_costs():
+    spec_costs = pd.DataFrame([
+        {'project': 'p', 'timestamp': '1', 'spec': 'A', 'monitors': 1, 'events': 10, 'violations': 4,
+         'violation_locations': 2, 'estimated_monitor_time': 1.0, 'estimated_event_time': 3.0, 'estimated_time': 4.0},
+        {'project': 'p', 'timestamp': '1', 'spec': 'B', 'monitors': 1, 'events': 10, 'violations': 0,
+         'violation_locations': 0, 'estimated_monitor_time': 0.5, 'estimated_event_time': 0.5, 'estimated_time': 1.0},
+        {'project': 'p', 'timestamp': '2', 'spec': 'A', 'monitors': 1, 'events': 10, 'violations': 4,
+         'violation_locations': 2, 'estimated_monitor_time': 'x', 'estimated_event_time': 'x', 'estimated_time': 'x'},
+        {'project': 'p', 'timestamp': '2', 'spec': 'C', 'monitors': 1, 'events': 10, 'violations': 1,
+         'violation_locations': 1, 'estimated_monitor_time': 1.0, 'estimated_event_time': 4.0, 'estimated_time': 5.0},
+    ])
+
+    report = rank_spec_costs(spec_costs)
+    assert report['spec'].tolist() == ['B', 'C', 'A']
+    assert math.isinf(report.loc[0, 'time_per_violation'])
+    assert report.loc[2, 'time_per_violation'] == 1.0
+    assert report.loc[2, 'commits'] == 2
+
+    assert rank_spec_costs(spec_costs, last=1)['spec'].tolist() == ['C', 'A']
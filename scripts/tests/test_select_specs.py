@@ -0,0 +1,68 @@
+import sys
+import os
+import csv
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from select_specs import read_history, select_specs, create_specs_dir
+
+
+SPECS = ['Noisy', 'Quiet', 'Useful']
+
+
+def write_history(history_file, selections):
+    with open(history_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['project', 'algorithm', 'events', 'unique_violations', 'spec_selection', 'selected_specs'])
+        writer.writeheader()
+        writer.writerow({'project': 'proj', 'algorithm': 'original'})
+        writer.writerow({'project': 'other', 'algorithm': 'pymop', 'events': 'Useful=e=1'})
+        for selection in selections:
+            writer.writerow({
+                'project': 'proj', 'algorithm': 'pymop',
+                'events': 'Noisy=e1=30000<>Noisy=e2=5000<>Quiet=e=10<>Useful=e=50000',
+                'unique_violations': 'Useful=1',
+                'spec_selection': selection,
+                'selected_specs': 'Quiet;Useful' if selection == 'selected' else '',
+            })
+
+
+def test_drop_noisy_specs_without_violations(tmp_path):
+    history_file = str(tmp_path / 'results.csv')
+    write_history(history_file, ['full'] * 3)
+    runs = read_history(history_file, 'proj')
+    assert len(runs) == 3
+    assert runs[0]['events']['Noisy'] == 35000
+
+    selection = select_specs(runs, SPECS, window=3, full_every=5, min_events=10000)
+    assert selection['spec_selection'] == 'selected'
+    assert selection['dropped_specs'] == ['Noisy']
+    assert selection['selected_specs'] == ['Quiet', 'Useful']
+    assert selection['estimated_saved_events'] == 35000
+
+    # Not enough runs to drop a spec
+    assert select_specs(runs, SPECS, window=4)['spec_selection'] == 'full'
+
+
+def test_full_run_every_k_runs(tmp_path):
+    history_file = str(tmp_path / 'results.csv')
+    write_history(history_file, ['full'] * 3 + ['selected'] * 3)
+    runs = read_history(history_file, 'proj')
+    assert runs[-1]['monitored'] == {'Quiet', 'Useful'}
+
+    assert select_specs(runs, SPECS, window=3, full_every=4, min_events=10000)['spec_selection'] == 'full'
+    assert select_specs(runs, SPECS, window=3, full_every=5, min_events=10000)['spec_selection'] == 'selected'
+    assert select_specs([], SPECS)['spec_selection'] == 'full'
+
+
+def test_create_specs_dir(tmp_path):
+    specs_dir = tmp_path / 'specs'
+    specs_dir.mkdir()
+    for name in ['__init__.py', 'Noisy.py', 'Quiet.py']:
+        (specs_dir / name).write_text('')
+    output_dir = str(tmp_path / 'selected')
+
+    create_specs_dir(str(specs_dir), output_dir, ['Noisy'])
+    create_specs_dir(str(specs_dir), output_dir, ['Noisy'])
+    assert sorted(os.listdir(output_dir)) == ['Quiet.py', '__init__.py']
+    assert os.path.islink(os.path.join(output_dir, 'Quiet.py'))
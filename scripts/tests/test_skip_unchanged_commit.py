@@ -0,0 +1,94 @@
+import sys
+import os
+import csv
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from skip_unchanged_commit import check_commit, remap_violations, synthesize_results
+
+
+FIELDNAMES = ['project', 'algorithm', 'violations_by_location', 'violations_by_test', 'commit_sha', 'timestamp',
+              'commit_timestamp', 'commit_message', 'synthesized_from']
+
+
+def create_repo(git_repo, repo_dir):
+    git_repo(repo_dir)
+    return git_repo.commit(repo_dir, {
+        'pkg/a.py': ''.join(f'a{i} = {i}\n' for i in range(10)),
+        'docs/conf.py': 'project = "proj"\n',
+        'requirements.txt': 'requests\n',
+        'README.md': 'proj\n',
+    }, 'first')
+
+
+def test_check_commit(tmp_path, git_repo):
+    repo_dir = str(tmp_path / 'repo')
+    first = create_repo(git_repo, repo_dir)
+
+    # Documentation, assets and the ignored Python files cannot change the results
+    docs = git_repo.commit(repo_dir, {'README.md': 'proj!\n', 'docs/conf.py': 'project = "proj!"\n'}, 'docs')
+    assert check_commit(repo_dir, first, docs)[0]
+
+    requirements = git_repo.commit(repo_dir, {'requirements.txt': 'requests>=2\n'}, 'requirements')
+    assert check_commit(repo_dir, docs, requirements) == (False, 'the dependency files changed')
+
+    python = git_repo.commit(repo_dir, {'pkg/b.py': 'b = 1\n'}, 'python')
+    assert not check_commit(repo_dir, requirements, python)[0]
+
+    deleted = git_repo.commit(repo_dir, {'pkg/b.py': None}, 'deleted')
+    assert not check_commit(repo_dir, python, deleted)[0]
+
+
+def test_remap_violations():
+    changes = {'renames': {'pkg/b.py': 'pkg/a.py'}, 'offsets': {'pkg/b.py': {3: 2}, 'docs/conf.py': {1: 1}}, 'new_file_changes': {}}
+    old_to_new = {'pkg/a.py': 'pkg/b.py'}
+    violations = 'Spec:/work/proj-pymop/pkg/a.py:2=1;Spec:/work/proj-pymop/pkg/a.py:5=3;Spec:/lib/python3.12/x.py:5=1'
+    assert remap_violations(violations, changes, old_to_new) == \
+        'Spec:/work/proj-pymop/pkg/b.py:2=1;Spec:/work/proj-pymop/pkg/b.py:7=3;Spec:/lib/python3.12/x.py:5=1'
+    assert remap_violations('Spec:/work/proj-dylin/docs/conf.py.orig:4=t1;t2', changes, old_to_new, by_test=True) == \
+        'Spec:/work/proj-dylin/docs/conf.py.orig:5=t1;t2'
+
+
+def test_synthesize_results(tmp_path, git, git_repo):
+    repo_dir = str(tmp_path / 'repo')
+    first = create_repo(git_repo, repo_dir)
+    docs = git_repo.commit(repo_dir, {'docs/conf.py': '# Docs\nproject = "proj"\n'}, 'docs')
+
+    results_file = str(tmp_path / 'results.csv')
+    with open(results_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for algorithm in ['original', 'pymop']:
+            writer.writerow({
+                'project': 'proj', 'algorithm': algorithm, 'commit_sha': first, 'timestamp': '1',
+                'violations_by_location': 'Spec:/work/proj-pymop/docs/conf.py:1=2' if algorithm == 'pymop' else '',
+                'violations_by_test': 'Spec:/work/proj-pymop/docs/conf.py:1=test_a;test_b' if algorithm == 'pymop' else '',
+            })
+
+    assert synthesize_results(repo_dir, docs, docs, results_file) == 0
+    assert synthesize_results(repo_dir, first, docs, results_file) == 2
+    with open(results_file, newline='') as f:
+        rows = [row for row in csv.DictReader(f) if row['commit_sha'] == docs]
+    assert [row['algorithm'] for row in rows] == ['original', 'pymop']
+    assert rows[1]['synthesized_from'] == first
+    assert rows[1]['commit_message'] == 'docs'
+    assert rows[1]['commit_timestamp'] == git(repo_dir, 'log', '-1', '--format=%at', docs)
+    assert rows[1]['violations_by_location'] == 'Spec:/work/proj-pymop/docs/conf.py:2=2'
+    assert rows[1]['violations_by_test'] == 'Spec:/work/proj-pymop/docs/conf.py:2=test_a;test_b'
+
+
+def test_check_commit_submodule(tmp_path, git, git_repo):
+    repo_dir = str(tmp_path / 'repo')
+    first = create_repo(git_repo, repo_dir)
+
+    # A submodule (gitlink) moved to another commit must be analyzed, even without a .gitmodules change
+    git(repo_dir, 'update-index', '--add', '--cacheinfo', f'160000,{first},vendor/lib')
+    git(repo_dir, 'commit', '-q', '-m', 'submodule')
+    submodule = git(repo_dir, 'rev-parse', 'HEAD')
+    assert not check_commit(repo_dir, first, submodule)[0]
+
+    git(repo_dir, 'update-index', '--cacheinfo', f'160000,{submodule},vendor/lib')
+    git(repo_dir, 'commit', '-q', '-m', 'bump')
+    bump = git(repo_dir, 'rev-parse', 'HEAD')
+    assert check_commit(repo_dir, submodule, bump) == (False, '1 submodules changed (e.g. vendor/lib)')
@@ -4,7 +4,7 @@ import os
 # Add the parent directory to the sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from track_commit_changes import process_patch_data
+from track_commit_changes import process_patch_data, get_offseted_line_num, get_original_line_num, track_changes
 from unidiff import PatchSet
 
 
@@ -87,7 +87,7 @@ index 5555555..6666666 100644
 """
     patch = PatchSet(diff)
     result = process_patch_data(patch)
-    assert result["offsets"]["c.py"] == {2: 2, 3: 2, 10: 4}
+    assert result["offsets"]["c.py"] == {3: 2, 11: 4}
 
 
 def test_multiple_files_multiple_hunks():
@@ -117,5 +117,52 @@ index 1111111..2222222 100644
 """
     patch = PatchSet(diff)
     result = process_patch_data(patch)
-    assert result["offsets"]["a.py"] == {0: 2, 3: 2}
-    assert result["offsets"]["d.py"] == {0: 2, 5: 0}
+    assert result["offsets"]["a.py"] == {1: 2, 3: 2}
+    assert result["offsets"]["d.py"] == {1: 2, 5: 0}
+
+
+def test_offseted_and_original_line_num():
+    diff = """diff --git a/c.py b/c.py
+index 5555555..6666666 100644
+--- a/c.py
++++ b/c.py
+@@ -2,0 +3,2 @@
++new line 1
++new line 2
+@@ -10,2 +12,0 @@
+-old line 10
+-old line 11
+"""
+    patch = PatchSet(diff)
+    file_offsets = process_patch_data(patch)["offsets"]["c.py"]
+    assert file_offsets == {3: 2, 10: 0}
+    assert [get_offseted_line_num(file_offsets, n) for n in [1, 2, 3, 9, 12]] == [1, 2, 5, 11, 12]
+    assert [get_original_line_num(file_offsets, n) for n in [1, 2, 5, 11, 12]] == [1, 2, 3, 9, 12]
+    # The inserted lines do not exist in the old file
+    assert [get_original_line_num(file_offsets, n) for n in [3, 4]] == [None, None]
+
+
+def test_batch_backend_matches_diff_backend(tmp_path, git_repo):
+    # Create a repository with a commit that modifies, renames, adds and deletes files
+    repo_dir = git_repo(str(tmp_path / 'repo'))
+    body = ''.join(f'def f{i}():\n    return {i}\n\n' for i in range(20))
+    git_repo.commit(repo_dir, {
+        'pkg/a.py': body,
+        'pkg/old_name.py': 'import os\n' + body,
+        'deleted.py': 'x = 1\n',
+        'notes.txt': 'text\n',
+    }, 'first')
+    lines = body.splitlines(keepends=True)
+    git_repo.commit(repo_dir, {
+        'deleted.py': None,
+        'pkg/old_name.py': None,
+        'pkg/a.py': ''.join(['import sys\n'] + lines[:10] + ['    pass\n'] + lines[14:50] + ['def g():\n    return 0\n'] + lines[50:]),
+        'pkg/new_name.py': 'import os\n' + ''.join(lines[3:]),
+        'added.py': 'y = 2\n',
+        'notes.txt': 'more text\n',
+    }, 'second')
+
+    diff_changes = track_changes(repo_dir, 'HEAD~1', 'HEAD', backend='diff')
+    batch_changes = track_changes(repo_dir, 'HEAD~1', 'HEAD', backend='batch')
+    assert batch_changes['renames'] == {'pkg/new_name.py': 'pkg/old_name.py'}
+    assert batch_changes == diff_changes
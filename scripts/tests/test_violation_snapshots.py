@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from filter_new_violations import violations_to_frame
+from violation_snapshots import ViolationSnapshots, diff_records, apply_delta
+
+
+def frame(*violations):
+    return violations_to_frame(list(violations))
+
+
+def as_set(violations_frame):
+    return sorted(violations_frame.itertuples(index=False, name=None))
+
+
+def test_round_trip_with_duplicates(tmp_path):
+    snapshots = ViolationSnapshots(str(tmp_path / 'snapshots'))
+    violations = frame('SpecB:/pkg/b.py:3=1', 'SpecA:/pkg/a.py:10=2', 'SpecA:/pkg/a.py:10=2', 'SpecA:/lib/python3.12/x.py:1')
+
+    assert snapshots.write('c1', violations) == 'full'
+    assert snapshots.write('c1', frame('SpecC:/c.py:1=1')) is None
+
+    loaded = ViolationSnapshots(str(tmp_path / 'snapshots')).load('c1')
+    assert as_set(loaded) == as_set(violations)
+    # The violations are sorted by the ids of their spec and file (in the order they were first stored) and line
+    assert loaded['spec'].tolist() == ['SpecB', 'SpecA', 'SpecA', 'SpecA']
+    assert loaded['filepath'].tolist()[1:] == ['/pkg/a.py', '/pkg/a.py', '/lib/python3.12/x.py']
+    assert ViolationSnapshots(str(tmp_path / 'snapshots')).load('c2') is None
+
+
+def test_delta_chain(tmp_path):
+    snapshots = ViolationSnapshots(str(tmp_path / 'snapshots'), full_every=3)
+    history = [
+        frame('SpecA:/a.py:1=1', 'SpecA:/a.py:2=1'),
+        frame('SpecA:/a.py:1=1', 'SpecA:/a.py:2=3', 'SpecB:/b.py:5=1'),
+        frame('SpecB:/b.py:5=1', 'SpecB:/b.py:5=1'),
+        frame(),
+        frame('SpecA:/a.py:1=1'),
+    ]
+    kinds = []
+    for i, violations in enumerate(history):
+        kinds.append(snapshots.write(f'{i:040d}', violations, f'{i - 1:040d}' if i else None))
+    assert kinds == ['full', 'delta', 'delta', 'full', 'delta']
+
+    snapshots = ViolationSnapshots(str(tmp_path / 'snapshots'))
+    for i, violations in enumerate(history):
+        assert as_set(snapshots.load(f'{i:040d}')) == as_set(violations)
+
+    # The snapshots can be found by an abbreviated SHA
+    assert snapshots.find('0' * 39 + '1') == '0' * 39 + '1'
+    assert snapshots.find('0' * 10) is None
+
+
+def test_diff_and_apply_records(tmp_path):
+    snapshots = ViolationSnapshots(str(tmp_path / 'snapshots'))
+    old = snapshots.encode(frame('SpecA:/a.py:1=1', 'SpecA:/a.py:1=1', 'SpecA:/a.py:2=1'))
+    new = snapshots.encode(frame('SpecA:/a.py:1=1', 'SpecA:/a.py:3=1'))
+
+    removed, added = diff_records(old, new)
+    assert len(removed) == 2 and len(added) == 1
+    assert (apply_delta(old, removed, added) == new).all()
@@ -0,0 +1,72 @@
+import sys
+import os
+import subprocess
+
+import pytest
+
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from workspace_manager import create_workspaces, remove_workspaces, resolve_method
+
+
+def create_repo(git_repo, repo_dir):
+    git_repo(repo_dir)
+    return [git_repo.commit(repo_dir, {'a.py': f'a = {i}\n'}, f'commit {i}') for i in range(2)]
+
+
+@pytest.mark.parametrize('method', ['clone', 'worktree', 'copy', 'auto'])
+def test_create_and_remove_workspaces(tmp_path, method, git, git_repo):
+    repo_dir = str(tmp_path / 'proj')
+    shas = create_repo(git_repo, repo_dir)
+
+    # The copy methods copy the checked out commit
+    commit = shas[0] if method in ('clone', 'worktree') else None
+    timing = create_workspaces(repo_dir, method=method, commit=commit)
+    assert timing['method'] in ('clone', 'reflink') if method == 'auto' else timing['method'] == method
+    assert sorted(timing['copies']) == ['dylin', 'original', 'pymop']
+    for copy in ['original', 'pymop', 'dylin']:
+        assert git(f'{repo_dir}-{copy}', 'rev-parse', 'HEAD') == (commit or shas[1])
+        with open(os.path.join(f'{repo_dir}-{copy}', 'a.py')) as f:
+            assert f.read() == ('a = 0\n' if commit else 'a = 1\n')
+
+    # A run can remove its working tree (the PyMOP run does), the worktree metadata is pruned
+    if method == 'worktree':
+        subprocess.run(['rm', '-rf', f'{repo_dir}-pymop'], check=True)
+    remove_workspaces(repo_dir)
+    assert sorted(os.listdir(tmp_path)) == ['proj']
+    assert len(git(repo_dir, 'worktree', 'list').splitlines()) == 1
+
+
+def test_bare_repository(tmp_path, git, git_repo):
+    repo_dir = str(tmp_path / 'proj')
+    shas = create_repo(git_repo, repo_dir)
+    mirror = str(tmp_path / 'mirror')
+    subprocess.run(['git', 'clone', '-q', '--bare', repo_dir, mirror], check=True)
+
+    assert resolve_method(mirror, 'auto') == 'clone'
+    with pytest.raises(ValueError):
+        resolve_method(mirror, 'copy')
+
+    create_workspaces(mirror, prefix=str(tmp_path / 'work' / 'proj'), copies=['original'], commit=shas[0])
+    assert git(str(tmp_path / 'work' / 'proj-original'), 'rev-parse', 'HEAD') == shas[0]
+
+
+def test_clone_relative_submodules(tmp_path, git, git_repo):
+    # A remote with a submodule at a relative URL (../sub.git)
+    sub_dir = str(tmp_path / 'sub')
+    create_repo(git_repo, sub_dir)
+    subprocess.run(['git', 'clone', '-q', '--bare', sub_dir, str(tmp_path / 'remote' / 'sub.git')], check=True)
+    repo_dir = str(tmp_path / 'remote' / 'proj')
+    create_repo(git_repo, repo_dir)
+    git(repo_dir, '-c', 'protocol.file.allow=always', 'submodule', 'add', '-q', '../sub.git', 'sub')
+    git(repo_dir, 'commit', '-q', '-m', 'add submodule')
+    subprocess.run(['git', 'clone', '-q', '--bare', repo_dir, str(tmp_path / 'remote' / 'proj.git')], check=True)
+
+    checkout = str(tmp_path / 'work' / 'proj')
+    subprocess.run(['git', 'clone', '-q', str(tmp_path / 'remote' / 'proj.git'), checkout], check=True)
+    create_workspaces(checkout, copies=['original'], method='clone')
+    workspace = f'{checkout}-original'
+    assert git(workspace, 'remote', 'get-url', 'origin') == str(tmp_path / 'remote' / 'proj.git')
+    git(workspace, '-c', 'protocol.file.allow=always', 'submodule', 'update', '-q', '--init')
+    assert os.path.isfile(os.path.join(workspace, 'sub', 'a.py'))
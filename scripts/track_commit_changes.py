@@ -1,8 +1,15 @@
-from git import Repo
-from unidiff import PatchSet
+from __future__ import annotations
 
+import os
 import sys
+from bisect import bisect_right
 from collections import defaultdict
+from typing import TYPE_CHECKING
+
+# GitPython and unidiff are slow to import, they are only imported when the changes are tracked
+if TYPE_CHECKING:
+    from git import Repo
+    from unidiff import PatchSet
 
 
 """
@@ -16,10 +23,19 @@ The line number offsets can be used to get the line number of the new file from
 - line_number_new = line_number_old - offset
 
 The new file changes can be filtered out the violations that are from the changed code which should always be considered as new violations.
+
+Two backends are available (the backend argument, or the TRACK_CHANGES_BACKEND environment variable):
+- diff (default): git diff --unified=0 --find-renames through GitPython, parsed with unidiff
+- batch: the trees and blobs are read through a long-lived git cat-file --batch process and the Python files are
+  compared in process (see git_batch_diff.py), so replaying many commits does not start a git process per commit
 """
 
 
-def track_changes(repo_path: str, old_sha: str, new_sha: str) -> dict:
+# The backend used to track the changes when none is given
+DEFAULT_BACKEND = os.environ.get('TRACK_CHANGES_BACKEND', 'diff')
+
+
+def track_changes(repo_path: str, old_sha: str, new_sha: str, repo: Repo = None, backend: str = None) -> dict:
     """
     Track the changes between two commits in a repository.
 
@@ -27,12 +43,25 @@ def track_changes(repo_path: str, old_sha: str, new_sha: str) -> dict:
         repo_path: The path to the repository.
         old_sha: The SHA of the old commit.
         new_sha: The SHA of the new commit.
+        repo: An already opened Repo of repo_path (optional, opened if not given, diff backend only).
+        backend: The backend used to track the changes (diff or batch, DEFAULT_BACKEND if not given).
 
     Returns:
         A dictionary containing the changes between the two commits.
     """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'batch':
+        from git_batch_diff import track_changes_batch
+        return track_changes_batch(repo_path, old_sha, new_sha)
+    if backend != 'diff':
+        raise ValueError(f"Unknown track_changes backend: {backend}")
+
+    from git import Repo
+    from unidiff import PatchSet
+
     # Get the repository and the diff between the two commits
-    repo = Repo(repo_path)
+    if repo is None:
+        repo = Repo(repo_path)
     diff_str = repo.git.diff(old_sha, new_sha, unified=0, find_renames=True)
     patch = PatchSet(diff_str)
 
@@ -132,7 +161,9 @@ def process_patch_data(patch: PatchSet) -> dict:
 
             # Store cumulative offset at the starting line of the hunk
             # This can be used easily to get the line number of the new file from the old file
-            file_offsets[hunk.source_start] = cumulative_offset
+            # An insertion-only hunk (@@ -2,0 +3,2 @@) starts after its source line, so the line itself is unchanged
+            hunk_start = hunk.source_start + 1 if hunk.source_length == 0 else hunk.source_start
+            file_offsets[hunk_start] = cumulative_offset
 
     # Format the changes into a comprehensive result structure
     detailed_changes = {
@@ -145,6 +176,46 @@ def process_patch_data(patch: PatchSet) -> dict:
     return detailed_changes
 
 
+def get_offseted_line_num(file_offsets: dict, line_num: int) -> int:
+    """
+    Get the line number in the new file of a line in the old file.
+
+    Args:
+        file_offsets: The line number offsets of the file (old hunk start line -> cumulative offset).
+        line_num: The line number in the old file.
+
+    Returns:
+        The line number in the new file.
+    """
+    # Find the last hunk that starts at or before the line and apply its cumulative offset
+    sorted_start_lines = sorted(file_offsets.keys())
+    index = bisect_right(sorted_start_lines, line_num)
+    if index == 0:
+        return line_num
+    return line_num + file_offsets[sorted_start_lines[index - 1]]
+
+
+def get_original_line_num(file_offsets: dict, line_num: int) -> int:
+    """
+    Get the line number in the old file of a line in the new file (the inverse of get_offseted_line_num).
+
+    Args:
+        file_offsets: The line number offsets of the file (old hunk start line -> cumulative offset).
+        line_num: The line number in the new file.
+
+    Returns:
+        The line number in the old file, or None if the line does not exist in the old file.
+    """
+    # The old line number is the new line number minus one of the cumulative offsets (or no offset)
+    # Removed lines are mapped onto the lines that follow them, so the smallest candidate is the line that remained
+    candidates = []
+    for offset in set([0] + list(file_offsets.values())):
+        candidate = line_num - offset
+        if candidate > 0 and get_offseted_line_num(file_offsets, candidate) == line_num:
+            candidates.append(candidate)
+    return min(candidates) if candidates else None
+
+
 # # ================================
 # # Main function
 # # ================================
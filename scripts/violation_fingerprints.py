@@ -0,0 +1,85 @@
+import hashlib
+from git_batch_diff import get_reader
+
+
+"""
+This script is used to fingerprint the source lines of the violation locations, so the violations of code that was
+moved (within a file or to another file) can be matched between two commits when the line offsets cannot.
+It should return the following information for a violation location (file and line number at a commit):
+- The context fingerprint: a hash of the normalized line and the normalized lines around it
+- The line fingerprint: the normalized line
+
+The lines are normalized by collapsing their whitespace, so re-indented code (e.g. a function moved into a class)
+has the same fingerprints. The files are read through the git cat-file --batch reader of the repository
+(see git_batch_diff.py) and each file is only read and normalized once.
+"""
+
+
+# The number of lines before and after the violation line in the context fingerprint
+CONTEXT_LINES = 2
+
+
+def normalize_line(line: bytes) -> bytes:
+    """
+    Normalize a source line (collapse its whitespace).
+
+    Args:
+        line: The source line.
+
+    Returns:
+        The normalized line.
+    """
+    return b' '.join(line.split())
+
+
+class FingerprintReader:
+    """
+    Read the fingerprints of the violation locations of the commits of a repository.
+    """
+
+    def __init__(self, repo_path):
+        self.reader = get_reader(repo_path)
+        # The normalized lines of the files ((sha, path) -> list of lines, or None if the file cannot be read)
+        self.files = {}
+
+    def get_lines(self, sha, path):
+        """
+        Get the normalized lines of a file at a commit.
+
+        Args:
+            sha: The SHA of the commit.
+            path: The path of the file relative to the root of the repository.
+
+        Returns:
+            The list of normalized lines, or None if the file is not in the commit.
+        """
+        key = (sha, path)
+        if key not in self.files:
+            try:
+                _, object_type, content = self.reader.read_object(f'{sha}:{path}')
+            except (ValueError, OSError):
+                # The file is not in the commit (or the repository cannot be read)
+                self.files[key] = None
+            else:
+                self.files[key] = [normalize_line(line) for line in content.split(b'\n')] if object_type == 'blob' else None
+        return self.files[key]
+
+    def get_fingerprints(self, sha, path, line_num):
+        """
+        Get the fingerprints of a violation location.
+
+        Args:
+            sha: The SHA of the commit.
+            path: The path of the file relative to the root of the repository.
+            line_num: The line number (1-based).
+
+        Returns:
+            A tuple containing the context fingerprint and the line fingerprint,
+            or None if the line cannot be read or is blank.
+        """
+        lines = self.get_lines(sha, path)
+        if lines is None or not 1 <= line_num <= len(lines) or not lines[line_num - 1]:
+            return None
+        start = max(0, line_num - 1 - CONTEXT_LINES)
+        context = lines[start:line_num + CONTEXT_LINES]
+        return hashlib.blake2b(b'\n'.join(context), digest_size=8).digest(), lines[line_num - 1]
@@ -0,0 +1,326 @@
+import os
+import struct
+
+
+"""
+This script is used to store a compact snapshot of the violations of each commit, so the violations of the parent
+commit can be loaded without reading the ever-growing continuous_analysis_over_time_results.csv file.
+A snapshot is a binary file (violation_snapshots/<sha>.snap) with:
+- A header: the magic, the version, the kind of the snapshot (full or delta), the depth of its delta chain, the SHA
+  of its base snapshot and the number of removed and added records
+- The removed records, then the added records: arrays of (key, count) sorted by (key, count), where the key packs
+  the spec id (16 bits), the file id (24 bits) and the line number (24 bits), so they are sorted by spec, file and line
+
+A full snapshot only has added records. A delta snapshot stores the records removed from and added to its base
+snapshot (the snapshot of the parent commit), so a long history costs little disk. A full snapshot is written every
+VIOLATION_SNAPSHOTS_FULL_EVERY snapshots of a delta chain, so loading a snapshot applies a bounded number of deltas.
+The records are memory-mapped (numpy.memmap), they are not read until they are used.
+
+The spec and file ids are the line numbers of the spec and file tables (violation_snapshots/specs.txt and
+violation_snapshots/files.txt). The tables are append-only, so the ids of the existing snapshots never change.
+
+The snapshots are written by filter_new_violations.py when the VIOLATION_SNAPSHOTS environment variable is set.
+"""
+
+
+# The defaults of the snapshots (the directory and the maximum number of snapshots of a delta chain)
+DEFAULT_SNAPSHOTS_DIR = 'violation_snapshots'
+DEFAULT_FULL_EVERY = 20
+
+# The header of a snapshot file: magic, version, kind, depth, base SHA, number of removed and added records
+HEADER = struct.Struct('<4sBBH40sQQ')
+MAGIC = b'CAVS'
+VERSION = 1
+FULL = 0
+DELTA = 1
+
+# The bits of the spec id, the file id and the line number in the key of a record
+SPEC_BITS = 16
+FILE_BITS = 24
+LINE_BITS = 24
+
+
+def get_snapshots():
+    """
+    Get the violation snapshots of the current directory if they are enabled (the VIOLATION_SNAPSHOTS environment
+    variable, the VIOLATION_SNAPSHOTS_DIR and VIOLATION_SNAPSHOTS_FULL_EVERY environment variables set the directory
+    and the length of the delta chains).
+
+    Returns:
+        The ViolationSnapshots, or None if the snapshots are not enabled.
+    """
+    if os.environ.get('VIOLATION_SNAPSHOTS', '0').lower() in ('0', 'false', 'no', ''):
+        return None
+    return ViolationSnapshots(
+        os.environ.get('VIOLATION_SNAPSHOTS_DIR', DEFAULT_SNAPSHOTS_DIR),
+        int(os.environ.get('VIOLATION_SNAPSHOTS_FULL_EVERY', DEFAULT_FULL_EVERY)),
+    )
+
+
+def get_record_dtype():
+    # The records of a snapshot: the packed (spec id, file id, line number) key and the count of the violation
+    import numpy as np
+    return np.dtype([('key', '<u8'), ('count', '<u4')])
+
+
+class ViolationSnapshots:
+    """
+    Write and load the violation snapshots of the commits.
+    """
+
+    def __init__(self, snapshots_dir=DEFAULT_SNAPSHOTS_DIR, full_every=DEFAULT_FULL_EVERY):
+        self.snapshots_dir = os.path.abspath(snapshots_dir)
+        self.full_every = max(1, full_every)
+        self.tables = {}
+        self.ids = {}
+
+    def get_path(self, sha):
+        return os.path.join(self.snapshots_dir, f'{sha}.snap')
+
+    def find(self, sha):
+        """
+        Find the snapshot of a commit.
+
+        Args:
+            sha: The SHA of the commit (full or abbreviated, or a full SHA of an abbreviated snapshot).
+
+        Returns:
+            The SHA of the snapshot, or None if there is no snapshot of the commit (or it is ambiguous).
+        """
+        if not sha or not os.path.isdir(self.snapshots_dir):
+            return None
+        if os.path.isfile(self.get_path(sha)):
+            return sha
+        matches = [name[:-len('.snap')] for name in os.listdir(self.snapshots_dir) if name.endswith('.snap')]
+        matches = [name for name in matches if name.startswith(sha) or sha.startswith(name)]
+        return matches[0] if len(matches) == 1 else None
+
+    def get_table(self, name):
+        # Load a table (spec or file names) once, the id of a name is its line number
+        if name not in self.tables:
+            table_file = os.path.join(self.snapshots_dir, f'{name}.txt')
+            table = []
+            if os.path.isfile(table_file):
+                with open(table_file, 'r', encoding='utf-8', newline='\n') as f:
+                    table = f.read().split('\n')[:-1]
+            self.tables[name] = table
+            self.ids[name] = {value: i for i, value in enumerate(table)}
+        return self.tables[name]
+
+    def intern(self, name, values, max_bits):
+        """
+        Get the ids of names in a table, appending the new names to the table.
+
+        Args:
+            name: The table (specs or files).
+            values: The names.
+            max_bits: The number of bits of the ids in the keys.
+
+        Returns:
+            A list of the ids of the names.
+        """
+        table = self.get_table(name)
+        ids = self.ids[name]
+        new_values = [value for value in dict.fromkeys(values) if value not in ids]
+        if new_values:
+            if any('\n' in value for value in new_values):
+                raise ValueError(f"Cannot store a name with a newline in the {name} table")
+            if len(table) + len(new_values) > 1 << max_bits:
+                raise ValueError(f"Too many names in the {name} table (at most {1 << max_bits})")
+            os.makedirs(self.snapshots_dir, exist_ok=True)
+            with open(os.path.join(self.snapshots_dir, f'{name}.txt'), 'a', encoding='utf-8', newline='\n') as f:
+                f.write(''.join(f'{value}\n' for value in new_values))
+            for value in new_values:
+                ids[value] = len(table)
+                table.append(value)
+        return [ids[value] for value in values]
+
+    def encode(self, frame):
+        """
+        Encode the violations of a frame to records.
+
+        Args:
+            frame: A violation frame (spec, filepath, line_num and count columns, see violations_to_frame).
+
+        Returns:
+            The records, sorted by (key, count).
+        """
+        import numpy as np
+
+        lines = np.asarray(frame['line_num'].astype('int64'), dtype=np.int64)
+        if len(lines) and (lines.min() < 0 or lines.max() >= 1 << LINE_BITS):
+            raise ValueError(f"Line numbers must be between 0 and {(1 << LINE_BITS) - 1}")
+        spec_ids = np.asarray(self.intern('specs', frame['spec'].tolist(), SPEC_BITS), dtype=np.uint64)
+        file_ids = np.asarray(self.intern('files', frame['filepath'].tolist(), FILE_BITS), dtype=np.uint64)
+
+        records = np.empty(len(frame), dtype=get_record_dtype())
+        records['key'] = (spec_ids << (FILE_BITS + LINE_BITS)) | (file_ids << LINE_BITS) | lines.astype(np.uint64)
+        records['count'] = np.asarray(frame['count'], dtype=np.uint32)
+        return sort_records(records)
+
+    def decode(self, records):
+        """
+        Decode records to a violation frame.
+
+        Args:
+            records: The records of a snapshot.
+
+        Returns:
+            A DataFrame with the spec, filepath, line_num (as a string) and count columns, sorted by spec id,
+            file id and line.
+        """
+        import numpy as np
+        import pandas as pd
+
+        keys = np.asarray(records['key'])
+        specs = np.asarray(self.get_table('specs'), dtype=object)
+        files = np.asarray(self.get_table('files'), dtype=object)
+        frame = pd.DataFrame({
+            'spec': specs[(keys >> (FILE_BITS + LINE_BITS)).astype(np.int64)],
+            'filepath': files[((keys >> LINE_BITS) & ((1 << FILE_BITS) - 1)).astype(np.int64)],
+            'line_num': (keys & ((1 << LINE_BITS) - 1)).astype(str),
+            'count': np.asarray(records['count']).astype(int),
+        })
+        return frame.astype({'spec': object, 'filepath': object, 'line_num': object})
+
+    def read_header(self, sha):
+        # Read the header of a snapshot (kind, depth, base SHA, number of removed and added records)
+        with open(self.get_path(sha), 'rb') as f:
+            magic, version, kind, depth, base_sha, num_removed, num_added = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a violation snapshot (version {VERSION}): {self.get_path(sha)}")
+        return kind, depth, base_sha.rstrip(b'\0').decode(), num_removed, num_added
+
+    def map_records(self, sha, offset, count):
+        # Memory-map an array of records of a snapshot (an empty array cannot be mapped)
+        import numpy as np
+
+        dtype = get_record_dtype()
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.get_path(sha), dtype=dtype, mode='r', offset=HEADER.size + offset * dtype.itemsize, shape=(count,))
+
+    def load_records(self, sha):
+        """
+        Load the records of the snapshot of a commit (applying the deltas of its chain).
+
+        Args:
+            sha: The SHA of the snapshot (see find).
+
+        Returns:
+            The records, sorted by (key, count).
+        """
+        kind, _, base_sha, num_removed, num_added = self.read_header(sha)
+        added = self.map_records(sha, num_removed, num_added)
+        if kind == FULL:
+            return added
+        return apply_delta(self.load_records(base_sha), self.map_records(sha, 0, num_removed), added)
+
+    def load(self, sha):
+        """
+        Load the violations of a commit.
+
+        Args:
+            sha: The SHA of the commit.
+
+        Returns:
+            The violation frame of the commit (see decode), or None if there is no snapshot of the commit.
+        """
+        snapshot_sha = self.find(sha)
+        if snapshot_sha is None:
+            return None
+        return self.decode(self.load_records(snapshot_sha))
+
+    def write(self, sha, frame, base_sha=None):
+        """
+        Write the snapshot of the violations of a commit, as a delta of the snapshot of its parent commit if there is one.
+
+        Args:
+            sha: The SHA of the commit.
+            frame: The violation frame of the commit (see violations_to_frame).
+            base_sha: The SHA of the parent commit (optional).
+
+        Returns:
+            The kind of the written snapshot ('full' or 'delta'), or None if the commit already has a snapshot.
+        """
+        # The snapshots of the child commits may be deltas of the snapshot, it is never replaced (the filter also
+        # uses the first results of a commit)
+        if self.find(sha) is not None:
+            return None
+        records = self.encode(frame)
+        base_sha = self.find(base_sha)
+        depth = 0
+        if base_sha is not None:
+            _, base_depth, _, _, _ = self.read_header(base_sha)
+            depth = base_depth + 1
+        if base_sha is None or depth >= self.full_every:
+            kind, depth, base_sha = FULL, 0, ''
+            removed, added = records[:0], records
+        else:
+            kind = DELTA
+            removed, added = diff_records(self.load_records(base_sha), records)
+
+        # Write the snapshot to a temporary file first, so a snapshot is never partially written
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        path = self.get_path(sha)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, kind, depth, base_sha.encode(), len(removed), len(added)))
+            f.write(removed.tobytes())
+            f.write(added.tobytes())
+        os.replace(path + '.tmp', path)
+        return 'full' if kind == FULL else 'delta'
+
+
+def sort_records(records):
+    # Sort records by (key, count) (a lexsort of the fields is much faster than a sort of the structured array)
+    import numpy as np
+
+    records = np.asarray(records)
+    return records[np.lexsort((records['count'], records['key']))]
+
+
+def diff_records(old, new):
+    """
+    Get the records removed from and added to a snapshot (as multisets, a record can appear several times).
+
+    Args:
+        old: The records of the base snapshot.
+        new: The records of the new snapshot.
+
+    Returns:
+        A tuple containing the removed and added records, sorted by (key, count).
+    """
+    import numpy as np
+
+    # Count the occurrences of each distinct record in the new snapshot minus in the base snapshot
+    both = np.concatenate([np.asarray(old), np.asarray(new)])
+    order = np.lexsort((both['count'], both['key']))
+    both = both[order]
+    weights = np.where(order < len(old), -1, 1)
+    starts = np.ones(len(both), dtype=bool)
+    starts[1:] = (both['key'][1:] != both['key'][:-1]) | (both['count'][1:] != both['count'][:-1])
+    occurrences = np.bincount(np.cumsum(starts) - 1, weights=weights).astype(np.int64)
+    unique = both[starts]
+    removed = np.repeat(unique, np.maximum(-occurrences, 0))
+    added = np.repeat(unique, np.maximum(occurrences, 0))
+    return removed, added
+
+
+def apply_delta(base, removed, added):
+    """
+    Apply a delta to the records of a snapshot.
+
+    Args:
+        base: The records of the base snapshot.
+        removed: The records removed from the base snapshot.
+        added: The records added to the base snapshot.
+
+    Returns:
+        The records of the new snapshot, sorted by (key, count).
+    """
+    import numpy as np
+
+    if len(removed):
+        # Remove one occurrence of the base records for each occurrence of a removed record
+        _, base = diff_records(removed, base)
+    return sort_records(np.concatenate([np.asarray(base), np.asarray(added)]))
@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+from time import perf_counter
+
+
+"""
+This script is used to create the working trees of the original, PyMOP and DyLin runs of a commit (<prefix>-original,
+<prefix>-pymop and <prefix>-dylin) without copying the whole repository three times, and to remove them.
+The working trees are created with one of the following methods:
+- reflink: a copy-on-write copy of a checked out repository (cp --reflink=always, on btrfs, XFS, APFS, ...), the
+  files are only copied when they are modified, the copy is the same as a full copy (including the submodules)
+- clone: a local clone of the repository (the object files are hardlinked) checked out at the commit, with the origin
+  of the repository as its origin (so the relative submodule URLs resolve the same way)
+- worktree: a git worktree of the repository (the object store is shared), its .git file points to the repository,
+  so it cannot be moved (e.g. copied into the PyMOP container)
+- copy: a full copy of a checked out repository (cp -r)
+
+The auto method (default) uses reflink copies when the repository is checked out and the filesystem supports them,
+and local clones otherwise. The submodules of the clones and worktrees are initialized by the runner scripts.
+The method and the time of the setup of each working tree are written to a timing file (read by the parser, see
+get_workspace_setup in parse_continuous_analysis_output.py).
+
+Usage:
+    python3 workspace_manager.py create <repo> [--prefix <prefix>] [--commit <sha>] [--method auto|reflink|clone|worktree|copy] [--timing-file <file>]
+    python3 workspace_manager.py remove <repo> [--prefix <prefix>]
+"""
+
+
+# The working trees of the runs, and the methods to create them
+DEFAULT_COPIES = ['original', 'pymop', 'dylin']
+METHODS = ['auto', 'reflink', 'clone', 'worktree', 'copy']
+
+
+def git(repo_path: str, *args) -> str:
+    return subprocess.run(['git', '-C', repo_path] + list(args), check=True, capture_output=True, text=True).stdout.strip()
+
+
+def is_working_tree(repo_path: str) -> bool:
+    # Check if the repository is checked out (the reflink and copy methods copy the checked out files)
+    try:
+        return git(repo_path, 'rev-parse', '--is-bare-repository') == 'false'
+    except subprocess.CalledProcessError:
+        return False
+
+
+def get_origin_url(repo_path: str) -> str:
+    # Get the URL of the origin remote of a repository (None if it has no origin)
+    try:
+        return git(repo_path, 'remote', 'get-url', 'origin') or None
+    except subprocess.CalledProcessError:
+        return None
+
+
+def supports_reflink(directory: str) -> bool:
+    """
+    Check if the filesystem of a directory supports reflink copies.
+
+    Args:
+        directory: The directory.
+
+    Returns:
+        True if a file of the directory can be copied with cp --reflink=always.
+    """
+    source = os.path.join(directory, '.reflink-test')
+    destination = source + '-copy'
+    try:
+        with open(source, 'w') as f:
+            f.write('reflink')
+        result = subprocess.run(['cp', '--reflink=always', source, destination], capture_output=True)
+        return result.returncode == 0
+    except OSError:
+        return False
+    finally:
+        for path in (source, destination):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def resolve_method(repo_path: str, method: str, commit: str = None) -> str:
+    """
+    Get the method used to create the working trees.
+
+    Args:
+        repo_path: The path to the repository.
+        method: The requested method (auto picks the cheapest supported method).
+        commit: The commit to check out (the reflink and copy methods copy the checked out commit).
+
+    Returns:
+        The method.
+    """
+    copyable = is_working_tree(repo_path) and (commit is None or git(repo_path, 'rev-parse', 'HEAD') == git(repo_path, 'rev-parse', commit))
+    if method in ('reflink', 'copy') and not copyable:
+        raise ValueError(f"The {method} method needs {repo_path} to be checked out at the commit")
+    if method != 'auto':
+        return method
+    parent_dir = os.path.dirname(os.path.abspath(repo_path))
+    return 'reflink' if copyable and supports_reflink(parent_dir) else 'clone'
+
+
+def create_workspace(repo_path: str, destination: str, method: str, commit: str = None):
+    """
+    Create a working tree of a repository.
+
+    Args:
+        repo_path: The path to the repository.
+        destination: The path of the working tree (replaced if it exists).
+        method: The method (reflink, clone, worktree or copy, see resolve_method).
+        commit: The commit to check out (the checked out commit of the repository if not given).
+    """
+    remove_workspace(repo_path, destination)
+    if method == 'reflink':
+        subprocess.run(['cp', '-a', '--reflink=always', repo_path, destination], check=True)
+    elif method == 'copy':
+        shutil.copytree(repo_path, destination, symlinks=True)
+    elif method == 'clone':
+        commit = commit or git(repo_path, 'rev-parse', 'HEAD')
+        subprocess.run(['git', 'clone', '-q', '--local', '--no-checkout', repo_path, destination], check=True)
+        git(destination, 'checkout', '-q', '--detach', commit)
+        # Point the origin of the clone to the origin of the repository, so the relative submodule URLs (../sub.git)
+        # are resolved against the remote like in the repository, not against the local path
+        origin_url = get_origin_url(repo_path)
+        if origin_url:
+            git(destination, 'remote', 'set-url', 'origin', origin_url)
+    elif method == 'worktree':
+        git(repo_path, 'worktree', 'add', '-q', '--detach', os.path.abspath(destination), commit or 'HEAD')
+    else:
+        raise ValueError(f"Unknown workspace method: {method}")
+
+
+def remove_workspace(repo_path: str, destination: str):
+    # Remove a working tree (and its worktree metadata if it is a worktree of the repository)
+    if os.path.lexists(destination):
+        if os.path.isdir(destination) and not os.path.islink(destination):
+            shutil.rmtree(destination)
+        else:
+            os.remove(destination)
+    # The worktrees removed by the runs (e.g. the PyMOP copy) are pruned too
+    subprocess.run(['git', '-C', repo_path, 'worktree', 'prune'], capture_output=True)
+
+
+def create_workspaces(repo_path: str, prefix: str = None, copies: list = None, method: str = 'auto', commit: str = None) -> dict:
+    """
+    Create the working trees of the runs of a commit.
+
+    Args:
+        repo_path: The path to the repository (checked out, or bare for the clone and worktree methods).
+        prefix: The prefix of the working trees (the repository path if not given).
+        copies: The names of the working trees (original, pymop and dylin by default).
+        method: The method (see METHODS).
+        commit: The commit to check out (the checked out commit of the repository if not given).
+
+    Returns:
+        The timing of the setup: the method, the total time and the time of each working tree (in seconds).
+    """
+    prefix = prefix or repo_path.rstrip('/')
+    copies = copies or DEFAULT_COPIES
+    start = perf_counter()
+    method = resolve_method(repo_path, method, commit)
+    timing = {'method': method, 'setup_time': 0.0, 'copies': {}}
+    for copy in copies:
+        copy_start = perf_counter()
+        create_workspace(repo_path, f'{prefix}-{copy}', method, commit)
+        timing['copies'][copy] = round(perf_counter() - copy_start, 3)
+    timing['setup_time'] = round(perf_counter() - start, 3)
+    return timing
+
+
+def remove_workspaces(repo_path: str, prefix: str = None, copies: list = None):
+    """
+    Remove the working trees of the runs of a commit.
+
+    Args:
+        repo_path: The path to the repository.
+        prefix: The prefix of the working trees (the repository path if not given).
+        copies: The names of the working trees (original, pymop and dylin by default).
+    """
+    prefix = prefix or repo_path.rstrip('/')
+    for copy in copies or DEFAULT_COPIES:
+        remove_workspace(repo_path, f'{prefix}-{copy}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create or remove the working trees of the runs of a commit.')
+    parser.add_argument('command', choices=['create', 'remove'])
+    parser.add_argument('repo_path', help='The repository (checked out, or bare for the clone and worktree methods).')
+    parser.add_argument('--prefix', default=None, help='The prefix of the working trees (the repository path by default).')
+    parser.add_argument('--copies', default=','.join(DEFAULT_COPIES), help='The names of the working trees (comma separated).')
+    parser.add_argument('--method', choices=METHODS, default=os.environ.get('WORKSPACE_METHOD', 'auto'))
+    parser.add_argument('--commit', default=None, help='The commit to check out (the checked out commit by default).')
+    parser.add_argument('--timing-file', default=None, help='The JSON file to save the method and setup times to.')
+    args = parser.parse_args()
+    copies = [copy for copy in args.copies.split(',') if copy]
+
+    if args.command == 'remove':
+        remove_workspaces(args.repo_path, args.prefix, copies)
+        return 0
+
+    timing = create_workspaces(args.repo_path, args.prefix, copies, args.method, args.commit)
+    print(f"Created {len(copies)} working trees with {timing['method']} in {timing['setup_time']}s")
+    if args.timing_file:
+        os.makedirs(os.path.dirname(os.path.abspath(args.timing_file)), exist_ok=True)
+        with open(args.timing_file, 'w') as f:
+            json.dump(timing, f)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())